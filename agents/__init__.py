@@ -2,19 +2,24 @@
 Agent Registration and Factory Setup
 """
 
-import sys
-import os
-
-# Add shared agents to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared_agents'))
+import logging
 
 from shared_agents.core.agent_factory import AgentFactory
 from .triage_agent import AdvancedTriageAgent
 from .research_agent import AdvancedResearchAgent
 from .confidence_agent import EnhancedConfidenceAgent
 
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    'AdvancedTriageAgent',
+    'AdvancedResearchAgent',
+    'EnhancedConfidenceAgent',
+    'register_all_agents'
+]
+
 def register_all_agents():
-    """Register all advanced agents with the factory"""
+    """Register all advanced agents with the factory (safe to call more than once)"""
     
     # Register Triage Agent
     AgentFactory.register_agent(
@@ -37,7 +42,4 @@ def register_all_agents():
         input_type="dict"
     )
     
-    print("✅ All advanced agents registered successfully")
-
-# Auto-register when imported
-register_all_agents()
\ No newline at end of file
+    logger.debug("All advanced agents registered")
@@ -4,24 +4,111 @@ Enhanced Confidence Agent with Advanced Learning and Prediction
 
 import numpy as np
 import json
+import asyncio
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import logging
-import sys
 import os
-
-# Add shared agents to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared_agents'))
+import re
+import hashlib
+from collections import OrderedDict, deque
 
 from shared_agents.core.agent_factory import AgentBase, AgentResponse, AgentCapability
+from core.openai_client import get_openai_rate_limiter
+
+# Optional SIMD similarity kernels
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+# Optional GPU offload for large knowledge bases
+try:
+    import cupy
+    CUPY_AVAILABLE = True
+except ImportError:
+    CUPY_AVAILABLE = False
+
+# Optional fast hashing for request keys
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Confidence decisions kept for learning, and how many recent ones are scanned for patterns
+HISTORY_CAPACITY = 2000
+HISTORY_WINDOW = 100
+
+# Recent prediction accuracies kept for the reported model accuracy
+ACCURACY_WINDOW = 1000
+
+# Knowledge base matches materialized per request (consensus looks at the top 10)
+SIMILARITY_TOP_K = 10
+
+# Solution type codes stored per knowledge item
+_SOLUTION_TYPES = ('general', 'procedural', 'troubleshooting', 'configuration', 'informational')
+_SOLUTION_TYPE_CODES = {name: code for code, name in enumerate(_SOLUTION_TYPES)}
+_PROCEDURAL_CODE = _SOLUTION_TYPE_CODES['procedural']
+
+# Contextual factor tables; unknown levels/priorities fall back to 1.0
+_USER_FACTOR = {'beginner': 0.7, 'intermediate': 1.0, 'advanced': 1.2}
+_PRIORITY_FACTOR = {'low': 1.1, 'medium': 1.0, 'high': 0.9, 'critical': 0.8}
+
+# Layout of the per-request factor vector; each factor group fills its own slice
+_FACTOR_NAMES = (
+    'similarity', 'consensus', 'complexity', 'quality', 'diversity',
+    'user_experience', 'priority_impact', 'system_context', 'time_pressure',
+    'historical_accuracy', 'pattern_strength'
+)
+_ENHANCED_FACTORS = slice(0, 5)
+_CONTEXTUAL_FACTORS = slice(5, 9)
+_HISTORICAL_FACTORS = slice(9, 11)
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def request_hash(request: str) -> int:
+    """Stable unsigned 64-bit hash of request text, identical across processes and restarts"""
+    data = request.encode('utf-8')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+def _tokenize(text_lower: str) -> frozenset:
+    """Alphanumeric tokens of already-lowercased text, for indicator lookups"""
+    return frozenset(_TOKEN_PATTERN.findall(text_lower))
+
+@dataclass(frozen=True)
+class ParsedRequest:
+    """Request text lowercased and tokenized once, shared by every factor"""
+    text: str
+    lower: str
+    words: frozenset  # Whitespace-split words, for Jaccard/keyword/history overlap
+    tokens: frozenset  # Alphanumeric tokens, for indicator vocabularies
+    request_hash: int  # Stable key for outcome feedback
+    
+    @classmethod
+    def from_text(cls, text: str) -> 'ParsedRequest':
+        lower = text.lower()
+        return cls(
+            text=text, lower=lower, words=frozenset(lower.split()), tokens=_tokenize(lower),
+            request_hash=request_hash(text)
+        )
 
 @dataclass
 class PredictionModel:
-    feature_weights: Dict[str, float]
+    feature_names: Tuple[str, ...]
+    weights: np.ndarray
     bias: float
-    accuracy_history: List[float]
+    accuracy_history: 'deque[float]'
     last_updated: datetime
+    
+    @property
+    def feature_weights(self) -> Dict[str, float]:
+        """Learned weights keyed by feature name"""
+        return dict(zip(self.feature_names, self.weights.tolist()))
 
 class EnhancedConfidenceAgent(AgentBase):
     """
@@ -35,33 +122,112 @@ class EnhancedConfidenceAgent(AgentBase):
         AgentCapability.DATA_PROCESSING
     ]
     
+    # Indicator vocabularies, matched against request/content tokens
+    _STEP_WORDS = frozenset({'step', 'steps'})
+    _STEP_DIGITS = frozenset('123456789')
+    _ADVANCED_WORDS = frozenset({'advanced', 'complex', 'difficult', 'expert'})
+    _PROCEDURAL = frozenset({'step', 'steps', 'procedure', 'procedures', 'guide'})
+    _TROUBLE = frozenset({'troubleshoot', 'troubleshooting', 'problem', 'problems', 'issue', 'issues', 'error', 'errors'})
+    _CONFIGURATION = frozenset({'configure', 'configuration', 'setup', 'install', 'installation'})
+    _INFORMATIONAL = frozenset({'explain', 'explanation', 'definition'})
+    _TECHNICAL_TERMS = frozenset({'api', 'integration', 'configuration', 'database', 'server'})
+    _UNCERTAINTY_WORDS = frozenset({'somehow', 'maybe', 'unclear', 'confusing'})
+    _KNOWN_SYSTEMS = frozenset({'windows', 'mac', 'macos', 'linux', 'android', 'ios'})
+    
     def __init__(self, name: str, agent_type: str, config: Dict[str, Any]):
         super().__init__(name, agent_type, config, self.DEFAULT_CAPABILITIES)
         
+        # LRU cache of embeddings keyed by normalized input text
+        self._embedding_cache: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._embedding_model = config.get('embedding_model', 'text-embedding-3-small')
+        
         self.openai_client = config['openai_client']
-        self.embedding_model = config.get('embedding_model', 'text-embedding-3-small')
+        self._rate_limiter = config.get('rate_limiter') or get_openai_rate_limiter()
+        self.embedding_batch_size = config.get('embedding_batch_size', 256)
+        self.embedding_concurrency = config.get('embedding_concurrency', 5)
+        self.embedding_cache_size = config.get('embedding_cache_size', 4096)
+        self.use_gpu = config.get('use_gpu', True)
+        
+        # Directory for the persisted int8 index; workers memory-map it to share pages
+        self.kb_index_dir = config.get('kb_index_dir')
+        
+        # Contextual factor tables, specialized once from config overrides
+        self._user_factor = {**_USER_FACTOR, **config.get('user_level_factors', {})}
+        self._priority_factor = {**_PRIORITY_FACTOR, **config.get('priority_factors', {})}
         
         # Knowledge base and embeddings
         self.knowledge_embeddings = {}
         self.knowledge_content = {}
         
+        # Stacked int8 embedding matrix (rows scaled to +/-127) for batched similarity
+        self._kb_ids: List[str] = []
+        self._kb_int8 = np.empty((0, 0), dtype=np.int8)
+        self._kb_int8_norms = np.empty(0, dtype=np.float32)
+        
+        # Per-item metadata columns aligned with _kb_ids, for vectorized match quality/diversity
+        self._kb_wordcount = np.empty(0, dtype=np.int32)
+        self._kb_complexity = np.empty(0, dtype=np.int32)
+        self._kb_soltype = np.empty(0, dtype=np.int8)
+        self._kb_category = np.empty(0, dtype=np.int16)
+        
+        # Word and lowercased keyword sets aligned with _kb_ids, kept out of the JSON-facing item dicts
+        self._kb_word_sets: List[frozenset] = []
+        self._kb_keyword_sets: List[frozenset] = []
+        
+        # float16 copy of the normalized index on the GPU, when CuPy and a device are available
+        self._kb_matrix_dev = None
+        self._gpu_stream = None
+        
         # Advanced learning components
         self.prediction_model = PredictionModel(
-            feature_weights={
-                'similarity': 0.4,
-                'consensus': 0.2,
-                'complexity': 0.15,
-                'user_match': 0.15,
-                'historical': 0.1
-            },
+            feature_names=('similarity', 'consensus', 'complexity', 'user_match', 'historical'),
+            weights=np.array([0.4, 0.2, 0.15, 0.15, 0.1], dtype=np.float32),
             bias=0.0,
-            accuracy_history=[],
+            accuracy_history=deque(maxlen=ACCURACY_WINDOW),
             last_updated=datetime.now()
         )
+        self._accuracy_sum = 0.0  # Running sum over accuracy_history
+        
+        # Position of each model feature in the factor vector (-1 when no factor computes it)
+        self._feature_index = np.array(
+            [_FACTOR_NAMES.index(name) if name in _FACTOR_NAMES else -1
+             for name in self.prediction_model.feature_names]
+        )
+        self._feature_present = self._feature_index >= 0
+        
+        # Confidence history as a fixed-capacity ring buffer of parallel columns
+        self._hist_request_hash = np.zeros(HISTORY_CAPACITY, dtype=np.uint64)
+        self._hist_predicted = np.zeros(HISTORY_CAPACITY, dtype=np.float32)
+        self._hist_actual = np.full(HISTORY_CAPACITY, np.nan, dtype=np.float32)  # NaN until feedback arrives
+        self._hist_words: List[Optional[frozenset]] = [None] * HISTORY_CAPACITY
+        self._hist_factors = np.zeros(
+            (HISTORY_CAPACITY, len(self.prediction_model.feature_names)), dtype=np.float32
+        )
+        self._hist_cursor = 0  # Total decisions stored; next write goes to cursor % capacity
         
-        self.confidence_history = []
         self.outcome_feedback = []
         
+    @property
+    def embedding_model(self) -> str:
+        return self._embedding_model
+    
+    @embedding_model.setter
+    def embedding_model(self, model: str):
+        """Switch embedding models; cached and indexed vectors from the old model are invalid"""
+        if model == self._embedding_model:
+            return
+        
+        self._embedding_model = model
+        self._embedding_cache.clear()
+        if self._kb_ids:
+            logging.warning("Embedding model changed to %s; reload the knowledge base to re-index it", model)
+    
+    @property
+    def model_accuracy(self) -> float:
+        """Mean accuracy over the recent prediction window"""
+        count = len(self.prediction_model.accuracy_history)
+        return self._accuracy_sum / count if count else 0.0
+    
     async def execute(self, input_data: Dict[str, Any]) -> AgentResponse:
         """Execute enhanced confidence scoring with learning"""
         
@@ -71,8 +237,10 @@ class EnhancedConfidenceAgent(AgentBase):
         if not request_text:
             raise ValueError("No request text provided for confidence scoring")
         
+        parsed_request = ParsedRequest.from_text(request_text)
+        
         # Generate comprehensive confidence analysis
-        confidence_analysis = await self._comprehensive_confidence_analysis(request_text, user_context)
+        confidence_analysis = await self._comprehensive_confidence_analysis(parsed_request, user_context)
         
         # Apply predictive modeling
         predicted_confidence = await self._apply_predictive_model(confidence_analysis)
@@ -81,14 +249,25 @@ class EnhancedConfidenceAgent(AgentBase):
         reasoning = await self._generate_confidence_reasoning(confidence_analysis, predicted_confidence)
         
         # Store for learning
-        await self._store_confidence_decision(request_text, confidence_analysis, predicted_confidence)
+        await self._store_confidence_decision(parsed_request, confidence_analysis, predicted_confidence)
+        
+        # Materialize factor dicts for the response
+        factor_values = confidence_analysis.pop('factor_values').tolist()
+        confidence_analysis['factors'] = dict(zip(_FACTOR_NAMES, factor_values))
+        confidence_analysis['context_analysis'] = dict(
+            zip(_FACTOR_NAMES[_CONTEXTUAL_FACTORS], factor_values[_CONTEXTUAL_FACTORS])
+        )
+        confidence_analysis['historical_insights'] = dict(
+            zip(_FACTOR_NAMES[_HISTORICAL_FACTORS], factor_values[_HISTORICAL_FACTORS])
+        )
         
         result = {
             'confidence_score': predicted_confidence,
+            'request_hash': parsed_request.request_hash,  # Pass back to update_prediction_accuracy
             'analysis': confidence_analysis,
             'reasoning': reasoning,
             'prediction_factors': confidence_analysis['factors'],
-            'model_accuracy': np.mean(self.prediction_model.accuracy_history) if self.prediction_model.accuracy_history else 0.0,
+            'model_accuracy': self.model_accuracy,
             'learning_confidence': len(self.outcome_feedback) / 100  # Improves with more feedback
         }
         
@@ -107,118 +286,269 @@ class EnhancedConfidenceAgent(AgentBase):
     async def load_knowledge_base(self, knowledge_items: List[Dict[str, Any]]):
         """Load and process knowledge base with advanced indexing"""
         
-        logging.info(f"Loading {len(knowledge_items)} knowledge items with enhanced processing...")
+        logging.info("Loading %d knowledge items with enhanced processing...", len(knowledge_items))
         
         for item in knowledge_items:
-            item_id = item['id']
-            content = item['content']
-            
-            # Generate embeddings
-            embedding = await self._get_embedding(content)
-            
             # Enhanced content processing
-            processed_content = await self._process_knowledge_item(item)
-            
-            self.knowledge_embeddings[item_id] = embedding
-            self.knowledge_content[item_id] = processed_content
+            self.knowledge_content[item['id']] = await self._process_knowledge_item(item)
+        
+        # Reuse a persisted index for exactly this knowledge base and embedding model
+        index_path = self._kb_index_path()
+        if index_path and self._load_kb_index(index_path):
+            logging.info("Enhanced knowledge base loaded from %s", index_path)
+            return
+        
+        # Embed the loaded items plus any previous items only known from a persisted index
+        reloaded_ids = {item['id'] for item in knowledge_items}
+        pending_ids = [
+            item_id for item_id in self.knowledge_content
+            if item_id in reloaded_ids or item_id not in self.knowledge_embeddings
+        ]
+        
+        # Generate embeddings in batched, concurrent requests
+        embeddings = await self._get_embeddings([self.knowledge_content[item_id]['content'] for item_id in pending_ids])
+        self.knowledge_embeddings.update(zip(pending_ids, embeddings))
+        
+        self._build_kb_index()
+        if index_path:
+            self._save_kb_index(index_path)
         
         logging.info("Enhanced knowledge base loaded successfully")
     
-    async def _comprehensive_confidence_analysis(self, request: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Perform comprehensive multi-factor confidence analysis"""
+    def _build_kb_index(self):
+        """Stack knowledge embeddings into a contiguous int8 matrix quantized per row"""
+        
+        kb_ids = [item_id for item_id in self.knowledge_content if item_id in self.knowledge_embeddings]
+        if not kb_ids:
+            self._set_kb_index([], np.empty((0, 0), dtype=np.int8))
+            return
         
-        # Get request embedding
-        request_embedding = await self._get_embedding(request)
+        matrix = np.vstack([self.knowledge_embeddings[item_id] for item_id in kb_ids]).astype(np.float32)
+        self._set_kb_index(kb_ids, self._quantize_int8(matrix))
+    
+    def _set_kb_index(self, kb_ids: List[str], kb_int8: np.ndarray):
+        """Install an int8 index (in memory or memory-mapped) with its norms, metadata and GPU copy"""
+        
+        self._kb_ids = kb_ids
+        self._kb_int8 = kb_int8
+        self._kb_int8_norms = np.sqrt(
+            np.einsum('ij,ij->i', kb_int8, kb_int8, dtype=np.int32).astype(np.float32)
+        ) if kb_ids else np.empty(0, dtype=np.float32)
+        self._build_kb_metadata([self.knowledge_content[item_id] for item_id in kb_ids])
+        
+        self._kb_matrix_dev = None
+        if kb_ids and self._gpu_enabled():
+            norms = self._kb_int8_norms.copy()
+            norms[norms == 0] = 1.0
+            normalized = self._kb_int8.astype(np.float32) / norms[:, None]
+            if self._gpu_stream is None:
+                self._gpu_stream = cupy.cuda.Stream(non_blocking=True)
+            with self._gpu_stream:
+                self._kb_matrix_dev = cupy.asarray(normalized, dtype=cupy.float16)
+            self._gpu_stream.synchronize()
+    
+    def _kb_index_path(self) -> Optional[str]:
+        """Persisted index location, keyed by embedding model and knowledge base contents"""
         
-        # Calculate similarities
-        similarities = await self._calculate_advanced_similarities(request_embedding, request)
+        if not self.kb_index_dir:
+            return None
         
-        # Multi-factor analysis
-        factors = await self._calculate_enhanced_factors(request, similarities, context)
+        fingerprint = hashlib.blake2b(self.embedding_model.encode('utf-8'), digest_size=16)
+        for item_id, info in self.knowledge_content.items():
+            fingerprint.update(b'\0' + str(item_id).encode('utf-8') + b'\0' + info.get('content', '').encode('utf-8'))
         
-        # Contextual adjustments
-        contextual_factors = await self._calculate_contextual_factors(request, context)
+        return os.path.join(self.kb_index_dir, f"kb_index_{fingerprint.hexdigest()}.npy")
+    
+    def _load_kb_index(self, index_path: str) -> bool:
+        """Memory-map a persisted index if it matches the current knowledge base"""
         
-        # Historical pattern matching
-        historical_factors = await self._calculate_historical_factors(request, context)
+        try:
+            with open(index_path[:-len('.npy')] + '.json', 'r') as sidecar:
+                meta = json.load(sidecar)
+            if meta.get('embedding_model') != self.embedding_model or meta.get('ids') != list(self.knowledge_content):
+                return False
+            
+            kb_int8 = np.load(index_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            logging.debug("No usable persisted knowledge index at %s: %s", index_path, e)
+            return False
         
-        # Combine all factors
-        combined_factors = {**factors, **contextual_factors, **historical_factors}
+        if kb_int8.dtype != np.int8 or kb_int8.shape[0] != len(meta['ids']):
+            return False
         
-        return {
-            'request': request,
-            'similarities': similarities[:5],  # Top 5 matches
-            'factors': combined_factors,
-            'context_analysis': contextual_factors,
-            'historical_insights': historical_factors
-        }
+        self._set_kb_index(meta['ids'], kb_int8)
+        return True
     
-    async def _calculate_advanced_similarities(self, request_embedding: np.ndarray, request_text: str) -> List[Tuple[str, float, Dict[str, Any]]]:
-        """Calculate advanced similarities with multiple metrics"""
-        
-        similarities = []
+    def _save_kb_index(self, index_path: str):
+        """Persist the int8 index and its id sidecar, replacing files atomically"""
         
-        for item_id, kb_embedding in self.knowledge_embeddings.items():
-            # Cosine similarity
-            cosine_sim = self._cosine_similarity(request_embedding, kb_embedding)
-            
-            # Text-based similarity for validation
-            text_sim = await self._calculate_text_similarity(request_text, self.knowledge_content[item_id]['content'])
+        base_path = index_path[:-len('.npy')]
+        tmp_suffix = f".{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.kb_index_dir, exist_ok=True)
+            with open(index_path + tmp_suffix, 'wb') as index_file:
+                np.save(index_file, np.ascontiguousarray(self._kb_int8))
+            with open(base_path + '.json' + tmp_suffix, 'w') as sidecar:
+                json.dump({'embedding_model': self.embedding_model, 'ids': self._kb_ids}, sidecar)
             
-            # Keyword overlap
-            keyword_sim = await self._calculate_keyword_similarity(request_text, self.knowledge_content[item_id])
+            # Index first, so a sidecar is never visible without its matrix
+            os.replace(index_path + tmp_suffix, index_path)
+            os.replace(base_path + '.json' + tmp_suffix, base_path + '.json')
+        except OSError as e:
+            logging.warning("Failed to persist knowledge index to %s: %s", index_path, e)
+    
+    def _build_kb_metadata(self, contents: List[Dict[str, Any]]):
+        """Pack per-item word counts, complexity, solution type and category into arrays"""
+        
+        count = len(contents)
+        self._kb_word_sets = [frozenset(info.get('content', '').lower().split()) for info in contents]
+        self._kb_keyword_sets = [
+            frozenset(keyword.lower() for keyword in info.get('keywords', [])) for info in contents
+        ]
+        self._kb_wordcount = np.fromiter((info['word_count'] for info in contents), dtype=np.int32, count=count)
+        self._kb_complexity = np.fromiter(
+            (info['complexity_indicators'] for info in contents), dtype=np.int32, count=count
+        )
+        self._kb_soltype = np.fromiter(
+            (_SOLUTION_TYPE_CODES[info['solution_type']] for info in contents), dtype=np.int8, count=count
+        )
+        
+        category_codes: Dict[str, int] = {}
+        self._kb_category = np.fromiter(
+            (category_codes.setdefault(info.get('category', 'general'), len(category_codes)) for info in contents),
+            dtype=np.int16,
+            count=count
+        )
+    
+    def _gpu_enabled(self) -> bool:
+        """Whether similarity should run on a CUDA device"""
+        if not (CUPY_AVAILABLE and self.use_gpu):
+            return False
+        try:
+            return cupy.cuda.is_available()
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _quantize_int8(vectors: np.ndarray) -> np.ndarray:
+        """Scale each row so its largest component maps to +/-127 and round to int8"""
+        
+        peaks = np.max(np.abs(vectors), axis=-1, keepdims=True)
+        peaks[peaks == 0] = 1.0  # Zero vectors stay zero
+        return np.rint(vectors * (127.0 / peaks)).astype(np.int8)
+    
+    async def _comprehensive_confidence_analysis(self, request: ParsedRequest, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Perform comprehensive multi-factor confidence analysis"""
+        
+        # All factor groups write into one vector laid out by _FACTOR_NAMES
+        factor_values = np.empty(len(_FACTOR_NAMES), dtype=np.float32)
+        
+        # Contextual and historical factors don't depend on the knowledge base match,
+        # so run them while the request embedding is being fetched
+        contextual_task = asyncio.create_task(
+            self._calculate_contextual_factors(request.text, context, factor_values[_CONTEXTUAL_FACTORS])
+        )
+        historical_task = asyncio.create_task(
+            self._calculate_historical_factors(request.words, context, factor_values[_HISTORICAL_FACTORS])
+        )
+        
+        try:
+            # Get request embedding
+            request_embedding = await self._get_embedding(request.text)
             
-            # Combined similarity score
-            combined_sim = (cosine_sim * 0.6 + text_sim * 0.3 + keyword_sim * 0.1)
+            # Calculate similarities
+            top_idx, top_scores, similarities = await self._calculate_advanced_similarities(
+                request_embedding, request.words
+            )
             
-            similarities.append((item_id, combined_sim, {
-                'cosine': cosine_sim,
-                'text': text_sim,
-                'keyword': keyword_sim,
-                'content': self.knowledge_content[item_id]
-            }))
+            # Multi-factor analysis
+            await self._calculate_enhanced_factors(
+                request, top_idx, top_scores, context, factor_values[_ENHANCED_FACTORS]
+            )
+        finally:
+            await asyncio.gather(contextual_task, historical_task)
+        
+        return {
+            'request': request.text,
+            'similarities': similarities[:5],  # Top 5 matches
+            'factor_values': factor_values
+        }
+    
+    async def _calculate_advanced_similarities(self, request_embedding: np.ndarray, request_words: frozenset
+                                               ) -> Tuple[np.ndarray, np.ndarray, List[Tuple[str, float, Dict[str, Any]]]]:
+        """Calculate advanced similarities with multiple metrics
+        
+        Returns the knowledge base indices and combined scores of the top matches, best first,
+        alongside the materialized (item_id, score, details) tuples for those matches.
+        """
+        
+        # Cosine similarity against the whole knowledge base in one matrix-vector product
+        cosine_scores = self._batch_cosine_similarity(request_embedding)
+        
+        # Text-based and keyword overlap; knowledge items are tokenized at load time
+        contents = [self.knowledge_content[item_id] for item_id in self._kb_ids]
+        text_scores = np.fromiter(
+            (self._calculate_text_similarity(request_words, word_set) for word_set in self._kb_word_sets),
+            dtype=np.float32,
+            count=len(contents)
+        )
+        keyword_scores = np.fromiter(
+            (self._calculate_keyword_similarity(request_words, keywords) for keywords in self._kb_keyword_sets),
+            dtype=np.float32,
+            count=len(contents)
+        )
         
-        # Sort by combined similarity
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities
+        # Combined similarity score
+        combined_scores = cosine_scores * 0.6 + text_scores * 0.3 + keyword_scores * 0.1
+        
+        # Partition out the top matches, then sort only those
+        top_k = min(SIMILARITY_TOP_K, len(combined_scores))
+        if top_k == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32), []
+        top_idx = np.argpartition(-combined_scores, top_k - 1)[:top_k]
+        top_idx = top_idx[np.argsort(-combined_scores[top_idx], kind='stable')]
+        
+        similarities = [
+            (self._kb_ids[idx], float(combined_scores[idx]), {
+                'cosine': float(cosine_scores[idx]),
+                'text': float(text_scores[idx]),
+                'keyword': float(keyword_scores[idx]),
+                'content': contents[idx]
+            })
+            for idx in top_idx
+        ]
+        return top_idx, combined_scores[top_idx], similarities
     
-    async def _calculate_enhanced_factors(self, request: str, similarities: List[Tuple], context: Dict[str, Any]) -> Dict[str, float]:
-        """Calculate enhanced confidence factors"""
+    async def _calculate_enhanced_factors(self, request: ParsedRequest, top_idx: np.ndarray, top_scores: np.ndarray,
+                                          context: Dict[str, Any], out: np.ndarray):
+        """Calculate enhanced confidence factors into out"""
         
         # Basic similarity factor
-        best_similarity = similarities[0][1] if similarities else 0.0
+        best_similarity = float(top_scores[0]) if top_scores.size else 0.0
         
         # Consensus factor (multiple good matches)
-        good_matches = [s for _, s, _ in similarities[:10] if s > 0.6]
-        consensus_factor = min(len(good_matches) / 5.0, 1.0)
+        good_matches = int(np.count_nonzero(top_scores[:10] > 0.6))
+        consensus_factor = min(good_matches / 5.0, 1.0)
         
         # Complexity assessment
         complexity_factor = await self._assess_request_complexity_advanced(request)
         
         # Quality of matches
-        quality_factor = await self._assess_match_quality(similarities[:5])
+        quality_factor = await self._assess_match_quality(top_idx[:5], top_scores[:5])
         
         # Diversity factor (different types of matches)
-        diversity_factor = await self._assess_match_diversity(similarities[:5])
+        diversity_factor = await self._assess_match_diversity(top_idx[:5])
         
-        return {
-            'similarity': best_similarity,
-            'consensus': consensus_factor,
-            'complexity': complexity_factor,
-            'quality': quality_factor,
-            'diversity': diversity_factor
-        }
+        out[:] = (best_similarity, consensus_factor, complexity_factor, quality_factor, diversity_factor)
     
-    async def _calculate_contextual_factors(self, request: str, context: Dict[str, Any]) -> Dict[str, float]:
-        """Calculate context-specific confidence factors"""
+    async def _calculate_contextual_factors(self, request: str, context: Dict[str, Any], out: np.ndarray):
+        """Calculate context-specific confidence factors into out"""
         
         # User experience factor
-        user_level = context.get('user_level', 'intermediate')
-        user_factor = {'beginner': 0.7, 'intermediate': 1.0, 'advanced': 1.2}.get(user_level, 1.0)
+        user_factor = self._user_factor.get(context.get('user_level', 'intermediate'), 1.0)
         
         # Priority impact
-        priority = context.get('priority', 'medium')
-        priority_factor = {'low': 1.1, 'medium': 1.0, 'high': 0.9, 'critical': 0.8}.get(priority, 1.0)
+        priority_factor = self._priority_factor.get(context.get('priority', 'medium'), 1.0)
         
         # System context
         system_factor = await self._assess_system_context(context.get('system', ''))
@@ -226,57 +556,51 @@ class EnhancedConfidenceAgent(AgentBase):
         # Time context (if urgent, lower confidence for safety)
         time_factor = 0.9 if context.get('urgent', False) else 1.0
         
-        return {
-            'user_experience': user_factor,
-            'priority_impact': priority_factor,
-            'system_context': system_factor,
-            'time_pressure': time_factor
-        }
+        out[:] = (user_factor, priority_factor, system_factor, time_factor)
     
-    async def _calculate_historical_factors(self, request: str, context: Dict[str, Any]) -> Dict[str, float]:
-        """Calculate factors based on historical performance"""
+    async def _calculate_historical_factors(self, request_words: frozenset, context: Dict[str, Any], out: np.ndarray):
+        """Calculate factors based on historical performance into out"""
         
-        if not self.confidence_history:
-            return {'historical_accuracy': 0.5, 'pattern_strength': 0.0}
+        # Defaults when there is no comparable history
+        out[:] = (0.5, 0.0)
         
-        # Find similar historical requests
-        similar_historical = []
-        request_words = set(request.lower().split())
+        history_size = min(self._hist_cursor, HISTORY_CAPACITY)
+        if history_size == 0:
+            return
         
-        for hist_entry in self.confidence_history[-100:]:  # Last 100 entries
-            hist_words = set(hist_entry['request'].lower().split())
-            overlap = len(request_words & hist_words)
-            if overlap >= 2:
-                similar_historical.append(hist_entry)
+        # Ring positions of the most recent entries, newest first
+        window = min(history_size, HISTORY_WINDOW)
+        positions = (self._hist_cursor - 1 - np.arange(window)) % HISTORY_CAPACITY
         
-        if not similar_historical:
-            return {'historical_accuracy': 0.5, 'pattern_strength': 0.0}
+        # Find similar historical requests
+        similar = np.fromiter(
+            (len(request_words & self._hist_words[pos]) >= 2 for pos in positions),
+            dtype=bool,
+            count=window
+        )
+        similar_positions = positions[similar]
         
-        # Calculate historical accuracy for similar requests
-        accurate_predictions = sum(1 for entry in similar_historical 
-                                 if abs(entry['predicted_confidence'] - entry.get('actual_outcome', 0.5)) < 0.2)
+        if similar_positions.size == 0:
+            return
         
-        historical_accuracy = accurate_predictions / len(similar_historical)
-        pattern_strength = min(1.0, len(similar_historical) / 10)
+        # Calculate historical accuracy for similar requests (missing outcomes count as 0.5)
+        actual = np.nan_to_num(self._hist_actual[similar_positions], nan=0.5)
+        accurate = np.abs(self._hist_predicted[similar_positions] - actual) < 0.2
         
-        return {
-            'historical_accuracy': historical_accuracy,
-            'pattern_strength': pattern_strength
-        }
+        historical_accuracy = float(accurate.mean())
+        pattern_strength = min(1.0, similar_positions.size / 10)
+        
+        out[:] = (historical_accuracy, pattern_strength)
     
     async def _apply_predictive_model(self, analysis: Dict[str, Any]) -> float:
         """Apply machine learning model to predict confidence"""
         
-        factors = analysis['factors']
-        
-        # Calculate weighted score using learned weights
-        weighted_score = 0.0
-        total_weight = 0.0
+        values = self._model_features(analysis['factor_values'])
         
-        for factor_name, weight in self.prediction_model.feature_weights.items():
-            if factor_name in factors:
-                weighted_score += factors[factor_name] * weight
-                total_weight += weight
+        # Calculate weighted score using learned weights of the factors present
+        weights = np.where(self._feature_present, self.prediction_model.weights, 0.0)
+        weighted_score = float(values @ weights)
+        total_weight = float(weights.sum())
         
         # Normalize and add bias
         if total_weight > 0:
@@ -289,14 +613,19 @@ class EnhancedConfidenceAgent(AgentBase):
         # Apply bounds
         return max(0.0, min(1.0, final_score))
     
+    def _model_features(self, factor_values: np.ndarray) -> np.ndarray:
+        """Gather the prediction model's features from a factor vector (0.0 where not computed)"""
+        return np.where(self._feature_present, factor_values[self._feature_index], 0.0).astype(np.float32)
+    
     async def _generate_confidence_reasoning(self, analysis: Dict[str, Any], predicted_confidence: float) -> str:
         """Generate human-readable reasoning for confidence score"""
         
-        factors = analysis['factors']
+        factor_values = analysis['factor_values']
         similarities = analysis['similarities']
         
         # Identify primary confidence drivers
-        primary_factors = sorted(factors.items(), key=lambda x: abs(x[1] - 0.5), reverse=True)[:3]
+        primary_idx = np.argsort(-np.abs(factor_values - 0.5), kind='stable')[:3]
+        primary_factors = [(_FACTOR_NAMES[idx], float(factor_values[idx])) for idx in primary_idx]
         
         reasoning_parts = []
         
@@ -321,45 +650,133 @@ class EnhancedConfidenceAgent(AgentBase):
                 reasoning_parts.append("High-quality knowledge matches available")
         
         # Historical performance
-        hist_factors = analysis.get('historical_insights', {})
-        if hist_factors.get('historical_accuracy', 0) > 0.7:
+        if factor_values[_FACTOR_NAMES.index('historical_accuracy')] > 0.7:
             reasoning_parts.append("Strong historical accuracy for similar requests")
         
         # Combine reasoning
         if reasoning_parts:
             reasoning = ". ".join(reasoning_parts) + "."
         else:
-            reasoning = f"Confidence based on analysis of {len(factors)} factors."
+            reasoning = f"Confidence based on analysis of {len(factor_values)} factors."
         
         return reasoning
     
     async def _get_embedding(self, text: str) -> np.ndarray:
         """Generate enhanced embedding with error handling"""
         
+        cache_key = text.strip()[:8000]  # Limit input length
+        cached = self._get_cached_embedding(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = await self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=text.strip()[:8000]  # Limit input length
-            )
-            return np.array(response.data[0].embedding)
+            async with self._rate_limiter.reserve(len(cache_key) // 4 + 1):
+                response = await self.openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=cache_key
+                )
+            embedding = np.array(response.data[0].embedding, dtype=np.float32)
+            self._cache_embedding(cache_key, embedding)
+            return embedding
         except Exception as e:
-            logging.error(f"Embedding generation failed: {e}")
+            logging.error("Embedding generation failed: %s", e)
             # Return zero vector as fallback
-            return np.zeros(1536)  # Standard embedding size
+            return np.zeros(1536, dtype=np.float32)  # Standard embedding size
     
-    def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
-        """Calculate cosine similarity with error handling"""
+    async def _get_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """Generate embeddings for many texts with batched requests and bounded concurrency"""
+        
+        cache_keys = [text.strip()[:8000] for text in texts]  # Limit input length
+        embeddings = {}
+        missing = []
+        for cache_key in dict.fromkeys(cache_keys):
+            cached = self._get_cached_embedding(cache_key)
+            if cached is None:
+                missing.append(cache_key)
+            else:
+                embeddings[cache_key] = cached
+        
+        batches = [missing[i:i + self.embedding_batch_size] for i in range(0, len(missing), self.embedding_batch_size)]
+        semaphore = asyncio.Semaphore(self.embedding_concurrency)
+        
+        async def embed(batch: List[str]) -> List[np.ndarray]:
+            async with semaphore:
+                return await self._get_embedding_batch(batch)
+        
+        batch_results = await asyncio.gather(*(embed(batch) for batch in batches))
+        for batch, batch_embeddings in zip(batches, batch_results):
+            embeddings.update(zip(batch, batch_embeddings))
+        
+        return [embeddings[cache_key] for cache_key in cache_keys]
+    
+    async def _get_embedding_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """Generate embeddings for a batch of texts in a single API request"""
         
         try:
-            norm_a = np.linalg.norm(a)
-            norm_b = np.linalg.norm(b)
-            
-            if norm_a == 0 or norm_b == 0:
-                return 0.0
-            
-            return np.dot(a, b) / (norm_a * norm_b)
-        except Exception:
-            return 0.0
+            async with self._rate_limiter.reserve(sum(len(text) for text in texts) // 4 + 1):
+                response = await self.openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=texts
+                )
+            if len(response.data) != len(texts):
+                raise ValueError(f"expected {len(texts)} embeddings, got {len(response.data)}")
+            embeddings = [np.array(item.embedding, dtype=np.float32) for item in response.data]
+        except Exception as e:
+            logging.error("Batch embedding generation failed, falling back to single requests: %s", e)
+            return [await self._get_embedding(text) for text in texts]
+        
+        for text, embedding in zip(texts, embeddings):
+            self._cache_embedding(text, embedding)
+        return embeddings
+    
+    def _get_cached_embedding(self, cache_key: str) -> Optional[np.ndarray]:
+        """Look up an embedding in the LRU cache"""
+        
+        embedding = self._embedding_cache.get(cache_key)
+        if embedding is not None:
+            self._embedding_cache.move_to_end(cache_key)
+        return embedding
+    
+    def _cache_embedding(self, cache_key: str, embedding: np.ndarray):
+        """Store an embedding in the LRU cache, evicting the least recently used entries"""
+        
+        # Never cache the zero-vector fallback returned on API failures
+        if self.embedding_cache_size <= 0 or not embedding.any():
+            return
+        
+        self._embedding_cache[cache_key] = embedding
+        self._embedding_cache.move_to_end(cache_key)
+        while len(self._embedding_cache) > self.embedding_cache_size:
+            self._embedding_cache.popitem(last=False)
+    
+    def _batch_cosine_similarity(self, request_embedding: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the request against every knowledge base item"""
+        
+        if not self._kb_ids:
+            return np.empty(0, dtype=np.float32)
+        
+        query = np.asarray(request_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return np.zeros(len(self._kb_ids), dtype=np.float32)
+        
+        # GPU path: one float16 GEMV on the device; only the N scores come back
+        if self._kb_matrix_dev is not None:
+            with self._gpu_stream:
+                query_dev = cupy.asarray(query / query_norm, dtype=cupy.float16)
+                scores_dev = self._kb_matrix_dev @ query_dev
+                scores = cupy.asnumpy(scores_dev, stream=self._gpu_stream)
+            return scores.astype(np.float32)
+        
+        # Cosine is scale invariant, so the per-row quantization scales never need undoing
+        if SIMSIMD_AVAILABLE:
+            distances = simsimd.cdist(self._quantize_int8(query[None, :]), self._kb_int8, metric='cosine')
+            scores = 1.0 - np.asarray(distances, dtype=np.float32)[0]
+        else:
+            scores = (self._kb_int8 @ query) / (self._kb_int8_norms * query_norm)
+        
+        scores[self._kb_int8_norms == 0] = 0.0
+        return scores.astype(np.float32, copy=False)
     
     async def _process_knowledge_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """Enhanced processing of knowledge base items"""
@@ -371,116 +788,90 @@ class EnhancedConfidenceAgent(AgentBase):
         title = item.get('title', '')
         
         # Add computed metadata
+        content_lower = content.lower()
+        content_tokens = _tokenize(content_lower)
         processed['word_count'] = len(content.split())
-        processed['has_steps'] = 'step' in content.lower() or any(str(i) in content for i in range(1, 10))
-        processed['complexity_indicators'] = sum(1 for word in ['advanced', 'complex', 'difficult', 'expert'] 
-                                               if word in content.lower())
-        processed['solution_type'] = await self._classify_solution_type(content)
+        processed['has_steps'] = bool(self._STEP_WORDS & content_tokens) or not self._STEP_DIGITS.isdisjoint(content)
+        processed['complexity_indicators'] = len(self._ADVANCED_WORDS & content_tokens)
+        processed['solution_type'] = await self._classify_solution_type(content_lower, content_tokens)
         
         return processed
     
-    async def _classify_solution_type(self, content: str) -> str:
+    async def _classify_solution_type(self, content_lower: str, content_tokens: frozenset) -> str:
         """Classify the type of solution in knowledge base item"""
         
-        content_lower = content.lower()
-        
-        if any(word in content_lower for word in ['step', 'procedure', 'guide']):
+        if self._PROCEDURAL & content_tokens:
             return 'procedural'
-        elif any(word in content_lower for word in ['troubleshoot', 'problem', 'issue', 'error']):
+        elif self._TROUBLE & content_tokens:
             return 'troubleshooting'
-        elif any(word in content_lower for word in ['configure', 'setup', 'install']):
+        elif self._CONFIGURATION & content_tokens:
             return 'configuration'
-        elif any(word in content_lower for word in ['explain', 'what is', 'definition']):
+        elif self._INFORMATIONAL & content_tokens or 'what is' in content_lower:
             return 'informational'
         else:
             return 'general'
     
-    async def _calculate_text_similarity(self, text1: str, text2: str) -> float:
-        """Calculate text similarity using word overlap"""
-        
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+    def _calculate_text_similarity(self, words1: frozenset, words2: frozenset) -> float:
+        """Calculate text similarity using word overlap of pre-tokenized texts"""
         
         if not words1 or not words2:
             return 0.0
         
         intersection = len(words1 & words2)
-        union = len(words1 | words2)
+        union = len(words1) + len(words2) - intersection
         
         return intersection / union if union > 0 else 0.0
     
-    async def _calculate_keyword_similarity(self, request: str, kb_item: Dict[str, Any]) -> float:
-        """Calculate similarity based on keywords"""
-        
-        request_words = set(request.lower().split())
-        kb_keywords = set(kb_item.get('keywords', []))
+    def _calculate_keyword_similarity(self, request_words: frozenset, kb_keywords: frozenset) -> float:
+        """Calculate similarity based on lowercased knowledge item keywords"""
         
         if not kb_keywords:
             return 0.0
         
-        matches = len(request_words & kb_keywords)
-        return matches / len(kb_keywords) if kb_keywords else 0.0
+        return len(request_words & kb_keywords) / len(kb_keywords)
     
-    async def _assess_request_complexity_advanced(self, request: str) -> float:
+    async def _assess_request_complexity_advanced(self, request: ParsedRequest) -> float:
         """Advanced complexity assessment"""
         
         complexity_indicators = {
-            'length': len(request.split()) / 20,  # Longer = more complex
-            'technical_terms': sum(1 for word in ['api', 'integration', 'configuration', 'database', 'server'] 
-                                 if word in request.lower()) / 5,
-            'uncertainty_words': sum(1 for word in ['somehow', 'maybe', 'unclear', 'confusing'] 
-                                   if word in request.lower()) / 4,
-            'multiple_issues': len([s for s in request.split('.') if s.strip()]) / 3
+            'length': len(request.lower.split()) / 20,  # Longer = more complex
+            'technical_terms': len(self._TECHNICAL_TERMS & request.tokens) / 5,
+            'uncertainty_words': len(self._UNCERTAINTY_WORDS & request.tokens) / 4,
+            'multiple_issues': len([s for s in request.text.split('.') if s.strip()]) / 3
         }
         
         avg_complexity = sum(complexity_indicators.values()) / len(complexity_indicators)
         return 1.0 - min(1.0, avg_complexity)  # Invert: high complexity = low confidence
     
-    async def _assess_match_quality(self, top_matches: List[Tuple]) -> float:
+    async def _assess_match_quality(self, top_idx: np.ndarray, top_scores: np.ndarray) -> float:
         """Assess quality of knowledge base matches"""
         
-        if not top_matches:
+        if not top_idx.size:
             return 0.0
         
-        quality_scores = []
-        for _, similarity, metadata in top_matches:
-            content_info = metadata.get('content', {})
-            
-            quality = similarity  # Base on similarity
-            
-            # Boost for procedural content
-            if content_info.get('solution_type') == 'procedural':
-                quality += 0.1
-            
-            # Boost for substantial content
-            if content_info.get('word_count', 0) > 100:
-                quality += 0.05
-            
-            # Reduce for very complex content
-            if content_info.get('complexity_indicators', 0) > 2:
-                quality -= 0.1
-            
-            quality_scores.append(max(0.0, min(1.0, quality)))
+        quality = top_scores.astype(np.float32)  # Base on similarity
+        
+        # Boost for procedural content
+        quality += 0.1 * (self._kb_soltype[top_idx] == _PROCEDURAL_CODE)
         
-        return sum(quality_scores) / len(quality_scores)
+        # Boost for substantial content
+        quality += 0.05 * (self._kb_wordcount[top_idx] > 100)
+        
+        # Reduce for very complex content
+        quality -= 0.1 * (self._kb_complexity[top_idx] > 2)
+        
+        return float(np.clip(quality, 0.0, 1.0).mean())
     
-    async def _assess_match_diversity(self, top_matches: List[Tuple]) -> float:
+    async def _assess_match_diversity(self, top_idx: np.ndarray) -> float:
         """Assess diversity of match types"""
         
-        if not top_matches:
+        if not top_idx.size:
             return 0.0
         
-        solution_types = set()
-        categories = set()
-        
-        for _, _, metadata in top_matches:
-            content_info = metadata.get('content', {})
-            solution_types.add(content_info.get('solution_type', 'general'))
-            categories.add(content_info.get('category', 'general'))
-        
         # More diverse matches = higher confidence
-        type_diversity = len(solution_types) / min(5, len(top_matches))
-        category_diversity = len(categories) / min(5, len(top_matches))
+        denominator = min(5, top_idx.size)
+        type_diversity = np.unique(self._kb_soltype[top_idx]).size / denominator
+        category_diversity = np.unique(self._kb_category[top_idx]).size / denominator
         
         return (type_diversity + category_diversity) / 2
     
@@ -491,59 +882,55 @@ class EnhancedConfidenceAgent(AgentBase):
             return 0.8  # Neutral
         
         # Known systems get slight boost
-        known_systems = ['windows', 'mac', 'linux', 'android', 'ios']
-        if any(sys in system_info.lower() for sys in known_systems):
+        if self._KNOWN_SYSTEMS & _tokenize(system_info.lower()):
             return 1.0
         
         return 0.9  # Slight reduction for unknown systems
     
-    async def _store_confidence_decision(self, request: str, analysis: Dict[str, Any], confidence: float):
+    async def _store_confidence_decision(self, request: ParsedRequest, analysis: Dict[str, Any], confidence: float):
         """Store confidence decision for learning"""
         
-        decision_record = {
-            'timestamp': datetime.now().isoformat(),
-            'request': request,
-            'request_hash': hash(request),
-            'predicted_confidence': confidence,
-            'analysis_factors': analysis['factors'],
-            'top_similarity': analysis['similarities'][0][1] if analysis['similarities'] else 0.0
-        }
+        pos = self._hist_cursor % HISTORY_CAPACITY
         
-        self.confidence_history.append(decision_record)
+        self._hist_request_hash[pos] = request.request_hash
+        self._hist_predicted[pos] = confidence
+        self._hist_actual[pos] = np.nan
+        self._hist_words[pos] = request.words
+        self._hist_factors[pos] = self._model_features(analysis['factor_values'])
         
-        # Keep recent history
-        if len(self.confidence_history) > 2000:
-            self.confidence_history = self.confidence_history[-2000:]
+        self._hist_cursor += 1
     
     def update_prediction_accuracy(self, request_hash: int, actual_outcome: float):
         """Update model based on actual outcomes"""
         
-        # Find corresponding prediction
-        for entry in reversed(self.confidence_history):
-            if entry['request_hash'] == request_hash:
-                entry['actual_outcome'] = actual_outcome
-                
-                # Calculate prediction error
-                error = abs(entry['predicted_confidence'] - actual_outcome)
-                accuracy = 1.0 - error
-                
-                self.prediction_model.accuracy_history.append(accuracy)
-                
-                # Update feature weights based on error (simple gradient descent)
-                learning_rate = 0.01
-                for factor_name, factor_value in entry['analysis_factors'].items():
-                    if factor_name in self.prediction_model.feature_weights:
-                        # Adjust weight based on error direction
-                        if entry['predicted_confidence'] > actual_outcome:
-                            # Over-predicted, reduce weight
-                            self.prediction_model.feature_weights[factor_name] *= (1 - learning_rate * factor_value)
-                        else:
-                            # Under-predicted, increase weight
-                            self.prediction_model.feature_weights[factor_name] *= (1 + learning_rate * factor_value)
-                
-                # Keep recent accuracy history
-                if len(self.prediction_model.accuracy_history) > 1000:
-                    self.prediction_model.accuracy_history = self.prediction_model.accuracy_history[-1000:]
-                
-                self.prediction_model.last_updated = datetime.now()
-                break
\ No newline at end of file
+        history_size = min(self._hist_cursor, HISTORY_CAPACITY)
+        
+        # Find corresponding prediction (most recent match wins)
+        matches = np.flatnonzero(self._hist_request_hash[:history_size] == request_hash)
+        if matches.size == 0:
+            return
+        
+        ages = (self._hist_cursor - 1 - matches) % HISTORY_CAPACITY
+        pos = matches[np.argmin(ages)]
+        
+        self._hist_actual[pos] = actual_outcome
+        predicted_confidence = float(self._hist_predicted[pos])
+        
+        # Calculate prediction error
+        error = abs(predicted_confidence - actual_outcome)
+        accuracy = 1.0 - error
+        
+        # Keep recent accuracy history; the deque drops the oldest entry at capacity
+        accuracy_history = self.prediction_model.accuracy_history
+        if len(accuracy_history) == accuracy_history.maxlen:
+            self._accuracy_sum -= accuracy_history[0]
+        accuracy_history.append(accuracy)
+        self._accuracy_sum += accuracy
+        
+        # Update feature weights based on error (simple gradient descent);
+        # over-prediction shrinks the weights of active factors, under-prediction grows them
+        learning_rate = 0.01
+        direction = -1.0 if predicted_confidence > actual_outcome else 1.0
+        self.prediction_model.weights *= 1 + direction * learning_rate * self._hist_factors[pos]
+        
+        self.prediction_model.last_updated = datetime.now()
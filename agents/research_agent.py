@@ -3,18 +3,308 @@ Advanced Research Agent with Multi-Source Intelligence and Learning
 """
 
 import json
+import re
 import asyncio
-from typing import Dict, Any, List, Optional
+import copy
+import hashlib
+from collections import Counter, OrderedDict, deque
+from functools import lru_cache
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Set, Tuple
 from datetime import datetime
 import logging
-import sys
-import os
 
-# Add shared agents to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared_agents'))
+import numpy as np
+
+# Optional fast non-cryptographic hashing for solution and query ids
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Optional faster JSON encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from shared_agents.core.agent_factory import AgentBase, AgentResponse, AgentCapability
 from core.ai_tracking import track_openai_completion
+from core.semantic_cache import SemanticCache
+from core.openai_client import get_openai_rate_limiter
+
+# Learning history bounds for long-running agents
+RESEARCH_HISTORY_SIZE = 1000
+SOLUTION_HISTORY_SIZE = 5000
+
+# Contexts whose analysis stays on the primary model instead of the cheaper one
+_PRIMARY_MODEL_PRIORITIES = frozenset({'high', 'critical', 'immediate'})
+
+# Results used when a research strategy fails
+_PATTERN_FALLBACK = {'patterns': [], 'confidence': 0.0}
+_SEMANTIC_FALLBACK = {
+    'primary_action': 'seek_help',
+    'object_system': 'unknown',
+    'problem_type': 'general',
+    'confidence': 0.3
+}
+_CONTEXTUAL_FALLBACK = {
+    'deeper_intent': 'accomplish_task',
+    'pain_points': ['complexity', 'time_pressure'],
+    'success_criteria': ['problem_resolved'],
+    'confidence': 0.4
+}
+_ADAPTIVE_FALLBACK = {'learning_insights': [], 'confidence': 0.0}
+
+
+def _analysis_schema(string_fields: Tuple[str, ...], list_fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Strict JSON schema for an analysis object with a confidence score"""
+    properties = {field: {'type': 'string'} for field in string_fields}
+    properties.update({field: {'type': 'array', 'items': {'type': 'string'}} for field in list_fields})
+    properties['confidence'] = {'type': 'number'}
+    return {'type': 'object', 'properties': properties, 'required': list(properties), 'additionalProperties': False}
+
+def _json_schema_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Structured-output response_format for the given schema"""
+    return {'type': 'json_schema', 'json_schema': {'name': name, 'strict': True, 'schema': schema}}
+
+_SEMANTIC_SCHEMA = _analysis_schema(
+    ('primary_action', 'object_system', 'problem_type', 'technical_domain', 'skill_level', 'emotional_state'),
+    ('context_clues',)
+)
+_CONTEXTUAL_SCHEMA = _analysis_schema(
+    ('deeper_intent',),
+    ('pain_points', 'system_considerations', 'follow_up_questions', 'success_criteria', 'potential_issues')
+)
+_SEMANTIC_FORMAT = _json_schema_format('semantic_decomposition', _SEMANTIC_SCHEMA)
+_CONTEXTUAL_FORMAT = _json_schema_format('contextual_reasoning', _CONTEXTUAL_SCHEMA)
+_RESEARCH_ANALYSIS_FORMAT = _json_schema_format('research_analysis', {
+    'type': 'object',
+    'properties': {'semantic': _SEMANTIC_SCHEMA, 'contextual': _CONTEXTUAL_SCHEMA},
+    'required': ['semantic', 'contextual'],
+    'additionalProperties': False
+})
+
+# Static instruction prefixes, sent verbatim as the system message so provider
+# prompt caching can reuse them; per-request details follow in the user message
+_SEMANTIC_STEPS = """1. Primary action/intent (what user wants to accomplish)
+2. Object/system (what they're working with)
+3. Problem type (error, configuration, how-to, etc.)
+4. Context clues (urgency, complexity indicators)
+5. Technical domain (networking, software, hardware, etc.)
+6. Skill level indicators
+7. Emotional state indicators"""
+
+_CONTEXTUAL_STEPS = """1. What might the user really be trying to accomplish? (deeper intent)
+2. What are likely pain points for a user at the given level?
+3. What system-specific considerations apply?
+4. What are potential follow-up questions?
+5. What success criteria would the user have?
+6. What could go wrong with standard solutions?"""
+
+_SEMANTIC_INSTRUCTIONS = f"""Decompose the support query into semantic components.
+
+Analyze and extract:
+{_SEMANTIC_STEPS}
+
+Provide these components and a confidence level."""
+
+_CONTEXTUAL_INSTRUCTIONS = f"""Analyze the support request with contextual reasoning.
+
+Provide contextual insights:
+{_CONTEXTUAL_STEPS}
+
+Return a detailed analysis with a confidence level."""
+
+_RESEARCH_ANALYSIS_INSTRUCTIONS = f"""Analyze the support request in two parts.
+
+semantic - decompose the query into semantic components:
+{_SEMANTIC_STEPS}
+
+contextual - apply contextual reasoning:
+{_CONTEXTUAL_STEPS}
+
+Give each part a confidence level between 0.0 and 1.0."""
+
+_SOLUTION_INSTRUCTIONS = """Generate a comprehensive solution based on extensive research.
+
+Generate a detailed solution that includes:
+1. Clear step-by-step instructions appropriate for the user's level
+2. Explanation of why this approach works
+3. Potential issues and troubleshooting
+4. Success validation steps
+5. Alternative approaches if main solution fails
+6. Estimated time and difficulty
+7. Prerequisites and warnings
+
+Format as JSON with:
+- title: Clear solution title
+- summary: Brief overview
+- steps: Detailed step array with title, description, commands, expected_result
+- troubleshooting: Common issues and fixes
+- alternatives: Alternative approaches
+- estimated_time: Time estimate
+- difficulty_level: easy/medium/hard
+- prerequisites: Requirements
+- warnings: Important cautions
+- success_criteria: How to verify success
+- confidence_score: Your confidence in this solution (0.0-1.0)
+
+Be comprehensive, accurate, and user-focused."""
+
+# Per-request prompt skeletons, filled with format_map after the static prefix
+_EXPANSION_PROMPT = """Expand this search query to find more relevant solutions.
+
+Generate 3-5 related search terms that would help find solutions for this issue.
+Focus on:
+- Technical keywords and synonyms
+- Related problem areas
+- Alternative descriptions
+- Root cause possibilities
+
+Return as a single expanded search string.
+
+Original Query: "{query}"
+Context: {context}"""
+
+_REQUEST_DETAILS = """Query: "{query}"
+User Level: {user_level}
+System: {system}
+Priority: {priority}"""
+
+_SOLUTION_DETAILS = """Original Query: "{query}"
+User Level: {user_level}
+Research Confidence: {confidence:.2f}
+
+Research Findings:
+- Knowledge Sources Found: {knowledge_sources}
+- Pattern Matches: {pattern_matches}
+- Semantic Analysis: {semantic}
+- Contextual Insights: {contextual}"""
+
+def _compact_json(value: Any) -> str:
+    """Canonical compact JSON for prompts and cache keys (models don't need indentation)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(value, separators=(',', ':'), sort_keys=True, ensure_ascii=False, default=str)
+
+def _parse_json(content: str) -> Any:
+    """Decode a model's JSON response"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+# Per-generation metadata left out of a solution's id so identical solutions share one
+_VOLATILE_SOLUTION_FIELDS = frozenset({'solution_id', 'generated_at', 'research_synthesis', 'agent_confidence'})
+
+def _stable_digest(data: bytes) -> str:
+    """128-bit hex digest that is identical across processes and restarts"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+_JSON_FENCE = re.compile(r'(?:```|~~~)(?:json)?\s*(\{.*?\})\s*(?:```|~~~)', re.DOTALL)
+
+def _extract_json_object(content: str) -> str:
+    """Locate the JSON object in model output that may be fenced or wrapped in prose"""
+    
+    match = _JSON_FENCE.search(content)
+    if match:
+        return match.group(1)
+    
+    # Unfenced: scan for the first balanced {...}, ignoring braces inside strings
+    start = content.find('{')
+    if start < 0:
+        return content
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for position in range(start, len(content)):
+        char = content[position]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return content[start:position + 1]
+    
+    return content[start:]
+
+_STEPS_ARRAY_PATTERN = re.compile(r'"steps"\s*:\s*\[')
+
+class _StepStreamParser:
+    """Incrementally extracts completed items of a streamed solution's steps array"""
+    
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position: Optional[int] = None  # Next unread offset inside the steps array
+        self._done = False
+    
+    def feed(self, text: str) -> List[Any]:
+        """Add streamed text and return any steps completed by it"""
+        
+        self._buffer += text
+        if self._done:
+            return []
+        
+        if self._position is None:
+            match = _STEPS_ARRAY_PATTERN.search(self._buffer)
+            if not match:
+                return []
+            self._position = match.end()
+        
+        steps = []
+        while True:
+            position = self._position
+            while position < len(self._buffer) and self._buffer[position] in ' \t\r\n,':
+                position += 1
+            if position >= len(self._buffer):
+                break
+            if self._buffer[position] == ']':
+                self._done = True
+                break
+            
+            try:
+                step, end = self._decoder.raw_decode(self._buffer, position)
+            except json.JSONDecodeError:
+                break  # Item still incomplete
+            
+            # Require the following delimiter so partially streamed scalars are not taken early
+            if end >= len(self._buffer.rstrip()):
+                break
+            steps.append(step)
+            self._position = end
+        
+        return steps
+
+_WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+def _tokenize(text: str) -> frozenset:
+    """Lowercased alphanumeric tokens, so punctuation never splits or pads a word"""
+    return frozenset(_WORD_PATTERN.findall(text.lower()))
+
+# Search documents recur across queries, so their token sets are worth caching
+_DOCUMENT_TOKEN_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=_DOCUMENT_TOKEN_CACHE_SIZE)
+def _document_tokens(content: str) -> frozenset:
+    """Tokens of a search result's content and title"""
+    return _tokenize(content)
+
+# Prompt templates with their own semantic cache so responses never cross templates
+_CACHED_TEMPLATES = ('query_expansion', 'semantic_decomposition', 'contextual_reasoning', 'solution')
 
 class AdvancedResearchAgent(AgentBase):
     """
@@ -35,11 +325,33 @@ class AdvancedResearchAgent(AgentBase):
         
         self.openai_client = config['openai_client']
         self.model = config.get('model', 'gpt-4o')
+        self.cheap_model = config.get('cheap_model', 'gpt-4o-mini')  # Query expansion and analysis tagging
         self.search_system = config.get('search_system')
+        self._rate_limiter = config.get('rate_limiter') or get_openai_rate_limiter()
+        self.embedding_model = config.get('embedding_model', 'text-embedding-3-small')
+        self.stream_idle_timeout = config.get('stream_idle_timeout', 5.0)
+        self.min_solution_confidence = config.get('min_solution_confidence', 0.15)
+        
+        # Semantic caches in front of the LLM calls, one per prompt template
+        self._semantic_caches = {}
+        if config.get('semantic_cache_enabled', True):
+            self._semantic_caches = {
+                template: SemanticCache(
+                    threshold=config.get('semantic_cache_threshold', 0.95),
+                    ttl_seconds=config.get('semantic_cache_ttl', 3600),
+                    max_entries=config.get('semantic_cache_size', 1000)
+                )
+                for template in _CACHED_TEMPLATES
+            }
         
         # Learning components
-        self.solution_effectiveness = {}
-        self.research_patterns = []
+        self.solution_effectiveness: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # Least recently updated first
+        self.solution_history_size = config.get('solution_history_size', SOLUTION_HISTORY_SIZE)
+        self._token_index: Dict[str, Set[str]] = {}  # query token -> successful solution ids
+        self._successful_ids: Set[str] = set()  # Solutions eligible for pattern research
+        self._trait_counters: Dict[str, Counter] = {}  # trait -> value counts over successful solutions
+        self._successful_solution_count = 0
+        self.research_patterns = deque(maxlen=RESEARCH_HISTORY_SIZE)
         self.synthesis_history = []
         
         # Research strategies
@@ -50,7 +362,8 @@ class AdvancedResearchAgent(AgentBase):
             'adaptive_reasoning': {'weight': 0.1, 'description': 'Adaptive reasoning based on context'}
         }
     
-    async def execute(self, input_data: Dict[str, Any]) -> AgentResponse:
+    async def execute(self, input_data: Dict[str, Any],
+                      on_step: Optional[Callable[[Any], None]] = None) -> AgentResponse:
         """Execute advanced research and solution generation"""
         
         query = input_data.get('query', '')
@@ -61,20 +374,27 @@ class AdvancedResearchAgent(AgentBase):
         if not query:
             raise ValueError("No query provided for research")
         
+        # One tokenization, embedding and context serialization per request, shared by every strategy
+        query_tokens = _tokenize(query)
+        query_embedding = await self._get_query_embedding(query)
+        context_json = _compact_json(context) if context else ''
+        
         # Multi-strategy research approach
-        research_results = await self._conduct_comprehensive_research(query, context, knowledge_base_results)
+        research_results = await self._conduct_comprehensive_research(
+            query, context, knowledge_base_results, query_embedding, context_json, query_tokens
+        )
         
         # Synthesize findings
-        synthesis = await self._synthesize_research_findings(research_results, context)
+        synthesis = self._synthesize_research_findings(research_results, context)
         
         # Generate solution
-        solution = await self._generate_intelligent_solution(query, synthesis, context)
+        solution = await self._generate_intelligent_solution(query, synthesis, context, query_embedding, on_step)
         
         # Validate and enhance solution
-        validated_solution = await self._validate_and_enhance_solution(solution, context)
+        validated_solution = self._validate_and_enhance_solution(solution, context)
         
         # Store for learning
-        await self._store_research_session(query, research_results, validated_solution)
+        self._store_research_session(query, research_results, validated_solution)
         
         return AgentResponse(
             success=True,
@@ -88,120 +408,219 @@ class AdvancedResearchAgent(AgentBase):
             }
         )
     
+    async def execute_stream(self, input_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Execute research, yielding solution steps as they are generated and then the final response"""
+        
+        steps: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self.execute(input_data, on_step=steps.put_nowait))
+        
+        try:
+            while not task.done():
+                next_step = asyncio.ensure_future(steps.get())
+                await asyncio.wait({next_step, task}, return_when=asyncio.FIRST_COMPLETED)
+                if next_step.done():
+                    yield {'type': 'step', 'step': next_step.result()}
+                else:
+                    next_step.cancel()
+            
+            while not steps.empty():
+                yield {'type': 'step', 'step': steps.get_nowait()}
+            
+            yield {'type': 'result', 'response': task.result()}
+            
+        finally:
+            task.cancel()
+    
     async def _conduct_comprehensive_research(self, query: str, context: Dict[str, Any], 
-                                           kb_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+                                           kb_results: List[Dict[str, Any]],
+                                           query_embedding: Optional[np.ndarray] = None,
+                                           context_json: Optional[str] = None,
+                                           query_tokens: Optional[frozenset] = None) -> Dict[str, Any]:
         """Conduct multi-strategy research"""
         
-        research_results = {}
+        if query_tokens is None:
+            query_tokens = _tokenize(query)
         
         # Strategy 1: Knowledge base search
         if self.search_system:
-            research_results['knowledge_base'] = await self._search_knowledge_base(query, context)
+            knowledge_base_task = self._search_knowledge_base(
+                query, context, query_embedding, context_json, query_tokens
+            )
         else:
-            research_results['knowledge_base'] = kb_results
+            knowledge_base_task = self._completed(kb_results)
         
-        # Strategy 2: Pattern matching from history
-        research_results['pattern_match'] = await self._pattern_based_research(query, context)
+        # Run all strategies concurrently; the LLM-backed ones dominate latency
+        knowledge_base, pattern_match, analysis, adaptive_insights = await asyncio.gather(
+            knowledge_base_task,
+            self._pattern_based_research(query, context, query_tokens),  # Strategy 2: Pattern matching from history
+            self._semantic_and_contextual_analysis(query, context, query_embedding),  # Strategies 3 and 4
+            self._apply_adaptive_learning(query, context),         # Strategy 5: Adaptive learning application
+            return_exceptions=True
+        )
+        
+        if isinstance(analysis, BaseException):
+            semantic_analysis = contextual_insights = analysis
+        else:
+            semantic_analysis, contextual_insights = analysis
         
-        # Strategy 3: Semantic decomposition
-        research_results['semantic_analysis'] = await self._semantic_decomposition(query)
+        return {
+            'knowledge_base': self._strategy_result('knowledge_base', knowledge_base, []),
+            'pattern_match': self._strategy_result('pattern_match', pattern_match, _PATTERN_FALLBACK),
+            'semantic_analysis': self._strategy_result('semantic_analysis', semantic_analysis, _SEMANTIC_FALLBACK),
+            'contextual_insights': self._strategy_result('contextual_insights', contextual_insights, _CONTEXTUAL_FALLBACK),
+            'adaptive_insights': self._strategy_result('adaptive_insights', adaptive_insights, _ADAPTIVE_FALLBACK)
+        }
+    
+    @staticmethod
+    async def _completed(value: Any) -> Any:
+        """Wrap an already-available value so it can be gathered with the other strategies"""
+        return value
+    
+    @staticmethod
+    def _strategy_result(strategy: str, result: Any, fallback: Any) -> Any:
+        """Replace a failed strategy's exception with a copy of its fallback result"""
+        if isinstance(result, BaseException):
+            logging.error(f"Research strategy {strategy} failed: {result}")
+            return copy.deepcopy(fallback)
+        return result
+    
+    async def _get_query_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Embed the normalized query for semantic cache lookups (None disables caching)"""
         
-        # Strategy 4: Contextual reasoning
-        research_results['contextual_insights'] = await self._contextual_reasoning(query, context)
+        if not self._semantic_caches:
+            return None
         
-        # Strategy 5: Adaptive learning application
-        research_results['adaptive_insights'] = await self._apply_adaptive_learning(query, context)
+        try:
+            embedding_input = ' '.join(query.lower().split())
+            async with self._rate_limiter.reserve(len(embedding_input) // 4 + 1):
+                response = await self.openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=embedding_input
+                )
+            return np.asarray(response.data[0].embedding, dtype=np.float32)
+            
+        except Exception as e:
+            logging.warning(f"Query embedding failed, bypassing semantic cache: {e}")
+            return None
+    
+    def _reserve(self, messages: List[Dict[str, str]], max_tokens: int):
+        """Rate limiter reservation sized from the prompt length (~4 chars/token) plus the completion budget"""
+        prompt_chars = sum(len(message['content']) for message in messages)
+        return self._rate_limiter.reserve(prompt_chars // 4 + max_tokens)
+    
+    def _cached_response(self, template: str, key: str, query_embedding: Optional[np.ndarray]) -> Optional[Any]:
+        """Look up a cached response for a similar query under the same template and key"""
         
-        return research_results
+        cache = self._semantic_caches.get(template)
+        if cache is None or query_embedding is None:
+            return None
+        return cache.get(key, query_embedding)
     
-    async def _search_knowledge_base(self, query: str, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _cache_response(self, template: str, key: str, query_embedding: Optional[np.ndarray], response: Any):
+        """Store a successfully parsed response for later similar queries"""
+        
+        cache = self._semantic_caches.get(template)
+        if cache is not None and query_embedding is not None:
+            cache.put(key, query_embedding, response)
+    
+    async def _search_knowledge_base(self, query: str, context: Dict[str, Any],
+                                     query_embedding: Optional[np.ndarray] = None,
+                                     context_json: Optional[str] = None,
+                                     query_tokens: Optional[frozenset] = None) -> List[Dict[str, Any]]:
         """Enhanced knowledge base search with intelligent query expansion"""
         
         if not self.search_system:
             return []
         
-        try:
-            # Primary search
-            primary_results = await self.search_system.assisted_search(
-                vector_store_ids=['technical_solutions', 'troubleshooting_guides'],
-                query=query,
-                num_results=10
-            )
-            
-            # Query expansion for broader search
-            expanded_query = await self._generate_expanded_query(query, context)
-            secondary_results = await self.search_system.assisted_search(
+        async def expanded_search():
+            # Query expansion for broader search; only the secondary search waits on it
+            expanded_query = await self._generate_expanded_query(query, context, query_embedding, context_json)
+            return await self.search_system.assisted_search(
                 vector_store_ids=['configuration_guides', 'best_practices'],
                 query=expanded_query,
                 num_results=5
             )
+        
+        try:
+            # Primary search runs alongside expansion + secondary search
+            primary_results, secondary_results = await asyncio.gather(
+                self.search_system.assisted_search(
+                    vector_store_ids=['technical_solutions', 'troubleshooting_guides'],
+                    query=query,
+                    num_results=10
+                ),
+                expanded_search()
+            )
             
             # Combine and rank results
             all_results = (primary_results or []) + (secondary_results or [])
-            return await self._rank_search_results(all_results, query)
+            return self._rank_search_results(all_results, query, query_tokens)
             
         except Exception as e:
             logging.error(f"Knowledge base search failed: {e}")
             return []
     
-    async def _generate_expanded_query(self, query: str, context: Dict[str, Any]) -> str:
+    async def _generate_expanded_query(self, query: str, context: Dict[str, Any],
+                                       query_embedding: Optional[np.ndarray] = None,
+                                       context_json: Optional[str] = None) -> str:
         """Generate expanded search query using AI"""
         
-        prompt = f"""Expand this search query to find more relevant solutions:
-
-Original Query: "{query}"
-Context: {json.dumps(context, indent=2) if context else "None"}
-
-Generate 3-5 related search terms that would help find solutions for this issue.
-Focus on:
-- Technical keywords and synonyms
-- Related problem areas
-- Alternative descriptions
-- Root cause possibilities
-
-Return as a single expanded search string."""
+        if context_json is None:
+            context_json = _compact_json(context) if context else ''
+        
+        cached = self._cached_response('query_expansion', context_json, query_embedding)
+        if cached is not None:
+            return cached
+        
+        prompt = _EXPANSION_PROMPT.format_map({'query': query, 'context': context_json or 'None'})
 
         try:
-            response = await self.openai_client.chat.completions.create(
-                model='gpt-4o-mini',
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=200
-            )
+            messages = [{"role": "user", "content": prompt}]
+            async with self._reserve(messages, 200):
+                response = await self.openai_client.chat.completions.create(
+                    model=self.cheap_model,
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=200
+                )
 
             # Track AI usage
             track_openai_completion(response, agent_type='research')
 
-            return response.choices[0].message.content.strip()
+            expanded_query = response.choices[0].message.content.strip()
+            self._cache_response('query_expansion', context_json, query_embedding, expanded_query)
+            return expanded_query
             
         except Exception as e:
             logging.error(f"Query expansion failed: {e}")
             return query
     
-    async def _pattern_based_research(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _pattern_based_research(self, query: str, context: Dict[str, Any],
+                                      query_tokens: Optional[frozenset] = None) -> Dict[str, Any]:
         """Find patterns from previous successful solutions"""
         
-        if not self.solution_effectiveness:
-            return {'patterns': [], 'confidence': 0.0}
+        if not self._successful_ids:
+            return copy.deepcopy(_PATTERN_FALLBACK)
         
-        # Find similar queries from history
+        # Find similar queries among successful solutions via the token index
         similar_patterns = []
-        query_words = set(query.lower().split())
-        
-        for solution_id, effectiveness_data in self.solution_effectiveness.items():
-            if effectiveness_data.get('success_rate', 0) > 0.7:  # Successful solutions only
-                hist_query = effectiveness_data.get('original_query', '')
-                hist_words = set(hist_query.lower().split())
-                
-                # Calculate similarity
-                overlap = len(query_words & hist_words)
-                if overlap >= 2:  # At least 2 word overlap
-                    similar_patterns.append({
-                        'solution_id': solution_id,
-                        'overlap_score': overlap / len(query_words | hist_words),
-                        'success_rate': effectiveness_data['success_rate'],
-                        'solution_type': effectiveness_data.get('solution_type', 'general')
-                    })
+        query_words = query_tokens if query_tokens is not None else _tokenize(query)
+        
+        overlaps = Counter()
+        for word in query_words:
+            overlaps.update(self._token_index.get(word, ()))
+        
+        for solution_id, overlap in overlaps.items():
+            if overlap < 2:  # At least 2 word overlap
+                continue
+            
+            effectiveness_data = self.solution_effectiveness[solution_id]
+            similar_patterns.append({
+                'solution_id': solution_id,
+                'overlap_score': overlap / (len(query_words) + effectiveness_data['query_word_count'] - overlap),
+                'success_rate': effectiveness_data['success_rate'],
+                'solution_type': effectiveness_data['solution_type']
+            })
         
         # Sort by relevance
         similar_patterns.sort(key=lambda x: x['overlap_score'] * x['success_rate'], reverse=True)
@@ -211,126 +630,156 @@ Return as a single expanded search string."""
             'confidence': min(1.0, len(similar_patterns) / 3)  # More patterns = higher confidence
         }
     
-    async def _semantic_decomposition(self, query: str) -> Dict[str, Any]:
-        """Decompose query into semantic components for better understanding"""
+    async def _semantic_and_contextual_analysis(self, query: str, context: Dict[str, Any],
+                                                query_embedding: Optional[np.ndarray] = None
+                                                ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Semantic decomposition and contextual reasoning in a single structured-output request"""
         
-        prompt = f"""Decompose this support query into semantic components:
-
-Query: "{query}"
-
-Analyze and extract:
-1. Primary action/intent (what user wants to accomplish)
-2. Object/system (what they're working with)
-3. Problem type (error, configuration, how-to, etc.)
-4. Context clues (urgency, complexity indicators)
-5. Technical domain (networking, software, hardware, etc.)
-6. Skill level indicators
-7. Emotional state indicators
-
-Provide JSON response with these components and confidence levels."""
+        # Without context there is nothing for contextual reasoning to work from
+        if not context:
+            return await self._semantic_decomposition(query, query_embedding), copy.deepcopy(_CONTEXTUAL_FALLBACK)
+        
+        contextual_key = self._contextual_cache_key(context)
+        semantic = self._cached_response('semantic_decomposition', '', query_embedding)
+        contextual = self._cached_response('contextual_reasoning', contextual_key, query_embedding)
+        
+        # Only one analysis missing; request it on its own
+        if semantic is not None and contextual is None:
+            return semantic, await self._contextual_reasoning(query, context, query_embedding)
+        if contextual is not None and semantic is None:
+            return await self._semantic_decomposition(query, query_embedding), contextual
+        if semantic is not None:
+            return semantic, contextual
+        
+        request_details = self._request_details(query, context)
 
         try:
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=500
-            )
+            messages = [
+                {"role": "system", "content": _RESEARCH_ANALYSIS_INSTRUCTIONS},
+                {"role": "user", "content": request_details}
+            ]
+            async with self._reserve(messages, 1100):
+                response = await self.openai_client.chat.completions.create(
+                    model=self._analysis_model(context),
+                    messages=messages,
+                    temperature=0.1,
+                    max_tokens=1100,
+                    response_format=_RESEARCH_ANALYSIS_FORMAT
+                )
             
-            content = response.choices[0].message.content.strip()
-            if content.startswith('```json'):
-                content = content.split('```json')[1].split('```')[0]
+            analysis = _parse_json(response.choices[0].message.content)
+            semantic, contextual = analysis['semantic'], analysis['contextual']
+            
+        except Exception as e:
+            logging.error(f"Semantic and contextual analysis failed: {e}")
+            return copy.deepcopy(_SEMANTIC_FALLBACK), copy.deepcopy(_CONTEXTUAL_FALLBACK)
+        
+        self._cache_response('semantic_decomposition', '', query_embedding, semantic)
+        self._cache_response('contextual_reasoning', contextual_key, query_embedding, contextual)
+        return semantic, contextual
+    
+    def _analysis_model(self, context: Dict[str, Any]) -> str:
+        """Model for analysis calls: the cheap model unless the request is high priority or from an advanced user"""
+        if context.get('priority') in _PRIMARY_MODEL_PRIORITIES or context.get('user_level') == 'advanced':
+            return self.model
+        return self.cheap_model
+    
+    @staticmethod
+    def _request_details(query: str, context: Dict[str, Any]) -> str:
+        """Per-request section of the analysis prompts"""
+        return _REQUEST_DETAILS.format_map({
+            'query': query,
+            'user_level': context.get('user_level', 'intermediate'),
+            'system': context.get('system', 'unknown'),
+            'priority': context.get('priority', 'medium')
+        })
+    
+    @staticmethod
+    def _contextual_cache_key(context: Dict[str, Any]) -> str:
+        """Context fields that contextual reasoning depends on"""
+        return f"{context.get('user_level', 'intermediate')}|{context.get('system', 'unknown')}|{context.get('priority', 'medium')}"
+    
+    async def _semantic_decomposition(self, query: str, query_embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Decompose query into semantic components for better understanding"""
+        
+        cached = self._cached_response('semantic_decomposition', '', query_embedding)
+        if cached is not None:
+            return cached
+        
+        request_details = f'Query: "{query}"'
+
+        try:
+            messages = [
+                {"role": "system", "content": _SEMANTIC_INSTRUCTIONS},
+                {"role": "user", "content": request_details}
+            ]
+            async with self._reserve(messages, 500):
+                response = await self.openai_client.chat.completions.create(
+                    model=self.cheap_model,
+                    messages=messages,
+                    temperature=0.1,
+                    max_tokens=500,
+                    response_format=_SEMANTIC_FORMAT
+                )
             
-            return json.loads(content)
+            decomposition = _parse_json(response.choices[0].message.content)
+            self._cache_response('semantic_decomposition', '', query_embedding, decomposition)
+            return decomposition
             
         except Exception as e:
             logging.error(f"Semantic decomposition failed: {e}")
-            return {
-                'primary_action': 'seek_help',
-                'object_system': 'unknown',
-                'problem_type': 'general',
-                'confidence': 0.3
-            }
+            return copy.deepcopy(_SEMANTIC_FALLBACK)
     
-    async def _contextual_reasoning(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _contextual_reasoning(self, query: str, context: Dict[str, Any],
+                                    query_embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Apply contextual reasoning to understand deeper implications"""
         
-        user_level = context.get('user_level', 'intermediate')
-        system_info = context.get('system', 'unknown')
-        priority = context.get('priority', 'medium')
+        cache_key = self._contextual_cache_key(context)
+        cached = self._cached_response('contextual_reasoning', cache_key, query_embedding)
+        if cached is not None:
+            return cached
         
-        prompt = f"""Analyze this support request with contextual reasoning:
-
-Query: "{query}"
-User Level: {user_level}
-System: {system_info}
-Priority: {priority}
-
-Provide contextual insights:
-1. What might the user really be trying to accomplish? (deeper intent)
-2. What are likely pain points for a {user_level} user?
-3. What system-specific considerations apply?
-4. What are potential follow-up questions?
-5. What success criteria would the user have?
-6. What could go wrong with standard solutions?
-
-Return detailed JSON analysis."""
+        request_details = self._request_details(query, context)
 
         try:
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
-                max_tokens=600
-            )
+            messages = [
+                {"role": "system", "content": _CONTEXTUAL_INSTRUCTIONS},
+                {"role": "user", "content": request_details}
+            ]
+            async with self._reserve(messages, 600):
+                response = await self.openai_client.chat.completions.create(
+                    model=self._analysis_model(context),
+                    messages=messages,
+                    temperature=0.2,
+                    max_tokens=600,
+                    response_format=_CONTEXTUAL_FORMAT
+                )
             
-            content = response.choices[0].message.content.strip()
-            if content.startswith('```json'):
-                content = content.split('```json')[1].split('```')[0]
-            
-            return json.loads(content)
+            insights = _parse_json(response.choices[0].message.content)
+            self._cache_response('contextual_reasoning', cache_key, query_embedding, insights)
+            return insights
             
         except Exception as e:
             logging.error(f"Contextual reasoning failed: {e}")
-            return {
-                'deeper_intent': 'accomplish_task',
-                'pain_points': ['complexity', 'time_pressure'],
-                'success_criteria': ['problem_resolved'],
-                'confidence': 0.4
-            }
+            return copy.deepcopy(_CONTEXTUAL_FALLBACK)
     
     async def _apply_adaptive_learning(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Apply learning from past solution effectiveness"""
         
-        if not self.solution_effectiveness:
-            return {'learning_insights': [], 'confidence': 0.0}
-        
-        # Analyze successful solution characteristics
-        successful_patterns = []
-        for solution_id, data in self.solution_effectiveness.items():
-            if data.get('success_rate', 0) > 0.8:
-                successful_patterns.append(data.get('characteristics', {}))
-        
-        if not successful_patterns:
-            return {'learning_insights': [], 'confidence': 0.0}
-        
-        # Extract common characteristics of successful solutions
-        common_traits = {}
-        for pattern in successful_patterns:
-            for trait, value in pattern.items():
-                if trait not in common_traits:
-                    common_traits[trait] = []
-                common_traits[trait].append(value)
+        # Characteristics of successful solutions are counted as feedback arrives
+        if not self._successful_solution_count:
+            return copy.deepcopy(_ADAPTIVE_FALLBACK)
         
         # Identify most common successful traits
         learning_insights = []
-        for trait, values in common_traits.items():
-            if len(values) >= len(successful_patterns) * 0.6:  # 60% consensus
-                most_common = max(set(values), key=values.count)
+        for trait, value_counts in self._trait_counters.items():
+            total = sum(value_counts.values())
+            if total >= self._successful_solution_count * 0.6:  # 60% consensus
+                most_common, count = value_counts.most_common(1)[0]
                 learning_insights.append({
                     'trait': trait,
                     'recommended_value': most_common,
-                    'confidence': values.count(most_common) / len(values)
+                    'confidence': count / total
                 })
         
         return {
@@ -338,7 +787,7 @@ Return detailed JSON analysis."""
             'confidence': min(1.0, len(learning_insights) / 3)
         }
     
-    async def _synthesize_research_findings(self, research_results: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    def _synthesize_research_findings(self, research_results: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """Synthesize findings from all research strategies"""
         
         # Weight and combine findings
@@ -364,74 +813,156 @@ Return detailed JSON analysis."""
         
         return synthesis
     
-    async def _generate_intelligent_solution(self, query: str, synthesis: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _generate_intelligent_solution(self, query: str, synthesis: Dict[str, Any], context: Dict[str, Any],
+                                             query_embedding: Optional[np.ndarray] = None,
+                                             on_step: Optional[Callable[[Any], None]] = None) -> Dict[str, Any]:
         """Generate intelligent solution based on research synthesis"""
         
         user_level = context.get('user_level', 'intermediate')
         
-        # Build comprehensive prompt with all research findings
-        prompt = f"""Generate a comprehensive solution based on extensive research:
-
-Original Query: "{query}"
-User Level: {user_level}
-Research Confidence: {synthesis['confidence']:.2f}
-
-Research Findings:
-- Knowledge Sources Found: {synthesis['knowledge_sources']}
-- Pattern Matches: {synthesis['pattern_matches']}
-- Semantic Analysis: {json.dumps(synthesis['semantic_components'], indent=2)}
-- Contextual Insights: {json.dumps(synthesis['contextual_insights'], indent=2)}
-
-Generate a detailed solution that includes:
-1. Clear step-by-step instructions appropriate for {user_level} user
-2. Explanation of why this approach works
-3. Potential issues and troubleshooting
-4. Success validation steps
-5. Alternative approaches if main solution fails
-6. Estimated time and difficulty
-7. Prerequisites and warnings
-
-Format as JSON with:
-- title: Clear solution title
-- summary: Brief overview
-- steps: Detailed step array with title, description, commands, expected_result
-- troubleshooting: Common issues and fixes
-- alternatives: Alternative approaches
-- estimated_time: Time estimate
-- difficulty_level: easy/medium/hard
-- prerequisites: Requirements
-- warnings: Important cautions
-- success_criteria: How to verify success
-- confidence_score: Your confidence in this solution (0.0-1.0)
-
-Be comprehensive, accurate, and user-focused."""
+        # The prompt carries the system/priority context and the research findings, not just the user level
+        cache_key = f"{self._contextual_cache_key(context)}|{synthesis['knowledge_sources']}"
+        solution = self._cached_response('solution', cache_key, query_embedding)
+        if solution is None:
+            # With no sources and near-zero research confidence the model has nothing to build on
+            if synthesis['confidence'] < self.min_solution_confidence and synthesis['knowledge_sources'] == 0:
+                return self._generate_fallback_solution(query, context)
+            
+            solution = await self._request_solution(query, synthesis, user_level, on_step)
+            if solution is None:
+                return self._generate_fallback_solution(query, context)
+            if not solution.get('partial'):
+                self._cache_response('solution', cache_key, query_embedding, solution)
+        elif on_step is not None:
+            for step in solution.get('steps', []):
+                on_step(copy.deepcopy(step))
+        
+        # Add metadata
+        solution['research_synthesis'] = synthesis
+        solution['generated_at'] = datetime.now().isoformat()
+        solution['agent_confidence'] = synthesis['confidence']
+        
+        return solution
+    
+    async def _request_solution(self, query: str, synthesis: Dict[str, Any], user_level: str,
+                                on_step: Optional[Callable[[Any], None]] = None) -> Optional[Dict[str, Any]]:
+        """Ask the model for a solution, streaming steps to on_step when given; None if generation fails"""
+        
+        # Research findings go after the static instructions
+        request_details = _SOLUTION_DETAILS.format_map({
+            'query': query,
+            'user_level': user_level,
+            'confidence': synthesis['confidence'],
+            'knowledge_sources': synthesis['knowledge_sources'],
+            'pattern_matches': synthesis['pattern_matches'],
+            'semantic': _compact_json(synthesis['semantic_components']),
+            'contextual': _compact_json(synthesis['contextual_insights'])
+        })
 
+        messages = [
+            {"role": "system", "content": _SOLUTION_INSTRUCTIONS},
+            {"role": "user", "content": request_details}
+        ]
+        
+        emitted_steps = []
+        
+        def forward_step(step):
+            emitted_steps.append(step)
+            on_step(step)
+        
         try:
+            if on_step is None:
+                content = await self._complete_solution(messages)
+            else:
+                try:
+                    content = await self._stream_solution(messages, forward_step)
+                except asyncio.TimeoutError:
+                    if emitted_steps:
+                        raise  # A new generation would not match the steps already shown
+                    logging.warning(
+                        f"Solution stream idle for {self.stream_idle_timeout}s, retrying without streaming"
+                    )
+                    content = await self._complete_solution(messages)
+            
+            return _parse_json(_extract_json_object(content))
+            
+        except Exception as e:
+            if emitted_steps:
+                # The caller has already shown these steps, so keep them rather than replacing them
+                logging.warning(
+                    f"Solution generation failed after {len(emitted_steps)} streamed step(s), "
+                    f"returning the partial solution: {e!r}"
+                )
+                return self._partial_solution(query, emitted_steps)
+            logging.error(f"Solution generation failed: {e}")
+            return None
+    
+    def _partial_solution(self, query: str, steps: List[Any]) -> Dict[str, Any]:
+        """Solution made of the steps streamed before generation stopped (marked partial, so it is never cached)"""
+        
+        return {
+            'title': f'Partial solution for: {query[:50]}...',
+            'summary': 'Solution generation stopped early; these are the steps received so far',
+            'steps': copy.deepcopy(steps),  # Later enhancement must not alter the steps already sent
+            'troubleshooting': 'If these steps do not resolve the issue, escalate to human support',
+            'estimated_time': 'Unknown',
+            'difficulty_level': 'medium',
+            'confidence_score': 0.4,
+            'partial': True
+        }
+    
+    async def _complete_solution(self, messages: List[Dict[str, str]]) -> str:
+        """Request the full solution text in one response"""
+        
+        async with self._reserve(messages, 1500):
             response = await self.openai_client.chat.completions.create(
                 model=self.model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 temperature=0.1,
                 max_tokens=1500
             )
+        return response.choices[0].message.content
+    
+    async def _stream_solution(self, messages: List[Dict[str, str]], on_step: Callable[[Any], None]) -> str:
+        """Stream the solution text, passing each completed step to on_step as it arrives"""
+        
+        # The reservation covers the whole stream, which occupies the connection until done
+        async with self._reserve(messages, 1500):
+            stream = await self.openai_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=1500,
+                stream=True
+            )
             
-            content = response.choices[0].message.content.strip()
-            if content.startswith('```json'):
-                content = content.split('```json')[1].split('```')[0]
-            
-            solution = json.loads(content)
-            
-            # Add metadata
-            solution['research_synthesis'] = synthesis
-            solution['generated_at'] = datetime.now().isoformat()
-            solution['agent_confidence'] = synthesis['confidence']
-            
-            return solution
+            parser = _StepStreamParser()
+            chunks = []
+            chunk_iterator = stream.__aiter__()
             
-        except Exception as e:
-            logging.error(f"Solution generation failed: {e}")
-            return await self._generate_fallback_solution(query, context)
+            try:
+                while True:
+                    # Guard against stalled streams between chunks
+                    try:
+                        chunk = await asyncio.wait_for(chunk_iterator.__anext__(), timeout=self.stream_idle_timeout)
+                    except StopAsyncIteration:
+                        break
+                    
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    
+                    delta = chunk.choices[0].delta.content
+                    chunks.append(delta)
+                    for step in parser.feed(delta):
+                        on_step(step)
+            finally:
+                close = getattr(stream, 'close', None)
+                if close is not None:
+                    await close()
+        
+        return ''.join(chunks)
     
-    async def _generate_fallback_solution(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_fallback_solution(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Generate fallback solution when main generation fails"""
         
         return {
@@ -470,7 +1001,7 @@ Be comprehensive, accurate, and user-focused."""
             'fallback': True
         }
     
-    async def _validate_and_enhance_solution(self, solution: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    def _validate_and_enhance_solution(self, solution: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and enhance the generated solution"""
         
         # Validate solution structure
@@ -492,68 +1023,126 @@ Be comprehensive, accurate, and user-focused."""
             # Add technical details and alternatives
             solution['technical_notes'] = 'For advanced users: Consider command-line alternatives and automation options.'
         
-        # Add learning tracking ID
-        solution['solution_id'] = f"sol_{hash(str(solution))}_{int(datetime.now().timestamp())}"
+        # Add learning tracking ID, stable for identical solution content
+        solution.setdefault('generated_at', datetime.now().isoformat())
+        solution_content = {key: value for key, value in solution.items() if key not in _VOLATILE_SOLUTION_FIELDS}
+        solution['solution_id'] = f"sol_{_stable_digest(_compact_json(solution_content).encode('utf-8'))}"
         
         return solution
     
-    async def _rank_search_results(self, results: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    def _rank_search_results(self, results: List[Dict[str, Any]], query: str,
+                             query_tokens: Optional[frozenset] = None) -> List[Dict[str, Any]]:
         """Rank search results by relevance and quality"""
         
         if not results:
             return []
         
-        query_words = set(query.lower().split())
+        query_words = query_tokens if query_tokens is not None else _tokenize(query)
+        contents = [result.get('content', '') + ' ' + result.get('title', '') for result in results]
         
-        for result in results:
-            # Calculate relevance score
-            content = result.get('content', '') + ' ' + result.get('title', '')
-            content_words = set(content.lower().split())
-            
-            overlap = len(query_words & content_words)
-            relevance = overlap / len(query_words) if query_words else 0
-            
-            # Add quality factors
-            quality_score = 1.0
-            if result.get('metadata', {}).get('difficulty') == 'easy':
-                quality_score += 0.1
-            if len(content) > 200:  # Substantial content
-                quality_score += 0.1
-            
-            result['relevance_score'] = relevance * quality_score
+        # Calculate relevance scores
+        if query_words:
+            overlaps = np.fromiter(
+                (len(query_words & _document_tokens(content)) for content in contents),
+                dtype=np.float64, count=len(results)
+            )
+            relevance = overlaps / len(query_words)
+        else:
+            relevance = np.zeros(len(results))
         
-        # Sort by relevance
-        results.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
-        return results
+        # Add quality factors
+        is_easy = np.fromiter(
+            (result.get('metadata', {}).get('difficulty') == 'easy' for result in results),
+            dtype=bool, count=len(results)
+        )
+        content_lengths = np.fromiter((len(content) for content in contents), dtype=np.int64, count=len(results))
+        quality_scores = 1.0 + np.where(is_easy, 0.1, 0.0) + np.where(content_lengths > 200, 0.1, 0.0)  # Substantial content
+        
+        scores = relevance * quality_scores
+        for result, score in zip(results, scores.tolist()):
+            result['relevance_score'] = score
+        
+        # Sort by relevance (stable, highest first)
+        order = np.argsort(-scores, kind='stable')
+        return [results[i] for i in order]
     
-    async def _store_research_session(self, query: str, research_results: Dict[str, Any], solution: Dict[str, Any]):
+    def _store_research_session(self, query: str, research_results: Dict[str, Any], solution: Dict[str, Any]):
         """Store research session for learning"""
         
         session_record = {
             'timestamp': datetime.now().isoformat(),
             'query': query,
-            'query_hash': hash(query),
+            'query_hash': _stable_digest(query.encode('utf-8')),
             'research_strategies_used': list(research_results.keys()),
             'solution_id': solution.get('solution_id'),
             'confidence': solution.get('confidence_score', 0.5),
             'solution_type': solution.get('difficulty_level', 'medium')
         }
         
-        self.research_patterns.append(session_record)
-        
-        # Keep recent patterns
-        if len(self.research_patterns) > 1000:
-            self.research_patterns = self.research_patterns[-1000:]
+        self.research_patterns.append(session_record)  # Oldest sessions fall off the bounded deque
     
     def update_solution_effectiveness(self, solution_id: str, effectiveness_data: Dict[str, Any]):
         """Update learning from solution effectiveness feedback"""
         
+        previous = self.solution_effectiveness.pop(solution_id, None)
+        if previous is not None:
+            self._unindex_query_words(solution_id, previous['query_words'])
+            self._count_successful_traits(previous, -1)
+        
+        # Tokenize once here so pattern research never re-tokenizes history
+        original_query = effectiveness_data.get('original_query', '')
+        query_words = _tokenize(original_query)
+        
         self.solution_effectiveness[solution_id] = {
             'timestamp': datetime.now().isoformat(),
             'success_rate': effectiveness_data.get('success_rate', 0.5),
             'user_satisfaction': effectiveness_data.get('user_satisfaction', 0.5),
             'resolution_time': effectiveness_data.get('resolution_time', 0),
-            'original_query': effectiveness_data.get('original_query', ''),
+            'original_query': original_query,
+            'query_words': query_words,
+            'query_word_count': len(query_words),
             'solution_type': effectiveness_data.get('solution_type', 'general'),
             'characteristics': effectiveness_data.get('characteristics', {})
-        }
\ No newline at end of file
+        }
+        
+        # Only successful solutions are indexed, so pattern research never visits the rest
+        if self.solution_effectiveness[solution_id]['success_rate'] > 0.7:
+            self._successful_ids.add(solution_id)
+            for word in query_words:
+                self._token_index.setdefault(word, set()).add(solution_id)
+        self._count_successful_traits(self.solution_effectiveness[solution_id], 1)
+        
+        # Evict the least recently updated solutions past the bound
+        while len(self.solution_effectiveness) > self.solution_history_size:
+            evicted_id, evicted = self.solution_effectiveness.popitem(last=False)
+            self._unindex_query_words(evicted_id, evicted['query_words'])
+            self._count_successful_traits(evicted, -1)
+    
+    def _count_successful_traits(self, entry: Dict[str, Any], delta: int):
+        """Add (delta=1) or remove (delta=-1) a successful solution's characteristics from the trait counters"""
+        
+        if entry['success_rate'] <= 0.8:
+            return
+        
+        self._successful_solution_count += delta
+        for trait, value in entry['characteristics'].items():
+            value_counts = self._trait_counters.setdefault(trait, Counter())
+            value_counts[value] += delta
+            if value_counts[value] <= 0:
+                del value_counts[value]
+                if not value_counts:
+                    del self._trait_counters[trait]
+    
+    def _unindex_query_words(self, solution_id: str, query_words: frozenset):
+        """Remove a solution's postings from the token index"""
+        
+        if solution_id not in self._successful_ids:
+            return
+        
+        self._successful_ids.discard(solution_id)
+        for word in query_words:
+            postings = self._token_index.get(word)
+            if postings is not None:
+                postings.discard(solution_id)
+                if not postings:
+                    del self._token_index[word]
\ No newline at end of file
@@ -3,18 +3,187 @@ Advanced Triage Agent with Multi-Model Reasoning and Learning
 """
 
 import json
+import re
 import asyncio
-from typing import Dict, Any, List, Optional
+import hashlib
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import logging
-import sys
-import os
+import time
 
-# Add shared agents to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared_agents'))
+import numpy as np
+
+# Optional faster JSON encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from shared_agents.core.agent_factory import AgentBase, AgentResponse, AgentCapability
 from core.ai_tracking import track_openai_completion
+from core.semantic_cache import SemanticCache
+from core.openai_client import get_openai_rate_limiter
+
+# Learning history bounds for long-running agents
+ROUTING_HISTORY_SIZE = 500
+OUTCOME_FEEDBACK_SIZE = 50  # Per category
+
+# LLM stages whose parsed responses are reused for near-duplicate requests
+_CACHED_STAGES = ('fast_categorization', 'deep_semantic_analysis')
+
+# Numeric score for each category risk level
+_RISK_VALUES = {'low': 0.2, 'medium': 0.5, 'high': 0.8, 'critical': 0.95}
+
+@dataclass(frozen=True, slots=True)
+class CategoryMeta:
+    """Routing metadata for one triage category"""
+    confidence_boost: float
+    complexity: str
+    risk: str
+    risk_numeric: float  # _RISK_VALUES score for ``risk``, resolved once
+
+def _category(confidence_boost: float, complexity: str, risk: str) -> CategoryMeta:
+    return CategoryMeta(confidence_boost, complexity, risk, _RISK_VALUES.get(risk, 0.5))
+
+# Triage categories and routing rules
+TRIAGE_CATEGORIES: Dict[str, CategoryMeta] = {
+    'password_reset': _category(0.2, 'low', 'low'),
+    'technical_issue': _category(0.0, 'medium', 'medium'),
+    'configuration': _category(0.1, 'medium', 'low'),
+    'integration_issue': _category(-0.2, 'high', 'high'),
+    'security_concern': _category(-0.3, 'high', 'critical'),
+    'general_inquiry': _category(0.15, 'low', 'low')
+}
+_DEFAULT_CATEGORY = _category(0.0, 'medium', 'medium')  # For categories the model invents
+
+# Request complexity per category and capability per user level, on the same 1-10 scale
+_CATEGORY_COMPLEXITY = {
+    'password_reset': 1,
+    'general_inquiry': 2,
+    'configuration': 4,
+    'technical_issue': 6,
+    'integration_issue': 8,
+    'security_concern': 9
+}
+_USER_CAPABILITY = {'beginner': 3, 'intermediate': 6, 'advanced': 9}
+
+def _capability_match(req_complexity: int, user_cap: int) -> float:
+    return 1.0 if user_cap >= req_complexity else user_cap / req_complexity
+
+# Every known (category, user level) pair resolved at import
+_CAPABILITY_MATCH = {
+    (category, user_level): _capability_match(req_complexity, user_cap)
+    for category, req_complexity in _CATEGORY_COMPLEXITY.items()
+    for user_level, user_cap in _USER_CAPABILITY.items()
+}
+
+# Markdown code fence around a model's JSON answer
+_JSON_FENCE = re.compile(r'^```(?:json)?\s*|\s*```$', re.MULTILINE)
+
+def _compact_json(value: Any) -> str:
+    """Canonical compact JSON for prompts and cache keys (models don't need indentation)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(value, separators=(',', ':'), sort_keys=True, ensure_ascii=False, default=str)
+
+def _with_timestamp(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a history record with its nanosecond ``ts`` rendered as an ISO timestamp"""
+    exported = {key: value for key, value in record.items() if key != 'ts'}
+    exported['timestamp'] = datetime.fromtimestamp(record['ts'] / 1e9).isoformat()
+    return exported
+
+def _parse_json(content: str) -> Any:
+    """Decode a model's JSON response, tolerating a markdown code fence"""
+    content = content.strip()
+    if content.startswith('```'):
+        content = _JSON_FENCE.sub('', content).strip()
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+# Structured output for deep semantic analysis; the schema replaces the field list in the prompt
+_DEEP_ANALYSIS_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'deep_semantic_analysis',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'intent': {'type': 'string'},
+                'complexity': {'type': 'integer'},
+                'emotional_state': {'type': 'string'},
+                'expertise_required': {'type': 'string'},
+                'risk_factors': {'type': 'array', 'items': {'type': 'string'}},
+                'automation_feasibility': {'type': 'number'},
+                'reasoning': {'type': 'string'}
+            },
+            'required': [
+                'intent', 'complexity', 'emotional_state', 'expertise_required',
+                'risk_factors', 'automation_feasibility', 'reasoning'
+            ],
+            'additionalProperties': False
+        }
+    }
+}
+
+# Static instructions, sent verbatim as the system message so provider prompt caching
+# can reuse them; the request and its context follow in user messages
+_FAST_INSTRUCTIONS = """Analyze the support request in the user message and provide quick categorization.
+
+Provide JSON response with:
+- primary_category: main category (password_reset, technical_issue, configuration, integration_issue, security_concern, general_inquiry)
+- confidence: confidence in categorization (0.0-1.0)
+- urgency: urgency level (low, medium, high, critical)
+- keywords: key terms identified
+
+Be concise and accurate."""
+
+_DEEP_INSTRUCTIONS = """Perform deep semantic analysis of the support request in the user message, using the user context that follows it. Rate complexity 1-10 and automation_feasibility 0.0-1.0; keep reasoning brief."""
+
+# Message dicts and templates built once; per request only the request and context are filled in
+_FAST_SYSTEM_MESSAGE = {"role": "system", "content": _FAST_INSTRUCTIONS}
+_DEEP_SYSTEM_MESSAGE = {"role": "system", "content": _DEEP_INSTRUCTIONS}
+_CONTEXT_TEMPLATE = 'User Context: {}'
+_NO_CONTEXT_MESSAGE = {"role": "user", "content": _CONTEXT_TEMPLATE.format('No context provided')}
+
+# Example phrasings per category, embedded once for local first-pass categorization
+_CATEGORY_PROTOTYPES = {
+    'password_reset': (
+        'I forgot my password',
+        'How do I reset my password?',
+        "I can't log in to my account"
+    ),
+    'technical_issue': (
+        'The application keeps crashing',
+        'I am getting an error message',
+        'The system is not working properly'
+    ),
+    'configuration': (
+        'How do I change my settings?',
+        'How do I configure this feature?',
+        'I need to set up my preferences'
+    ),
+    'integration_issue': (
+        'The API integration is failing',
+        'Data is not syncing with the other system',
+        'The webhook to our service stopped working'
+    ),
+    'security_concern': (
+        'I think my account was hacked',
+        'I received a suspicious phishing email',
+        'Someone accessed my data without permission'
+    ),
+    'general_inquiry': (
+        'I have a question about your service',
+        'Where can I find more information?',
+        'What are your support hours?'
+    )
+}
 
 class AdvancedTriageAgent(AgentBase):
     """
@@ -35,20 +204,33 @@ class AdvancedTriageAgent(AgentBase):
         self.openai_client = config['openai_client']
         self.model = config.get('model', 'gpt-4o')
         self.fast_model = config.get('fast_model', 'gpt-4o-mini')
+        self.embedding_model = config.get('embedding_model', 'text-embedding-3-small')
+        self._rate_limiter = config.get('rate_limiter') or get_openai_rate_limiter()
+        
+        # Semantic caches in front of the LLM stages, one per stage
+        self._semantic_caches = {}
+        if config.get('semantic_cache_enabled', True):
+            self._semantic_caches = {
+                stage: SemanticCache(
+                    threshold=config.get('semantic_cache_threshold', 0.92),
+                    ttl_seconds=config.get('semantic_cache_ttl', 3600),
+                    max_entries=config.get('semantic_cache_size', 1000)
+                )
+                for stage in _CACHED_STAGES
+            }
+        
+        # Local categorization against prototype embeddings; the fast model is only
+        # called when the top category does not clearly win or is not low risk
+        self.local_classifier_enabled = config.get('local_classifier_enabled', True)
+        self.local_classifier_margin = config.get('local_classifier_margin', 0.1)
+        self._prototype_matrix: Optional[np.ndarray] = None  # Unit rows, one per prototype phrase
+        self._prototype_categories: List[str] = []
         
         # Learning components
-        self.routing_history = []
-        self.outcome_feedback = {}
-        
-        # Triage categories and routing rules
-        self.triage_categories = {
-            'password_reset': {'confidence_boost': 0.2, 'complexity': 'low', 'risk': 'low'},
-            'technical_issue': {'confidence_boost': 0.0, 'complexity': 'medium', 'risk': 'medium'},
-            'configuration': {'confidence_boost': 0.1, 'complexity': 'medium', 'risk': 'low'},
-            'integration_issue': {'confidence_boost': -0.2, 'complexity': 'high', 'risk': 'high'},
-            'security_concern': {'confidence_boost': -0.3, 'complexity': 'high', 'risk': 'critical'},
-            'general_inquiry': {'confidence_boost': 0.15, 'complexity': 'low', 'risk': 'low'}
-        }
+        self.routing_history = deque(maxlen=ROUTING_HISTORY_SIZE)
+        self.outcome_feedback: Dict[str, deque] = {}
+        
+        self.triage_categories = TRIAGE_CATEGORIES
     
     async def execute(self, input_data: Dict[str, Any]) -> AgentResponse:
         """Execute advanced triage analysis"""
@@ -60,18 +242,25 @@ class AdvancedTriageAgent(AgentBase):
         if not request_text:
             raise ValueError("No request text provided for triage")
         
+        # Start the embedding and deep analysis now so their network time overlaps the rest of the pipeline
+        prefetch = self._start_analysis(request_text, user_context)
+        
         # Multi-stage triage analysis
-        analysis_results = await self._perform_comprehensive_analysis(request_text, user_context)
+        try:
+            analysis_results = await self._perform_comprehensive_analysis(request_text, user_context, prefetch)
+        finally:
+            for task in prefetch:
+                task.cancel()  # No-op once finished; stops paid calls nobody will read if triage is abandoned
         
         # Generate routing recommendation
-        routing = await self._generate_routing_recommendation(analysis_results, user_context)
+        routing = self._generate_routing_recommendation(analysis_results, user_context)
         
         # Calculate confidence and risk scores
-        confidence_score = await self._calculate_confidence_score(analysis_results, routing)
-        risk_score = await self._calculate_risk_score(analysis_results, routing)
+        confidence_score = self._calculate_confidence_score(analysis_results, routing)
+        risk_score = self._calculate_risk_score(analysis_results, routing)
         
         # Store for learning
-        await self._store_triage_decision(request_text, analysis_results, routing)
+        self._store_triage_decision(request_text, analysis_results, routing)
         
         result = {
             'category': analysis_results['primary_category'],
@@ -84,7 +273,7 @@ class AdvancedTriageAgent(AgentBase):
             'recommended_agent': routing['primary_agent'],
             'escalation_reason': routing.get('escalation_reason'),
             'analysis_details': analysis_results,
-            'learning_confidence': await self._get_learning_confidence(analysis_results['primary_category'])
+            'learning_confidence': self._get_learning_confidence(analysis_results['primary_category'])
         }
         
         return AgentResponse(
@@ -95,124 +284,227 @@ class AdvancedTriageAgent(AgentBase):
             metadata={'analysis_depth': 'comprehensive', 'reasoning_stages': 4}
         )
     
-    async def _perform_comprehensive_analysis(self, request_text: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
+    def _start_analysis(self, request_text: str, user_context: Dict[str, Any]) -> Tuple[asyncio.Task, asyncio.Task]:
+        """Start the request embedding and the deep semantic analysis that depends on it as background tasks"""
+        
+        embedding_task = asyncio.ensure_future(self._get_request_embedding(request_text))
+        
+        async def semantic_analysis():
+            return await self._deep_semantic_analysis(request_text, user_context, await embedding_task)
+        
+        return embedding_task, asyncio.ensure_future(semantic_analysis())
+    
+    async def _perform_comprehensive_analysis(self, request_text: str, user_context: Dict[str, Any],
+                                              prefetch: Optional[Tuple[asyncio.Task, asyncio.Task]] = None) -> Dict[str, Any]:
         """Perform deep analysis using multiple reasoning approaches"""
         
-        # Stage 1: Fast categorization
-        fast_analysis = await self._fast_categorization(request_text)
+        embedding_task, semantic_task = prefetch or self._start_analysis(request_text, user_context)
+        request_embedding = await embedding_task
         
-        # Stage 2: Deep semantic analysis
-        semantic_analysis = await self._deep_semantic_analysis(request_text, user_context)
+        # Stages 1 and 2: fast categorization runs while the deep semantic analysis is already in flight
+        fast_analysis, semantic_analysis = await asyncio.gather(
+            self._fast_categorization(request_text, request_embedding),
+            semantic_task,
+            return_exceptions=True
+        )
+        if isinstance(fast_analysis, Exception):
+            logging.error(f"Fast categorization failed: {fast_analysis}")
+            fast_analysis = self._fast_fallback(request_text)
+        if isinstance(semantic_analysis, Exception):
+            logging.error(f"Deep semantic analysis failed: {semantic_analysis}")
+            semantic_analysis = self._semantic_fallback()
         
         # Stage 3: Context-aware reasoning
-        contextual_analysis = await self._contextual_reasoning(request_text, user_context, fast_analysis)
+        contextual_analysis = self._contextual_reasoning(request_text, user_context, fast_analysis)
         
         # Stage 4: Synthesis and validation
-        final_analysis = await self._synthesize_analysis(fast_analysis, semantic_analysis, contextual_analysis)
+        final_analysis = self._synthesize_analysis(fast_analysis, semantic_analysis, contextual_analysis)
         
         return final_analysis
     
-    async def _fast_categorization(self, request_text: str) -> Dict[str, Any]:
+    async def _get_request_embedding(self, request_text: str) -> Optional[np.ndarray]:
+        """Embed the normalized request for semantic cache lookups (None disables caching)"""
+        
+        if not self._semantic_caches and not self.local_classifier_enabled:
+            return None
+        
+        try:
+            embedding_input = ' '.join(request_text.lower().split())
+            async with self._rate_limiter.reserve(len(embedding_input) // 4 + 1):
+                response = await self.openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=embedding_input
+                )
+            return np.asarray(response.data[0].embedding, dtype=np.float32)
+            
+        except Exception as e:
+            logging.warning(f"Request embedding failed, bypassing semantic cache: {e}")
+            return None
+    
+    def _reserve(self, messages: List[Dict[str, str]], max_tokens: int):
+        """Rate limiter reservation sized from the prompt length (~4 chars/token) plus the completion budget"""
+        prompt_chars = sum(len(message['content']) for message in messages)
+        return self._rate_limiter.reserve(prompt_chars // 4 + max_tokens)
+    
+    def _cached_response(self, stage: str, key: str, request_embedding: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+        """Look up a cached response for a similar request under the same stage and key"""
+        
+        cache = self._semantic_caches.get(stage)
+        if cache is None or request_embedding is None:
+            return None
+        return cache.get(key, request_embedding)
+    
+    def _cache_response(self, stage: str, key: str, request_embedding: Optional[np.ndarray], response: Dict[str, Any]):
+        """Store a successfully parsed response for later similar requests"""
+        
+        cache = self._semantic_caches.get(stage)
+        if cache is not None and request_embedding is not None:
+            cache.put(key, request_embedding, response)
+    
+    async def _local_categorization(self, request_text: str,
+                                    request_embedding: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+        """Categorize by nearest prototype embedding; None when the LLM should decide"""
+        
+        if not self.local_classifier_enabled or request_embedding is None:
+            return None
+        
+        if self._prototype_matrix is None:
+            await self._load_category_prototypes()
+            if self._prototype_matrix is None or self._prototype_matrix.shape[1] != request_embedding.shape[0]:
+                return None
+        
+        norm = np.linalg.norm(request_embedding)
+        scores = self._prototype_matrix @ (request_embedding / norm if norm > 0 else request_embedding)
+        
+        category_scores = {}
+        for category, score in zip(self._prototype_categories, scores):
+            category_scores[category] = max(category_scores.get(category, -1.0), float(score))
+        ranked = sorted(category_scores.items(), key=lambda item: item[1], reverse=True)
+        (category, top_score), (_, runner_up_score) = ranked[0], ranked[1]
+        margin = top_score - runner_up_score
+        
+        if margin < self.local_classifier_margin or self.triage_categories[category].risk != 'low':
+            return None
+        
+        return {
+            'primary_category': category,
+            'confidence': round(min(0.95, 0.7 + margin), 3),
+            'urgency': 'low' if category == 'general_inquiry' else 'medium',
+            'keywords': request_text.split()[:5]
+        }
+    
+    async def _load_category_prototypes(self):
+        """Embed the category prototype phrases in one batched request"""
+        
+        categories = [category for category, phrases in _CATEGORY_PROTOTYPES.items() for _ in phrases]
+        phrases = [phrase.lower() for phrases in _CATEGORY_PROTOTYPES.values() for phrase in phrases]
+        
+        try:
+            async with self._rate_limiter.reserve(sum(len(phrase) for phrase in phrases) // 4 + 1):
+                response = await self.openai_client.embeddings.create(model=self.embedding_model, input=phrases)
+            if len(response.data) != len(phrases):
+                raise ValueError(f"expected {len(phrases)} embeddings, got {len(response.data)}")
+            
+            matrix = np.asarray([item.embedding for item in response.data], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self._prototype_matrix = matrix / np.where(norms > 0, norms, 1.0)
+            self._prototype_categories = categories
+            
+        except Exception as e:
+            logging.warning(f"Category prototype embedding failed, disabling local categorization: {e}")
+            self.local_classifier_enabled = False
+    
+    async def _fast_categorization(self, request_text: str, request_embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Quick categorization using fast model"""
         
-        prompt = f"""Analyze this support request and provide quick categorization:
-
-Request: "{request_text}"
-
-Provide JSON response with:
-- primary_category: main category (password_reset, technical_issue, configuration, integration_issue, security_concern, general_inquiry)
-- confidence: confidence in categorization (0.0-1.0)
-- urgency: urgency level (low, medium, high, critical)
-- keywords: key terms identified
-
-Be concise and accurate."""
-
+        cached = self._cached_response('fast_categorization', '', request_embedding)
+        if cached is not None:
+            return cached
+        
+        local = await self._local_categorization(request_text, request_embedding)
+        if local is not None:
+            return local
+        
         try:
-            response = await self.openai_client.chat.completions.create(
-                model=self.fast_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=300
-            )
+            messages = [_FAST_SYSTEM_MESSAGE, {"role": "user", "content": request_text}]
+            async with self._reserve(messages, 300):
+                response = await self.openai_client.chat.completions.create(
+                    model=self.fast_model,
+                    messages=messages,
+                    temperature=0.1,
+                    max_tokens=300,
+                    response_format={"type": "json_object"}
+                )
 
             # Track AI usage
             track_openai_completion(response, agent_type='triage')
 
-            content = response.choices[0].message.content.strip()
-            if content.startswith('```json'):
-                content = content.split('```json')[1].split('```')[0]
-
-            return json.loads(content)
+            categorization = _parse_json(response.choices[0].message.content)
+            self._cache_response('fast_categorization', '', request_embedding, categorization)
+            return categorization
             
         except Exception as e:
             logging.error(f"Fast categorization failed: {e}")
-            return {
-                'primary_category': 'general_inquiry',
-                'confidence': 0.3,
-                'urgency': 'medium',
-                'keywords': request_text.split()[:5]
-            }
+            return self._fast_fallback(request_text)
     
-    async def _deep_semantic_analysis(self, request_text: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
+    def _fast_fallback(self, request_text: str) -> Dict[str, Any]:
+        """Default categorization used when the fast model is unavailable"""
+        return {
+            'primary_category': 'general_inquiry',
+            'confidence': 0.3,
+            'urgency': 'medium',
+            'keywords': request_text.split()[:5]
+        }
+    
+    async def _deep_semantic_analysis(self, request_text: str, user_context: Dict[str, Any],
+                                      request_embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Deep semantic analysis using advanced model"""
         
-        context_str = json.dumps(user_context, indent=2) if user_context else "No context provided"
+        # The analysis depends on the user context, so only reuse it for an identical context
+        context_str = _compact_json(user_context) if user_context else ''
+        cached = self._cached_response('deep_semantic_analysis', context_str, request_embedding)
+        if cached is not None:
+            return cached
         
-        prompt = f"""Perform deep semantic analysis of this support request:
-
-Request: "{request_text}"
-User Context: {context_str}
-
-Analyze:
-1. Intent and goal of the user
-2. Technical complexity level
-3. Emotional state indicators
-4. Domain expertise required
-5. Potential risks and impacts
-6. Similar request patterns
-7. Success probability for automation
-
-Provide detailed JSON response with:
-- intent: primary user intent
-- complexity: technical complexity (1-10)
-- emotional_state: detected emotional indicators
-- expertise_required: domain expertise needed
-- risk_factors: potential risks
-- automation_feasibility: likelihood of successful automation (0.0-1.0)
-- reasoning: detailed reasoning chain
-
-Be thorough and analytical."""
-
         try:
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
-                max_tokens=800
-            )
+            messages = [
+                _DEEP_SYSTEM_MESSAGE,
+                {"role": "user", "content": request_text},
+                {"role": "user", "content": _CONTEXT_TEMPLATE.format(context_str)} if context_str else _NO_CONTEXT_MESSAGE
+            ]
+            async with self._reserve(messages, 400):
+                response = await self.openai_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.2,
+                    max_tokens=400,
+                    response_format=_DEEP_ANALYSIS_FORMAT
+                )
 
             # Track AI usage
             track_openai_completion(response, agent_type='triage')
 
-            content = response.choices[0].message.content.strip()
-            if content.startswith('```json'):
-                content = content.split('```json')[1].split('```')[0]
-
-            return json.loads(content)
+            analysis = _parse_json(response.choices[0].message.content)
+            self._cache_response('deep_semantic_analysis', context_str, request_embedding, analysis)
+            return analysis
             
         except Exception as e:
             logging.error(f"Deep semantic analysis failed: {e}")
-            return {
-                'intent': 'seek_assistance',
-                'complexity': 5,
-                'emotional_state': 'neutral',
-                'expertise_required': 'general',
-                'risk_factors': ['moderate_complexity'],
-                'automation_feasibility': 0.5,
-                'reasoning': 'Analysis failed, using defaults'
-            }
+            return self._semantic_fallback()
+    
+    def _semantic_fallback(self) -> Dict[str, Any]:
+        """Default semantic analysis used when the advanced model is unavailable"""
+        return {
+            'intent': 'seek_assistance',
+            'complexity': 5,
+            'emotional_state': 'neutral',
+            'expertise_required': 'general',
+            'risk_factors': ['moderate_complexity'],
+            'automation_feasibility': 0.5,
+            'reasoning': 'Analysis failed, using defaults'
+        }
     
-    async def _contextual_reasoning(self, request_text: str, user_context: Dict[str, Any], fast_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    def _contextual_reasoning(self, request_text: str, user_context: Dict[str, Any], fast_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Context-aware reasoning and validation"""
         
         user_level = user_context.get('user_level', 'intermediate')
@@ -240,7 +532,7 @@ Be thorough and analytical."""
             'contextual_confidence': self._calculate_contextual_confidence(fast_analysis, user_context)
         }
     
-    async def _synthesize_analysis(self, fast: Dict[str, Any], semantic: Dict[str, Any], contextual: Dict[str, Any]) -> Dict[str, Any]:
+    def _synthesize_analysis(self, fast: Dict[str, Any], semantic: Dict[str, Any], contextual: Dict[str, Any]) -> Dict[str, Any]:
         """Synthesize all analysis stages into final assessment"""
         
         return {
@@ -257,7 +549,7 @@ Be thorough and analytical."""
             'synthesis_confidence': min(fast['confidence'], semantic.get('automation_feasibility', 0.5))
         }
     
-    async def _generate_routing_recommendation(self, analysis: Dict[str, Any], user_context: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_routing_recommendation(self, analysis: Dict[str, Any], user_context: Dict[str, Any]) -> Dict[str, Any]:
         """Generate intelligent routing recommendation"""
         
         category = analysis['primary_category']
@@ -300,25 +592,22 @@ Be thorough and analytical."""
         
         return routing
     
-    async def _calculate_confidence_score(self, analysis: Dict[str, Any], routing: Dict[str, Any]) -> float:
+    def _calculate_confidence_score(self, analysis: Dict[str, Any], routing: Dict[str, Any]) -> float:
         """Calculate overall confidence score"""
         
         base_confidence = analysis['synthesis_confidence']
-        category_boost = self.triage_categories.get(analysis['primary_category'], {}).get('confidence_boost', 0.0)
+        category_boost = self.triage_categories.get(analysis['primary_category'], _DEFAULT_CATEGORY).confidence_boost
         routing_adjustment = routing['confidence_adjustment']
-        learning_factor = await self._get_learning_confidence(analysis['primary_category'])
+        learning_factor = self._get_learning_confidence(analysis['primary_category'])
         
         final_confidence = base_confidence + category_boost + routing_adjustment + learning_factor
         return max(0.0, min(1.0, final_confidence))
     
-    async def _calculate_risk_score(self, analysis: Dict[str, Any], routing: Dict[str, Any]) -> float:
+    def _calculate_risk_score(self, analysis: Dict[str, Any], routing: Dict[str, Any]) -> float:
         """Calculate risk score"""
         
         base_risk = analysis.get('risk_level', 0.5)
-        category_risk = self.triage_categories.get(analysis['primary_category'], {}).get('risk', 'medium')
-        
-        risk_values = {'low': 0.2, 'medium': 0.5, 'high': 0.8, 'critical': 0.95}
-        category_risk_score = risk_values.get(category_risk, 0.5)
+        category_risk_score = self.triage_categories.get(analysis['primary_category'], _DEFAULT_CATEGORY).risk_numeric
         
         complexity_risk = min(0.3, analysis['complexity'] / 10 * 0.3)
         
@@ -327,28 +616,10 @@ Be thorough and analytical."""
     def _assess_user_capability_match(self, category: str, user_level: str) -> float:
         """Assess how well user capability matches request complexity"""
         
-        category_complexity = {
-            'password_reset': 1,
-            'general_inquiry': 2,
-            'configuration': 4,
-            'technical_issue': 6,
-            'integration_issue': 8,
-            'security_concern': 9
-        }
-        
-        user_capability = {
-            'beginner': 3,
-            'intermediate': 6,
-            'advanced': 9
-        }
-        
-        req_complexity = category_complexity.get(category, 5)
-        user_cap = user_capability.get(user_level, 6)
-        
-        if user_cap >= req_complexity:
-            return 1.0
-        else:
-            return user_cap / req_complexity
+        match = _CAPABILITY_MATCH.get((category, user_level))
+        if match is None:
+            match = _capability_match(_CATEGORY_COMPLEXITY.get(category, 5), _USER_CAPABILITY.get(user_level, 6))
+        return match
     
     def _calculate_contextual_confidence(self, fast_analysis: Dict[str, Any], user_context: Dict[str, Any]) -> float:
         """Calculate confidence based on context"""
@@ -369,13 +640,13 @@ Be thorough and analytical."""
         
         return max(0.0, min(1.0, base))
     
-    async def _get_learning_confidence(self, category: str) -> float:
+    def _get_learning_confidence(self, category: str) -> float:
         """Get confidence adjustment based on learning history"""
         
         if not self.outcome_feedback.get(category):
             return 0.0
         
-        recent_outcomes = self.outcome_feedback[category][-10:]  # Last 10 outcomes
+        recent_outcomes = list(islice(reversed(self.outcome_feedback[category]), 10))  # Last 10 outcomes
         if not recent_outcomes:
             return 0.0
         
@@ -389,12 +660,12 @@ Be thorough and analytical."""
         else:
             return 0.0
     
-    async def _store_triage_decision(self, request_text: str, analysis: Dict[str, Any], routing: Dict[str, Any]):
+    def _store_triage_decision(self, request_text: str, analysis: Dict[str, Any], routing: Dict[str, Any]):
         """Store triage decision for learning"""
         
         decision_record = {
-            'timestamp': datetime.now().isoformat(),
-            'request_hash': hash(request_text),
+            'ts': time.time_ns(),  # Rendered as ISO only on export
+            'request_hash': hashlib.blake2b(request_text.encode('utf-8'), digest_size=8).hexdigest(),  # Stable across restarts
             'category': analysis['primary_category'],
             'routing': routing['primary_agent'],
             'confidence': analysis['synthesis_confidence'],
@@ -402,25 +673,25 @@ Be thorough and analytical."""
             'automation_feasibility': analysis['automation_feasibility']
         }
         
-        self.routing_history.append(decision_record)
-        
-        # Keep only recent history
-        if len(self.routing_history) > 500:
-            self.routing_history = self.routing_history[-500:]
+        self.routing_history.append(decision_record)  # Bounded, oldest decisions drop off
     
     def update_outcome_feedback(self, category: str, outcome: Dict[str, Any]):
         """Update learning from outcomes"""
         
-        if category not in self.outcome_feedback:
-            self.outcome_feedback[category] = []
-        
-        self.outcome_feedback[category].append({
-            'timestamp': datetime.now().isoformat(),
+        self.outcome_feedback.setdefault(category, deque(maxlen=OUTCOME_FEEDBACK_SIZE)).append({
+            'ts': time.time_ns(),
             'success': outcome.get('success', False),
             'user_satisfaction': outcome.get('satisfaction', 0.5),
             'resolution_time': outcome.get('resolution_time', 0)
         })
+    
+    def export_history(self) -> Dict[str, Any]:
+        """Routing decisions and outcome feedback with ISO timestamps, for reporting"""
         
-        # Keep recent feedback
-        if len(self.outcome_feedback[category]) > 50:
-            self.outcome_feedback[category] = self.outcome_feedback[category][-50:]
\ No newline at end of file
+        return {
+            'routing_history': [_with_timestamp(record) for record in self.routing_history],
+            'outcome_feedback': {
+                category: [_with_timestamp(outcome) for outcome in outcomes]
+                for category, outcomes in self.outcome_feedback.items()
+            }
+        }
@@ -7,44 +7,110 @@ A standalone support ticketing automation system
 import os
 import sys
 import asyncio
-from flask import Flask, jsonify
+import concurrent.futures
+import hmac
+import json
+import logging
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
-# Add project paths
-sys.path.append(os.path.dirname(__file__))
-sys.path.append(os.path.join(os.path.dirname(__file__), 'shared_agents'))
+# Optional libuv-based event loop for the agents' concurrent OpenAI fan-out
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
 
-# Add imports
-from core.confidence_agent import ConfidenceAgent
-from knowledge.knowledge_loader import KnowledgeLoader
-from core.advanced_agent_manager import AdvancedAgentManager
-from agents import *  # Auto-registers agents
-import openai
+logger = logging.getLogger(__name__)
 
-async def initialize_confidence_agent(app):
+# Static payloads are encoded once at import; routes wrap them in a fresh Response
+# per request since after_request middleware adds per-request headers
+_INDEX_BODY = json.dumps({
+    'name': 'AI Gatekeeper System',
+    'description': 'Intelligent Support Ticketing Automation',
+    'version': '1.0.0',
+    'endpoints': {
+        'support_evaluation': '/api/support/evaluate',
+        'solution_generation': '/api/support/generate-solution',
+        'request_status': '/api/support/status/<request_id>',
+        'slack_integration': '/api/support/slack-integration',
+        'feedback_submission': '/api/support/feedback',
+        'human_handoff': '/api/support/handoff',
+        'handoff_status': '/api/support/handoff/<ticket_id>/status',
+        'health_check': '/api/support/health',
+        'monitoring_health': '/api/monitoring/health',
+        'monitoring_metrics': '/api/monitoring/metrics',
+        'monitoring_performance': '/api/monitoring/performance',
+        'monitoring_dashboard': '/api/monitoring/dashboard',
+        'feedback_analytics': '/api/monitoring/feedback-analytics'
+    },
+    'documentation': 'See README.md for complete API documentation'
+}).encode()
+
+# Routes that run the agents and so wait for their background initialization
+AGENT_ENDPOINTS = frozenset({
+    'ai_gatekeeper.evaluate_support_request',
+    'ai_gatekeeper.generate_solution',
+    'ai_gatekeeper.slack_integration'
+})
+
+_HEALTH_BODY = json.dumps({
+    'status': 'healthy',
+    'service': 'AI Gatekeeper',
+    'timestamp': '2024-07-11T00:00:00Z'
+}).encode()
+
+_NOT_FOUND_BODY = json.dumps({
+    'error': 'Endpoint not found',
+    'message': 'The requested endpoint does not exist',
+    'available_endpoints': [
+        '/api/support/evaluate',
+        '/api/support/generate-solution',
+        '/api/support/status/<request_id>',
+        '/api/support/slack-integration',
+        '/api/support/feedback',
+        '/api/support/handoff',
+        '/api/support/handoff/<ticket_id>/status',
+        '/api/support/health',
+        '/api/monitoring/health',
+        '/api/monitoring/metrics',
+        '/api/monitoring/performance',
+        '/api/monitoring/dashboard',
+        '/api/monitoring/feedback-analytics'
+    ]
+}).encode()
+
+_INTERNAL_ERROR_BODY = json.dumps({
+    'error': 'Internal server error',
+    'message': 'An unexpected error occurred'
+}).encode()
+
+async def initialize_confidence_agent(app, openai_client, knowledge_items):
     """Initialize confidence agent with knowledge base"""
-    
-    # Create OpenAI client
-    openai_client = openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    from core.confidence_agent import ConfidenceAgent
     
     # Create confidence agent
     confidence_agent = ConfidenceAgent(openai_client)
     
     # Load knowledge base
-    knowledge_items = await KnowledgeLoader.load_sample_knowledge()
     await confidence_agent.load_knowledge_base(knowledge_items)
     
     # Set in support processor
-    if hasattr(app, 'support_processor'):
+    if getattr(app, 'support_processor', None):
         app.support_processor.set_confidence_agent(confidence_agent)
     
-    print("✅ Confidence agent initialized with knowledge base")
+    logger.info("✅ Confidence agent initialized with knowledge base")
     return confidence_agent
 
-async def initialize_advanced_agents(app):
+async def initialize_advanced_agents(app, openai_client, knowledge_items):
     """Initialize advanced agent system"""
+    from core.advanced_agent_manager import AdvancedAgentManager
+    from core.openai_client import discover_rate_limits
+    from agents import register_all_agents
     
-    openai_client = openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    # Optionally size the shared rate limiter from the account's actual limits (costs one 1-token request)
+    if os.getenv('OPENAI_DISCOVER_RATE_LIMITS', 'false').lower() == 'true':
+        await discover_rate_limits()
     
     config = {
         'openai_client': openai_client,
@@ -58,7 +124,14 @@ async def initialize_advanced_agents(app):
     # Create and register agents
     from shared_agents.core.agent_factory import AgentFactory
     
-    agents_config = {**config, 'search_system': getattr(app, 'search_system', None)}
+    register_all_agents()
+    
+    agents_config = {
+        **config,
+        'search_system': getattr(app, 'search_system', None),
+        # Persist the confidence agent's embedded knowledge index so later boots skip the embedding requests
+        'kb_index_dir': os.getenv('KB_INDEX_DIR')
+    }
     
     triage_agent = AgentFactory.create_agent('triage', {**agents_config, 'name': 'Production Triage', 'agent_type': 'triage'})
     research_agent = AgentFactory.create_agent('research', {**agents_config, 'name': 'Production Research', 'agent_type': 'research'})
@@ -69,36 +142,124 @@ async def initialize_advanced_agents(app):
     agent_manager.register_agent('confidence', confidence_agent)
     
     # Initialize confidence agent knowledge base
-    from knowledge.knowledge_loader import KnowledgeLoader
-    knowledge_items = await KnowledgeLoader.load_sample_knowledge()
     await confidence_agent.load_knowledge_base(knowledge_items)
     
     app.advanced_agent_manager = agent_manager
     
-    # Connect to support processor
-    if hasattr(app, 'support_processor'):
+    # Connect to support processor and solution generator
+    if getattr(app, 'support_processor', None):
         app.support_processor.set_advanced_agent_manager(agent_manager)
+    if getattr(app, 'solution_generator', None):
+        app.solution_generator.advanced_agent_manager = agent_manager
     
-    print("✅ Advanced agent system initialized")
+    logger.info("✅ Advanced agent system initialized")
     return agent_manager
 
+async def initialize_agents(app, openai_client):
+    """Initialize the confidence agent and advanced agent system concurrently"""
+    from knowledge.knowledge_loader import KnowledgeLoader
+    
+    # Load the knowledge base once for both
+    knowledge_items = await KnowledgeLoader.load_sample_knowledge()
+    app.knowledge_items = knowledge_items
+    
+    return await asyncio.gather(
+        initialize_confidence_agent(app, openai_client, knowledge_items),
+        initialize_advanced_agents(app, openai_client, knowledge_items)
+    )
+
+async def warm_agents(app, openai_client):
+    """Initialize the agents on the shared loop, recording them on the app"""
+    try:
+        app.confidence_agent, app.advanced_agent_manager = await initialize_agents(app, openai_client)
+    except Exception as e:
+        logger.warning(f"⚠️ Advanced agent system initialization failed: {e}")
+
+def start_agent_initialization(app):
+    """Start agent initialization on the shared agent event loop without waiting for it"""
+    # Agent modules pull in openai and numpy, so they are only imported once an app is built
+    from core.openai_client import get_openai_client
+    from core.event_loop import get_agent_loop
+    
+    # One pooled OpenAI client for every agent, so calls reuse keep-alive connections; agents
+    # are initialized on the same shared event loop the routes later run them on
+    app.openai_client = get_openai_client(timeout=app.config['OPENAI_TIMEOUT'])
+    app.confidence_agent = None
+    app.advanced_agent_manager = None
+    app.agents_ready = asyncio.run_coroutine_threadsafe(warm_agents(app, app.openai_client), get_agent_loop())
+
+def ensure_agents(app, timeout=None):
+    """Wait for background agent initialization; returns False if it failed or is still running"""
+    agents_ready = getattr(app, 'agents_ready', None)
+    if agents_ready is None:
+        return False
+    
+    try:
+        agents_ready.result(timeout)
+    except concurrent.futures.TimeoutError:
+        return False
+    return app.advanced_agent_manager is not None
+
+def init_forked_worker(app, worker_count=None):
+    """
+    Re-establish per-process agent state in a worker forked from a preloaded app.
+    
+    Every worker shares the account's OpenAI limits, so each one enforces a 1/worker_count
+    share of them (default: WEB_CONCURRENCY).
+    """
+    from core.openai_client import get_openai_rate_limiter
+    
+    if worker_count is None:
+        worker_count = int(os.getenv('WEB_CONCURRENCY', '1'))
+    get_openai_rate_limiter().set_worker_count(worker_count)
+    
+    agents_ready = getattr(app, 'agents_ready', None)
+    if agents_ready is not None and not agents_ready.done():
+        # Initialization was still running on the parent's loop thread, which did not survive the fork
+        start_agent_initialization(app)
+        return
+    
+    # Keep the agents (and their embedded knowledge base, shared copy-on-write) but give this
+    # worker its own OpenAI client; the inherited one's pooled connections belong to the parent
+    from core.openai_client import get_openai_client
+    
+    client = get_openai_client(timeout=app.config['OPENAI_TIMEOUT'])
+    app.openai_client = client
+    if getattr(app, 'confidence_agent', None):
+        app.confidence_agent.openai_client = client
+    agent_manager = getattr(app, 'advanced_agent_manager', None)
+    if agent_manager:
+        agent_manager.openai_client = client
+        agent_manager.config['openai_client'] = client
+        for agent in agent_manager.agents.values():
+            agent.openai_client = client
+
+def _env_flag(name, default):
+    """Read a true/false environment flag"""
+    return os.getenv(name, 'true' if default else 'false').lower() == 'true'
+
+def get_enabled_features():
+    """Optional startup components; disabled ones are never imported"""
+    return {
+        'tracing': _env_flag('OTEL_ENABLED', True),
+        'slack': _env_flag('ENABLE_SLACK', bool(os.getenv('SLACK_BOT_TOKEN')))
+    }
+
 def validate_environment():
     """Validate environment configuration before starting app."""
-    print("🔐 Validating environment configuration...")
+    logger.info("🔐 Validating environment configuration...")
 
     # Import and run secrets validator
-    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
     try:
-        from validate_secrets import validate_secrets
+        from scripts.validate_secrets import validate_secrets
         if not validate_secrets():
-            print("\n❌ Environment validation failed!")
-            print("Please fix the errors above before starting the application.")
+            logger.error("❌ Environment validation failed! Please fix the errors above before starting the application.")
             sys.exit(1)
     except ImportError as e:
-        print(f"⚠️  Could not import secrets validator: {e}")
+        logger.warning(f"⚠️  Could not import secrets validator: {e}")
         # Continue but warn
 
-    print("✅ Environment validation passed\n")
+    logger.info("✅ Environment validation passed")
 
 def create_app():
     """Create and configure the AI Gatekeeper Flask application."""
@@ -107,23 +268,36 @@ def create_app():
     setup_logging()
     init_audit_logger()
 
+    # The shared agent event loop used below and by the routes runs on uvloop when installed
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
+
     # Validate environment
     validate_environment()
 
     app = Flask(__name__)
 
+    # Serialize jsonify() responses with orjson when installed
+    from core.json_provider import init_json_provider
+    if init_json_provider(app):
+        logger.info("✅ orjson JSON provider enabled")
+
     # Enable CORS
     CORS(app)
 
+    features = get_enabled_features()
+    app.config['FEATURES'] = features
+
     # Setup distributed tracing
-    try:
-        from core.tracing import setup_tracing
-        tracer = setup_tracing(app=app)
-        if tracer:
-            app.tracer = tracer
-            print("✅ Distributed tracing initialized successfully")
-    except Exception as tracing_error:
-        print(f"⚠️  Tracing initialization failed: {tracing_error}")
+    if features['tracing']:
+        try:
+            from core.tracing import setup_tracing
+            tracer = setup_tracing(app=app)
+            if tracer:
+                app.tracer = tracer
+                logger.info("✅ Distributed tracing initialized successfully")
+        except Exception as tracing_error:
+            logger.warning(f"⚠️  Tracing initialization failed: {tracing_error}")
 
     # Basic configuration - SECRET_KEY must be set
     secret_key = os.getenv('SECRET_KEY')
@@ -139,37 +313,44 @@ def create_app():
     app.config['REQUEST_TIMEOUT'] = int(os.getenv('REQUEST_TIMEOUT', '120'))  # 2 minutes default
     app.config['OPENAI_TIMEOUT'] = int(os.getenv('OPENAI_TIMEOUT', '60'))  # 1 minute for AI calls
 
+    # Admin key for /auth/token, resolved once; the built-in fallback is refused in production
+    default_admin_key = 'ai-gatekeeper-admin-key'
+    admin_key = os.getenv('ADMIN_API_KEY') or default_admin_key
+    if admin_key == default_admin_key and os.getenv('ENVIRONMENT', 'development') == 'production':
+        raise ValueError("ADMIN_API_KEY environment variable must be set to a non-default value in production.")
+    app.config['ADMIN_API_KEY'] = admin_key
+
     # Add logging middleware
     try:
         from integrations.logging_middleware import add_logging_middleware
         add_logging_middleware(app)
-        print("✅ Logging middleware initialized successfully")
+        logger.info("✅ Logging middleware initialized successfully")
     except Exception as logging_error:
-        print(f"⚠️  Logging middleware initialization failed: {logging_error}")
+        logger.warning(f"⚠️  Logging middleware initialization failed: {logging_error}")
 
     # Add timeout monitoring
     try:
         from core.timeout_middleware import add_timeout_monitoring
         add_timeout_monitoring(app)
-        print("✅ Timeout monitoring initialized successfully")
+        logger.info("✅ Timeout monitoring initialized successfully")
     except Exception as timeout_error:
-        print(f"⚠️  Timeout monitoring initialization failed: {timeout_error}")
+        logger.warning(f"⚠️  Timeout monitoring initialization failed: {timeout_error}")
 
     # Initialize rate limiter
     try:
         from core.rate_limiter import init_rate_limiter
         init_rate_limiter(app)
-        print("✅ Rate limiter initialized successfully")
+        logger.info("✅ Rate limiter initialized successfully")
     except Exception as rate_limit_error:
-        print(f"⚠️  Rate limiter initialization failed: {rate_limit_error}")
+        logger.warning(f"⚠️  Rate limiter initialization failed: {rate_limit_error}")
 
     # Add security headers
     try:
         from core.security_headers import add_security_headers
         add_security_headers(app)
-        print("✅ Security headers middleware initialized successfully")
+        logger.info("✅ Security headers middleware initialized successfully")
     except Exception as security_error:
-        print(f"⚠️  Security headers initialization failed: {security_error}")
+        logger.warning(f"⚠️  Security headers initialization failed: {security_error}")
 
     # Initialize AI Gatekeeper components
     try:
@@ -184,85 +365,79 @@ def create_app():
 
         # Initialize AI metrics tracking
         init_ai_metrics(metrics_collector)
-        print("✅ AI metrics tracking initialized")
+        logger.info("✅ AI metrics tracking initialized")
 
         # Initialize health checks (will be improved when components are available)
         try:
             initialize_health_checks(None, None, None)
         except Exception as health_error:
-            print(f"⚠️  Health checks initialization failed: {health_error}")
+            logger.warning(f"⚠️  Health checks initialization failed: {health_error}")
         
         # Initialize Slack Events listener
-        try:
-            from integrations.slack_events_listener import create_slack_listener
-            app.slack_listener = create_slack_listener(
-                support_processor=getattr(app, 'support_processor', None),
-                flask_app=app
-            )
-            if app.slack_listener:
-                print("✅ Slack Events listener initialized successfully")
-            else:
-                print("⚠️  Slack Events listener not configured (missing tokens)")
-        except Exception as slack_error:
-            print(f"⚠️  Slack Events listener initialization failed: {slack_error}")
+        if features['slack']:
+            try:
+                from integrations.slack_events_listener import create_slack_listener
+                app.slack_listener = create_slack_listener(
+                    support_processor=getattr(app, 'support_processor', None),
+                    flask_app=app
+                )
+                if app.slack_listener:
+                    logger.info("✅ Slack Events listener initialized successfully")
+                else:
+                    logger.warning("⚠️  Slack Events listener not configured (missing tokens)")
+            except Exception as slack_error:
+                logger.warning(f"⚠️  Slack Events listener initialization failed: {slack_error}")
+        else:
+            app.slack_listener = None
+            logger.info("Slack Events listener disabled (set SLACK_BOT_TOKEN or ENABLE_SLACK=true)")
         
         # Setup authentication middleware
         try:
             from auth.middleware import setup_auth_middleware
             setup_auth_middleware(app)
-            print("✅ Authentication middleware configured successfully")
+            logger.info("✅ Authentication middleware configured successfully")
         except Exception as auth_error:
-            print(f"⚠️  Authentication middleware setup failed: {auth_error}")
+            logger.warning(f"⚠️  Authentication middleware setup failed: {auth_error}")
         
-        print("✅ AI Gatekeeper routes and monitoring registered successfully")
+        logger.info("✅ AI Gatekeeper routes and monitoring registered successfully")
         
     except Exception as e:
-        print(f"⚠️  AI Gatekeeper initialization failed: {e}")
+        logger.warning(f"⚠️  AI Gatekeeper initialization failed: {e}")
         # Continue with basic app even if AI Gatekeeper fails to initialize
     
-    # Initialize confidence agent and advanced agent system
+    # Initialize confidence agent and advanced agent system in the background, so the app
+    # (and /health) is ready immediately; agent-backed routes wait for it on first use
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        app.confidence_agent = loop.run_until_complete(initialize_confidence_agent(app))
-        app.advanced_agent_manager = loop.run_until_complete(initialize_advanced_agents(app))
-        loop.close()
+        start_agent_initialization(app)
     except Exception as e:
-        print(f"⚠️ Advanced agent system initialization failed: {e}")
+        logger.warning(f"⚠️ Advanced agent system initialization failed: {e}")
+    
+    @app.before_request
+    def wait_for_agents():
+        """Hold agent-backed requests until background agent initialization has finished."""
+        if request.endpoint in AGENT_ENDPOINTS and not ensure_agents(app, timeout=app.config['REQUEST_TIMEOUT']):
+            logger.warning(f"⚠️  Serving {request.endpoint} without the advanced agent system")
     
     @app.route('/')
     def index():
         """Main index route."""
-        return jsonify({
-            'name': 'AI Gatekeeper System',
-            'description': 'Intelligent Support Ticketing Automation',
-            'version': '1.0.0',
-            'endpoints': {
-                'support_evaluation': '/api/support/evaluate',
-                'solution_generation': '/api/support/generate-solution',
-                'request_status': '/api/support/status/<request_id>',
-                'slack_integration': '/api/support/slack-integration',
-                'feedback_submission': '/api/support/feedback',
-                'human_handoff': '/api/support/handoff',
-                'handoff_status': '/api/support/handoff/<ticket_id>/status',
-                'health_check': '/api/support/health',
-                'monitoring_health': '/api/monitoring/health',
-                'monitoring_metrics': '/api/monitoring/metrics',
-                'monitoring_performance': '/api/monitoring/performance',
-                'monitoring_dashboard': '/api/monitoring/dashboard',
-                'feedback_analytics': '/api/monitoring/feedback-analytics'
-            },
-            'documentation': 'See README.md for complete API documentation'
-        })
+        return Response(_INDEX_BODY, mimetype='application/json')
     
     @app.route('/health')
     def health():
         """Basic health check."""
-        return jsonify({
-            'status': 'healthy',
-            'service': 'AI Gatekeeper',
-            'timestamp': '2024-07-11T00:00:00Z'
-        })
+        return Response(_HEALTH_BODY, mimetype='application/json')
+    
+    # Token builders are resolved on first use and then reused. Importing auth.middleware
+    # needs JWT_SECRET_KEY and API_KEY_* set, so a missing secret must not stop the app from starting
+    token_builders = {}
+    admin_key = app.config['ADMIN_API_KEY'].encode()
+    
+    def get_token_builders():
+        if not token_builders:
+            from auth.middleware import create_admin_token, create_api_user_token
+            token_builders.update(admin=create_admin_token, api_user=create_api_user_token)
+        return token_builders
     
     @app.route('/auth/token', methods=['POST'])
     def generate_token():
@@ -280,18 +455,18 @@ def create_app():
                 return jsonify({'error': 'user_id and email are required'}), 400
             
             # Simple validation - in production, this would validate against a user database
-            admin_key = os.getenv('ADMIN_API_KEY', 'ai-gatekeeper-admin-key')
             provided_key = data.get('admin_key')
             
-            if provided_key != admin_key:
+            if not isinstance(provided_key, str) or not hmac.compare_digest(provided_key.encode(), admin_key):
                 return jsonify({'error': 'Invalid admin key'}), 401
             
-            from auth.middleware import create_admin_token, create_api_user_token
+            try:
+                builders = get_token_builders()
+            except Exception as auth_error:
+                logger.error(f"❌ Token issuance unavailable: {auth_error}")
+                return jsonify({'error': 'Authentication is not configured'}), 503
             
-            if role == 'admin':
-                token = create_admin_token(user_id, email)
-            else:
-                token = create_api_user_token(user_id, email)
+            token = builders.get(role, builders['api_user'])(user_id, email)
             
             return jsonify({
                 'token': token,
@@ -307,33 +482,12 @@ def create_app():
     @app.errorhandler(404)
     def not_found(error):
         """Handle 404 errors."""
-        return jsonify({
-            'error': 'Endpoint not found',
-            'message': 'The requested endpoint does not exist',
-            'available_endpoints': [
-                '/api/support/evaluate',
-                '/api/support/generate-solution',
-                '/api/support/status/<request_id>',
-                '/api/support/slack-integration',
-                '/api/support/feedback',
-                '/api/support/handoff',
-                '/api/support/handoff/<ticket_id>/status',
-                '/api/support/health',
-                '/api/monitoring/health',
-                '/api/monitoring/metrics',
-                '/api/monitoring/performance',
-                '/api/monitoring/dashboard',
-                '/api/monitoring/feedback-analytics'
-            ]
-        }), 404
+        return Response(_NOT_FOUND_BODY, status=404, mimetype='application/json')
     
     @app.errorhandler(500)
     def internal_error(error):
         """Handle 500 errors."""
-        return jsonify({
-            'error': 'Internal server error',
-            'message': 'An unexpected error occurred'
-        }), 500
+        return Response(_INTERNAL_ERROR_BODY, status=500, mimetype='application/json')
     
     return app
 
@@ -342,38 +496,36 @@ def main():
     """Main application entry point."""
     # Check environment setup
     if not os.getenv('OPENAI_API_KEY'):
-        print("⚠️  Warning: OPENAI_API_KEY not set. AI features may not work.")
-        print("   Set it with: export OPENAI_API_KEY='your-api-key'")
+        logger.warning("⚠️  OPENAI_API_KEY not set. AI features may not work. Set it with: export OPENAI_API_KEY='your-api-key'")
     
     # Create and run the app
     app = create_app()
     
-    print("🛡️  Starting AI Gatekeeper System...")
-    print("📡 Available endpoints:")
-    print("   • POST /api/support/evaluate")
-    print("   • POST /api/support/generate-solution") 
-    print("   • GET  /api/support/status/<request_id>")
-    print("   • POST /api/support/slack-integration")
-    print("   • POST /api/support/feedback")
-    print("   • POST /api/support/handoff")
-    print("   • GET  /api/support/handoff/<ticket_id>/status")
-    print("   • GET  /api/support/health")
-    print("   • GET  /api/monitoring/health")
-    print("   • GET  /api/monitoring/metrics")
-    print("   • GET  /api/monitoring/performance") 
-    print("   • GET  /api/monitoring/dashboard")
-    print("   • GET  /api/monitoring/feedback-analytics")
-    print("   • GET  / (API documentation)")
-    
-    # Run the application
+    logger.info("🛡️  Starting AI Gatekeeper System...")
+    logger.info("📡 Available endpoints:")
+    logger.info("   • POST /api/support/evaluate")
+    logger.info("   • POST /api/support/generate-solution")
+    logger.info("   • GET  /api/support/status/<request_id>")
+    logger.info("   • POST /api/support/slack-integration")
+    logger.info("   • POST /api/support/feedback")
+    logger.info("   • POST /api/support/handoff")
+    logger.info("   • GET  /api/support/handoff/<ticket_id>/status")
+    logger.info("   • GET  /api/support/health")
+    logger.info("   • GET  /api/monitoring/health")
+    logger.info("   • GET  /api/monitoring/metrics")
+    logger.info("   • GET  /api/monitoring/performance")
+    logger.info("   • GET  /api/monitoring/dashboard")
+    logger.info("   • GET  /api/monitoring/feedback-analytics")
+    logger.info("   • GET  / (API documentation)")
+    
+    # Run the development server (production runs under gunicorn, see Dockerfile)
     port = int(os.getenv('PORT', 5000))
     host = os.getenv('HOST', '0.0.0.0')
     
     app.run(
         host=host,
         port=port,
-        debug=app.config['DEBUG'],
-        threaded=True
+        debug=app.config['DEBUG']
     )
 
 
@@ -6,12 +6,58 @@ Provides JWT and Bearer token authentication with role-based access control
 import os
 import jwt
 import time
+import hmac
+import hashlib
 import logging
-from functools import wraps
-from typing import Dict, Any, Optional, List, Callable
-from datetime import datetime, timedelta
+import threading
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from typing import Dict, Any, Iterable, Optional, List, Callable
 from flask import request, jsonify, current_app, g
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Trie node keys for endpoint permissions (sentinels so they cannot collide with path segments)
+_EXACT = object()
+_WILDCARD = object()
+
+# Paths served without authentication
+AUTH_SKIP_PATHS = frozenset({'/health', '/slack/events', '/'})
+
+# Permissions granted to each role (frozensets for O(1) membership checks)
+ROLE_PERMISSIONS = {
+    'admin': frozenset({'read', 'write', 'delete', 'manage'}),
+    'operator': frozenset({'read', 'write'}),
+    'viewer': frozenset({'read'}),
+    'api_user': frozenset({'read', 'write'})
+}
+
+# Required permissions for API endpoints without an explicit rule
+DEFAULT_API_PERMISSIONS = {
+    'GET': ['read'],
+    'HEAD': ['read'],
+    'POST': ['write'],
+    'PUT': ['write'],
+    'PATCH': ['write'],
+    'DELETE': ['delete']
+}
+
+class _OrjsonPyJWT(jwt.PyJWT):
+    """PyJWT decoder that parses token payloads with orjson instead of the stdlib json module."""
+    
+    def _decode_payload(self, decoded: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            payload = orjson.loads(decoded['payload'])
+        except orjson.JSONDecodeError as e:
+            raise jwt.DecodeError(f"Invalid payload string: {e}") from e
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload string: must be a json object")
+        return payload
+
 class AuthenticationError(Exception):
     """Custom exception for authentication errors."""
     pass
@@ -54,13 +100,14 @@ class JWTManager:
         self.algorithm = algorithm
         self.token_expiry_hours = token_expiry_hours
         
+        # LRU cache of verified payloads keyed by token digest, so repeat requests skip HMAC verification
+        self.decode_cache_size = int(os.getenv('JWT_DECODE_CACHE_SIZE', '4096'))
+        self._jwt = _OrjsonPyJWT() if ORJSON_AVAILABLE else jwt.PyJWT()
+        self._decode_cache: 'OrderedDict[bytes, Dict[str, Any]]' = OrderedDict()
+        self._decode_cache_lock = threading.Lock()
+        
         # Configure roles and permissions
-        self.roles = {
-            'admin': ['read', 'write', 'delete', 'manage'],
-            'operator': ['read', 'write'],
-            'viewer': ['read'],
-            'api_user': ['read', 'write']
-        }
+        self.roles = ROLE_PERMISSIONS
         
         # Protected endpoints and their required permissions
         self.endpoint_permissions = {
@@ -77,6 +124,37 @@ class JWTManager:
             'PUT:/api/monitoring/*': ['manage'],
             'DELETE:/api/monitoring/*': ['manage']
         }
+        
+        # Exact (method, path) rules are a single dict hit; wildcard rules go through
+        # a per-method path trie, so lookups cost O(path depth)
+        self._exact_permissions = {
+            tuple(pattern.split(':', 1)): permissions
+            for pattern, permissions in self.endpoint_permissions.items()
+            if '*' not in pattern
+        }
+        self._perm_trie = self._build_permission_trie(self.endpoint_permissions)
+    
+    @staticmethod
+    def _build_permission_trie(endpoint_permissions: Dict[str, List[str]]) -> Dict[str, Dict]:
+        """
+        Build a per-method trie of path segments from 'METHOD:/path' patterns.
+        
+        A trailing '*' matches everything after the preceding '/' (like a prefix
+        match); a '*' in any other position matches exactly one segment.
+        """
+        trie = {}
+        for pattern, permissions in endpoint_permissions.items():
+            method, path = pattern.split(':', 1)
+            node = trie.setdefault(method, {})
+            segments = path.split('/')
+            for segment in segments[:-1]:
+                node = node.setdefault(segment, {})
+            
+            if segments[-1] == '*':
+                node[_WILDCARD] = permissions
+            else:
+                node.setdefault(segments[-1], {})[_EXACT] = permissions
+        return trie
     
     def generate_token(self, user_id: str, email: str, role: str = 'api_user', 
                       custom_claims: Dict[str, Any] = None) -> str:
@@ -92,16 +170,15 @@ class JWTManager:
         Returns:
             JWT token string
         """
-        now = datetime.utcnow()
-        expiry = now + timedelta(hours=self.token_expiry_hours)
+        now = time.time()
         
         payload = {
             'user_id': user_id,
             'email': email,
             'role': role,
-            'permissions': self.roles.get(role, []),
-            'iat': now.timestamp(),
-            'exp': expiry.timestamp(),
+            'permissions': sorted(self.roles.get(role, ())),
+            'iat': now,
+            'exp': now + self.token_expiry_hours * 3600,
             'iss': 'ai-gatekeeper'
         }
         
@@ -116,6 +193,8 @@ class JWTManager:
         """
         Decode and validate JWT token.
         
+        Verified payloads are cached by token digest; expiry is re-checked on every call.
+        
         Args:
             token: JWT token string
             
@@ -125,37 +204,54 @@ class JWTManager:
         Raises:
             AuthenticationError: If token is invalid
         """
-        try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            
-            # Check if token is expired
-            if payload.get('exp', 0) < time.time():
+        cache_key = hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+        with self._decode_cache_lock:
+            payload = self._decode_cache.get(cache_key)
+            if payload is not None:
+                self._decode_cache.move_to_end(cache_key)
+        
+        if payload is not None:
+            # PyJWT checked expiry when the token was first decoded; cached payloads need it re-checked
+            if payload['exp'] < time.time():
+                with self._decode_cache_lock:
+                    self._decode_cache.pop(cache_key, None)
                 raise AuthenticationError("Token has expired")
-            
-            return payload
-            
+            return dict(payload)
+        
+        payload = self._decode_token_uncached(token)
+        with self._decode_cache_lock:
+            self._decode_cache[cache_key] = payload
+            while len(self._decode_cache) > self.decode_cache_size:
+                self._decode_cache.popitem(last=False)
+        
+        return dict(payload)
+    
+    def _decode_token_uncached(self, token: str) -> Dict[str, Any]:
+        """Verify the token signature and claims (including a mandatory exp) with PyJWT."""
+        try:
+            return self._jwt.decode(token, self.secret_key, algorithms=[self.algorithm],
+                                    options={'require': ['exp']})
         except jwt.ExpiredSignatureError:
             raise AuthenticationError("Token has expired")
         except jwt.InvalidTokenError as e:
             raise AuthenticationError(f"Invalid token: {str(e)}")
     
-    def validate_permissions(self, user_permissions: List[str], required_permissions: List[str]) -> bool:
+    def validate_permissions(self, user_permissions: Iterable[str], required_permissions: Iterable[str]) -> bool:
         """
         Validate user permissions against required permissions.
         
         Args:
-            user_permissions: User's permissions
+            user_permissions: User's permissions (ideally a frozenset)
             required_permissions: Required permissions
             
         Returns:
             True if user has required permissions
         """
-        # Admin role has all permissions
-        if 'manage' in user_permissions:
-            return True
+        if not isinstance(user_permissions, frozenset):
+            user_permissions = frozenset(user_permissions)
         
-        # Check if user has any of the required permissions
-        return any(perm in user_permissions for perm in required_permissions)
+        # Admin role has all permissions; otherwise any one required permission suffices
+        return 'manage' in user_permissions or not user_permissions.isdisjoint(required_permissions)
     
     def get_endpoint_permissions(self, method: str, path: str) -> List[str]:
         """
@@ -168,26 +264,29 @@ class JWTManager:
         Returns:
             List of required permissions
         """
-        # Exact match
-        endpoint_key = f"{method}:{path}"
-        if endpoint_key in self.endpoint_permissions:
-            return self.endpoint_permissions[endpoint_key]
-        
-        # Wildcard match
-        for pattern, permissions in self.endpoint_permissions.items():
-            if pattern.endswith('*'):
-                pattern_base = pattern[:-1]  # Remove '*'
-                if endpoint_key.startswith(pattern_base):
-                    return permissions
+        permissions = self._exact_permissions.get((method, path))
+        if permissions is not None:
+            return permissions
+        
+        # Walk the trie; a full-path match wins, otherwise the deepest trailing wildcard seen
+        node = self._perm_trie.get(method)
+        wildcard_permissions = None
+        for segment in path.split('/'):
+            if node is None:
+                break
+            if _WILDCARD in node:
+                wildcard_permissions = node[_WILDCARD]
+            node = node.get(segment) or node.get('*')
+        else:
+            if node is not None and _EXACT in node:
+                return node[_EXACT]
+        
+        if wildcard_permissions is not None:
+            return wildcard_permissions
         
         # Default permissions for API endpoints
         if path.startswith('/api/'):
-            if method in ['GET', 'HEAD']:
-                return ['read']
-            elif method in ['POST', 'PUT', 'PATCH']:
-                return ['write']
-            elif method == 'DELETE':
-                return ['delete']
+            return DEFAULT_API_PERMISSIONS.get(method, [])
         
         return []  # No permissions required for non-API endpoints
 
@@ -197,6 +296,17 @@ class BearerTokenManager:
     def __init__(self):
         """Initialize bearer token manager."""
         self.api_keys = self._load_api_keys()
+        
+        # Lookup index keyed by key digest; the matched key is then confirmed in constant time
+        self._key_index = {
+            self._key_digest(api_key): (api_key.encode('utf-8'), info)
+            for api_key, info in self.api_keys.items()
+        }
+    
+    @staticmethod
+    def _key_digest(api_key: str) -> bytes:
+        """Digest used to index API keys."""
+        return hashlib.blake2b(api_key.encode('utf-8'), digest_size=16).digest()
     
     def _load_api_keys(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -222,18 +332,17 @@ class BearerTokenManager:
                         )
 
                     # Validate role
-                    allowed_roles = ['admin', 'operator', 'viewer', 'api_user']
-                    if role not in allowed_roles:
+                    if role not in ROLE_PERMISSIONS:
                         logging.warning(
                             f"API key {name} has invalid role '{role}'. "
-                            f"Allowed: {allowed_roles}"
+                            f"Allowed: {list(ROLE_PERMISSIONS)}"
                         )
                         continue
 
                     api_keys[api_key] = {
                         'name': name,
                         'role': role,
-                        'permissions': JWTManager().roles.get(role, [])
+                        'permissions': ROLE_PERMISSIONS[role]
                     }
                 else:
                     logging.warning(
@@ -262,7 +371,12 @@ class BearerTokenManager:
         Returns:
             Token info if valid, None otherwise
         """
-        return self.api_keys.get(token)
+        entry = self._key_index.get(self._key_digest(token))
+        if entry is None:
+            return None
+        
+        api_key, info = entry
+        return info if hmac.compare_digest(api_key, token.encode('utf-8')) else None
 
 # Global authentication managers
 jwt_manager = JWTManager()
@@ -303,29 +417,31 @@ def authenticate_request() -> Dict[str, Any]:
         )
         raise AuthenticationError("No authentication token provided")
 
-    # Try JWT first
-    try:
-        payload = jwt_manager.decode_token(token)
-        user_info = {
-            'user_id': payload.get('user_id'),
-            'email': payload.get('email'),
-            'role': payload.get('role'),
-            'permissions': payload.get('permissions', []),
-            'token_type': 'jwt'
-        }
+    # Dispatch on token shape: only JWT-shaped tokens (header.payload.signature) pay for
+    # signature verification, so API keys skip a failed decode and its exception
+    if token.count('.') == 2:
+        try:
+            payload = jwt_manager.decode_token(token)
+            user_info = {
+                'user_id': payload.get('user_id'),
+                'email': payload.get('email'),
+                'role': payload.get('role'),
+                'permissions': frozenset(payload.get('permissions', ())),
+                'token_type': 'jwt'
+            }
 
-        audit_logger.log_authentication(
-            user_id=user_info['user_id'],
-            method='jwt',
-            success=True,
-            ip_address=ip_address
-        )
+            audit_logger.log_authentication(
+                user_id=user_info['user_id'],
+                method='jwt',
+                success=True,
+                ip_address=ip_address
+            )
 
-        return user_info
+            return user_info
 
-    except AuthenticationError as e:
-        # JWT failed, try bearer token
-        pass
+        except AuthenticationError as e:
+            # JWT failed, try bearer token
+            pass
 
     # Try Bearer token
     try:
@@ -361,6 +477,21 @@ def authenticate_request() -> Dict[str, Any]:
 
     raise AuthenticationError("Invalid authentication token")
 
+@lru_cache(maxsize=8192)
+def _is_authorized(user_permissions: frozenset, method: str, path: str) -> bool:
+    """
+    Memoized authorization decision for a permission set and endpoint.
+    
+    Endpoint rules are fixed once the app is running; call _is_authorized.cache_clear()
+    after changing jwt_manager.endpoint_permissions.
+    """
+    required_permissions = jwt_manager.get_endpoint_permissions(method, path)
+    
+    if not required_permissions:
+        return True  # No permissions required
+    
+    return jwt_manager.validate_permissions(user_permissions, required_permissions)
+
 def authorize_request(user_info: Dict[str, Any], method: str, path: str) -> bool:
     """
     Authorize request based on user permissions.
@@ -376,14 +507,12 @@ def authorize_request(user_info: Dict[str, Any], method: str, path: str) -> bool
     Raises:
         AuthorizationError: If authorization fails
     """
-    required_permissions = jwt_manager.get_endpoint_permissions(method, path)
+    user_permissions = user_info.get('permissions', ())
+    if not isinstance(user_permissions, frozenset):
+        user_permissions = frozenset(user_permissions)
     
-    if not required_permissions:
-        return True  # No permissions required
-    
-    user_permissions = user_info.get('permissions', [])
-    
-    if not jwt_manager.validate_permissions(user_permissions, required_permissions):
+    if not _is_authorized(user_permissions, method, path):
+        required_permissions = jwt_manager.get_endpoint_permissions(method, path)
         raise AuthorizationError(f"Insufficient permissions. Required: {required_permissions}")
     
     return True
@@ -472,6 +601,8 @@ def require_role(roles: List[str]) -> Callable:
         def admin_route():
             return jsonify({'message': 'Admin access'})
     """
+    allowed_roles = frozenset(roles)
+    
     def decorator(f: Callable) -> Callable:
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -481,7 +612,7 @@ def require_role(roles: List[str]) -> Callable:
                 }), 401
             
             user_role = g.user.get('role')
-            if user_role not in roles:
+            if user_role not in allowed_roles:
                 return jsonify({
                     'error': 'Insufficient role',
                     'message': f'Required roles: {roles}, user role: {user_role}'
@@ -501,27 +632,30 @@ def setup_auth_middleware(app):
     """
     # Add authentication to AI Gatekeeper routes
     protected_blueprints = ['ai_gatekeeper', 'monitoring']
+    protected_prefixes = tuple(f'/api/{bp}' for bp in protected_blueprints)
     
     @app.before_request
     def before_request():
-        # Skip authentication for certain paths
-        skip_paths = ['/health', '/slack/events', '/']
+        # Read each request attribute once; every access goes through Werkzeug's context-local proxy
+        path = request.path
         
-        if request.path in skip_paths:
+        # Skip authentication for certain paths
+        if path in AUTH_SKIP_PATHS:
             return
         
         # Skip authentication for OPTIONS requests (CORS preflight)
-        if request.method == 'OPTIONS':
+        method = request.method
+        if method == 'OPTIONS':
             return
         
         # Check if request is for a protected blueprint
-        if any(request.path.startswith(f'/api/{bp}') for bp in protected_blueprints):
+        if path.startswith(protected_prefixes):
             try:
                 # Authenticate request
                 user_info = authenticate_request()
                 
                 # Authorize request
-                authorize_request(user_info, request.method, request.path)
+                authorize_request(user_info, method, path)
                 
                 # Store user info
                 g.user = user_info
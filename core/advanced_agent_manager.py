@@ -12,10 +12,6 @@ import logging
 import numpy as np
 from collections import defaultdict, deque
 
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared_agents'))
-
 from shared_agents.core.agent_factory import AgentBase, AgentResponse, AgentCapability
 
 @dataclass
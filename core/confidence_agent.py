@@ -10,6 +10,8 @@ import asyncio
 import logging
 from datetime import datetime
 
+from core.openai_client import get_openai_rate_limiter
+
 @dataclass
 class SimilarityMatch:
     content: str
@@ -26,9 +28,10 @@ class ConfidenceResult:
 class ConfidenceAgent:
     """Agent that scores confidence by comparing requests to knowledge base"""
     
-    def __init__(self, openai_client, embedding_model="text-embedding-3-small"):
+    def __init__(self, openai_client, embedding_model="text-embedding-3-small", rate_limiter=None):
         self.openai_client = openai_client
         self.embedding_model = embedding_model
+        self._rate_limiter = rate_limiter or get_openai_rate_limiter()
         self.knowledge_embeddings = {}
         self.knowledge_content = {}
         
@@ -79,10 +82,12 @@ class ConfidenceAgent:
     async def _get_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for text"""
         try:
-            response = await self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=text.strip()
-            )
+            embedding_input = text.strip()
+            async with self._rate_limiter.reserve(len(embedding_input) // 4 + 1):
+                response = await self.openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=embedding_input
+                )
             return np.array(response.data[0].embedding)
         except Exception as e:
             logging.error(f"Embedding generation failed: {e}")
@@ -0,0 +1,78 @@
+"""
+Shared Agent Event Loop
+Runs agent coroutines submitted from synchronous Flask and Slack handlers on one
+long-lived background event loop, so concurrent requests multiplex their OpenAI
+calls cooperatively and reuse the shared client's pooled connections
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def get_agent_loop() -> asyncio.AbstractEventLoop:
+    """Get the shared agent event loop, starting its thread on first use"""
+    global _loop, _thread
+
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()  # uvloop when installed as the policy
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            _thread = threading.Thread(target=run, name='agent-event-loop', daemon=True)
+            _thread.start()
+            ready.wait()
+            _loop = loop
+            logging.info("Started shared agent event loop (%s)", type(loop).__module__)
+
+        return _loop
+
+
+def run_async(awaitable: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the shared agent loop and block the calling thread for its result.
+
+    Must not be called from the agent loop itself. On timeout the coroutine is cancelled
+    and concurrent.futures.TimeoutError is raised.
+    """
+    future = asyncio.run_coroutine_threadsafe(awaitable, get_agent_loop())
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def stop_agent_loop():
+    """Stop the shared agent loop and join its thread (call on application shutdown)"""
+    global _loop, _thread
+
+    with _lock:
+        loop, thread, _loop, _thread = _loop, _thread, None, None
+
+    if loop is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join()
+        loop.close()
+
+
+def _reset_after_fork():
+    """Forget the parent's loop in a forked child, since its thread does not survive the fork"""
+    global _loop, _thread, _lock
+    _loop, _thread, _lock = None, None, threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
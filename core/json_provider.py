@@ -0,0 +1,65 @@
+"""
+Fast JSON Provider
+Flask JSON provider that serializes jsonify() responses with orjson when it is
+installed, keeping Flask's default output for the types it special-cases
+"""
+
+from typing import Any
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider backed by orjson.
+
+    Datetimes and dataclasses are passed through to Flask's default handler so
+    they keep their HTTP-date / asdict() form. Calls with extra json.dumps keyword
+    arguments, and values orjson rejects (such as integers beyond 64 bits), fall
+    back to the stdlib implementation.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._encode(obj, indent=False).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._encode(obj, indent) + b'\n'
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def _encode(self, obj: Any, indent: bool) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+
+def init_json_provider(app) -> bool:
+    """Use the orjson provider for the app's JSON responses; returns False if orjson is unavailable"""
+    if not ORJSON_AVAILABLE:
+        return False
+    app.json = OrjsonProvider(app)
+    return True
@@ -0,0 +1,213 @@
+"""
+Shared OpenAI Client
+Provides one process-wide AsyncOpenAI client backed by a tuned HTTP connection pool,
+and a rate limiter that keeps concurrent agent calls within the account's limits
+"""
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+
+import openai
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# HTTP/2 multiplexing needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Connection pool sized for concurrent agent fan-out (several LLM calls per request)
+MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '100'))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', '50'))
+# Every call is bounded by a request timeout and a retry cap (output tokens are capped per call by max_tokens)
+REQUEST_TIMEOUT = float(os.getenv('OPENAI_REQUEST_TIMEOUT', os.getenv('OPENAI_TIMEOUT', '30.0')))
+CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5.0'))
+MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '3'))
+
+# Outbound rate limits; discover_rate_limits() can replace these with the account's actual limits
+MAX_CONCURRENT_REQUESTS = int(os.getenv('OPENAI_MAX_CONCURRENT_REQUESTS', '20'))
+REQUESTS_PER_MINUTE = int(os.getenv('OPENAI_REQUESTS_PER_MINUTE', '500'))
+TOKENS_PER_MINUTE = int(os.getenv('OPENAI_TOKENS_PER_MINUTE', '200000'))
+
+_client: Optional[openai.AsyncOpenAI] = None
+_rate_limiter: Optional['OpenAIRateLimiter'] = None
+
+
+class OpenAIRateLimiter:
+    """
+    Concurrency cap plus sliding one-minute request and token budgets for OpenAI calls.
+
+    Budgets are shared process-wide; the concurrency semaphore is kept per event loop
+    since asyncio primitives cannot be shared between loops.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+                 requests_per_minute: int = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = TOKENS_PER_MINUTE,
+                 window_seconds: float = 60.0):
+        self.max_concurrent = max_concurrent
+        self.window_seconds = window_seconds
+
+        # Account-wide budgets; this process enforces its worker's share of them
+        self.account_requests_per_minute = requests_per_minute
+        self.account_tokens_per_minute = tokens_per_minute
+        self.worker_count = 1
+        self._apply_worker_share()
+
+        self._window: deque = deque()  # (reserved_at, tokens) per request in the current window
+        self._tokens_in_window = 0
+        self._loop_primitives: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[asyncio.Semaphore, asyncio.Lock]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @asynccontextmanager
+    async def reserve(self, estimated_tokens: int) -> AsyncIterator[None]:
+        """Hold a concurrency slot and reserve request/token budget for one call"""
+
+        semaphore, lock = self._primitives()
+        async with semaphore:
+            async with lock:  # Waiters are served in arrival order
+                await self._wait_for_budget(min(estimated_tokens, self.tokens_per_minute))
+            yield
+
+    def update_limits(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        """Apply newly discovered account limits"""
+        if requests_per_minute:
+            self.account_requests_per_minute = requests_per_minute
+        if tokens_per_minute:
+            self.account_tokens_per_minute = tokens_per_minute
+        self._apply_worker_share()
+
+    def set_worker_count(self, worker_count: int):
+        """Enforce an equal share of the account budgets, as one of worker_count processes using the same key"""
+        self.worker_count = max(1, int(worker_count))
+        self._apply_worker_share()
+
+    def _apply_worker_share(self):
+        self.requests_per_minute = max(1, self.account_requests_per_minute // self.worker_count)
+        self.tokens_per_minute = max(1, self.account_tokens_per_minute // self.worker_count)
+
+    async def _wait_for_budget(self, tokens: int):
+        while True:
+            now = time.monotonic()
+            while self._window and self._window[0][0] <= now - self.window_seconds:
+                self._tokens_in_window -= self._window.popleft()[1]
+
+            if (len(self._window) < self.requests_per_minute
+                    and self._tokens_in_window + tokens <= self.tokens_per_minute):
+                self._window.append((now, tokens))
+                self._tokens_in_window += tokens
+                return
+
+            # Sleep until the oldest reservation leaves the window
+            await asyncio.sleep(self._window[0][0] + self.window_seconds - now)
+
+    def _primitives(self) -> Tuple[asyncio.Semaphore, asyncio.Lock]:
+        loop = asyncio.get_running_loop()
+        primitives = self._loop_primitives.get(loop)
+        if primitives is None:
+            primitives = (asyncio.Semaphore(self.max_concurrent), asyncio.Lock())
+            self._loop_primitives[loop] = primitives
+        return primitives
+
+
+def get_openai_client(timeout: Optional[float] = None, max_retries: Optional[int] = None) -> openai.AsyncOpenAI:
+    """
+    Get the shared AsyncOpenAI client, creating it on first use.
+
+    All agents should use this client so concurrent calls reuse pooled
+    keep-alive connections instead of each opening their own. ``timeout`` and
+    ``max_retries`` override the environment defaults when the client is created.
+    """
+    global _client
+
+    if _client is None:
+        timeout = REQUEST_TIMEOUT if timeout is None else float(timeout)
+        max_retries = MAX_RETRIES if max_retries is None else max_retries
+        client_kwargs = {'api_key': os.getenv('OPENAI_API_KEY'), 'max_retries': max_retries}
+        if HTTPX_AVAILABLE:
+            client_kwargs['http_client'] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+                ),
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(timeout, connect=min(CONNECT_TIMEOUT, timeout))
+            )
+        else:
+            # Fall back to the SDK's own default pool
+            client_kwargs['timeout'] = timeout
+        _client = openai.AsyncOpenAI(**client_kwargs)
+        logging.info(
+            "Created shared OpenAI client (max_connections=%d, http2=%s, timeout=%.0fs, max_retries=%d)",
+            MAX_CONNECTIONS, HTTP2_AVAILABLE and HTTPX_AVAILABLE, timeout, max_retries
+        )
+
+    return _client
+
+
+async def close_openai_client():
+    """Close the shared client and its connection pool (call on application shutdown)"""
+    global _client
+
+    if _client is not None:
+        client, _client = _client, None
+        await client.close()
+
+
+def _reset_after_fork():
+    """Drop the parent's client in a forked child, since its pooled connections belong to the parent"""
+    global _client
+    _client = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_openai_rate_limiter() -> OpenAIRateLimiter:
+    """Get the process-wide OpenAI rate limiter shared by all agents"""
+    global _rate_limiter
+
+    if _rate_limiter is None:
+        _rate_limiter = OpenAIRateLimiter()
+
+    return _rate_limiter
+
+
+async def discover_rate_limits(model: str = 'gpt-4o-mini') -> bool:
+    """
+    Send a 1-token probe and adopt the account's request/token limits from its
+    rate-limit headers. Returns False if the probe fails.
+    """
+    try:
+        response = await get_openai_client().chat.completions.with_raw_response.create(
+            model=model,
+            messages=[{"role": "user", "content": "ping"}],
+            max_tokens=1
+        )
+    except Exception as e:
+        logging.warning("OpenAI rate limit discovery failed: %s", e)
+        return False
+
+    requests_limit = response.headers.get('x-ratelimit-limit-requests')
+    tokens_limit = response.headers.get('x-ratelimit-limit-tokens')
+    get_openai_rate_limiter().update_limits(
+        int(requests_limit) if requests_limit else None,
+        int(tokens_limit) if tokens_limit else None
+    )
+    logging.info("Discovered OpenAI rate limits: %s requests/min, %s tokens/min", requests_limit, tokens_limit)
+    return True
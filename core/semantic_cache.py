@@ -0,0 +1,136 @@
+"""
+Semantic Response Cache
+Reuses LLM responses for near-duplicate queries via random-projection LSH over embeddings
+"""
+
+import copy
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache for parsed LLM responses.
+
+    Entries are bucketed by random-hyperplane signatures across several LSH tables,
+    so a lookup only scores the few entries sharing a bucket with the query. A hit
+    requires an exact match on ``key`` (e.g. user level) and cosine similarity at or
+    above ``threshold``.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 3600.0, max_entries: int = 1000,
+                 num_tables: int = 8, bits_per_table: int = 8, seed: int = 0):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.num_tables = num_tables
+        self.bits_per_table = bits_per_table
+        self._rng = np.random.default_rng(seed)
+        self._planes: Optional[np.ndarray] = None  # Sized from the first embedding seen
+        self._bit_weights = (1 << np.arange(bits_per_table, dtype=np.int64))
+
+        # entry id -> (key, unit vector, value, signatures, expires_at)
+        self._entries: "OrderedDict[int, Tuple[str, np.ndarray, Any, Tuple[int, ...], float]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, int, str], Set[int]] = {}
+        # (expires_at, entry id) in insertion order, which is expiry order since all entries share one TTL
+        self._expiry: deque = deque()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, embedding: np.ndarray) -> Optional[Any]:
+        """Return a copy of the cached value for a similar embedding, or None on miss"""
+
+        if not self._entries or self._planes is None or embedding.shape[0] != self._planes.shape[1]:
+            self.misses += 1
+            return None
+
+        vector = self._normalize(embedding)
+        now = time.monotonic()
+        candidates: Set[int] = set()
+        for table, signature in enumerate(self._signatures(vector)):
+            candidates.update(self._buckets.get((table, signature, key), ()))
+
+        live = [entry_id for entry_id in candidates if self._entries[entry_id][4] > now]
+        if live:
+            scores = np.stack([self._entries[entry_id][1] for entry_id in live]) @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                entry_id = live[best]
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                return copy.deepcopy(self._entries[entry_id][2])
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, embedding: np.ndarray, value: Any):
+        """Cache a value under the given key and embedding"""
+
+        if self._planes is None:
+            self._planes = self._rng.standard_normal(
+                (self.num_tables * self.bits_per_table, embedding.shape[0])
+            ).astype(np.float32)
+        elif embedding.shape[0] != self._planes.shape[1]:
+            return
+
+        vector = self._normalize(embedding)
+        signatures = self._signatures(vector)
+        entry_id = self._next_id
+        self._next_id += 1
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        self._entries[entry_id] = (key, vector, copy.deepcopy(value), signatures, expires_at)
+        self._expiry.append((expires_at, entry_id))
+        for table, signature in enumerate(signatures):
+            self._buckets.setdefault((table, signature, key), set()).add(entry_id)
+
+        self._evict()
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._entries.clear()
+        self._buckets.clear()
+        self._expiry.clear()
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones over capacity"""
+
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            entry_id = self._expiry.popleft()[1]
+            if entry_id in self._entries:
+                self._remove(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+        # Entries evicted as least recently used stay queued until they expire; compact if they pile up
+        if len(self._expiry) > 2 * self.max_entries:
+            self._expiry = deque((entry[4], entry_id) for entry_id, entry in sorted(self._entries.items()))
+
+    def _remove(self, entry_id: int):
+        key, _, _, signatures, _ = self._entries.pop(entry_id)
+        for table, signature in enumerate(signatures):
+            bucket_key = (table, signature, key)
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[bucket_key]
+
+    def _signatures(self, vector: np.ndarray) -> Tuple[int, ...]:
+        bits = (self._planes @ vector > 0).reshape(self.num_tables, self.bits_per_table)
+        return tuple(int(signature) for signature in bits @ self._bit_weights)
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
@@ -3,10 +3,9 @@ Support Request Processing Engine for AI Gatekeeper System
 Leverages existing agent framework for intelligent support automation
 """
 
-import sys
-import os
 import json
 import asyncio
+import functools
 import uuid
 import logging
 from typing import Dict, Any, List, Optional, Tuple
@@ -14,14 +13,11 @@ from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
 
-# Add shared agents to Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared_agents'))
-
 from shared_agents.core.agent_factory import AgentBase, AgentResponse, AgentCapability
 from shared_agents.config.shared_config import SharedConfig
 from core.confidence_agent import ConfidenceAgent, ConfidenceResult
 from core.advanced_agent_manager import AdvancedAgentManager
-from db import get_db_session, SupportTicket, SupportRequestStatus
+from db import new_db_session, SupportTicket, SupportRequestStatus
 from db.crud import SupportTicketCRUD, SwarmExecutionCRUD
 from sqlalchemy.orm import Session
 
@@ -102,6 +98,12 @@ class SupportRequestProcessor:
         """Set the advanced agent manager with swarm intelligence."""
         self.advanced_agent_manager = advanced_agent_manager
     
+    @staticmethod
+    async def _run_db(func, *args, **kwargs):
+        """Run blocking database work in the default executor so it does not stall the shared agent loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    
     async def process_support_request(self, message: str, user_context: Dict[str, Any]) -> SupportTicket:
         """
         Process an incoming support request using advanced agent framework and database persistence.
@@ -113,11 +115,13 @@ class SupportRequestProcessor:
         Returns:
             SupportTicket with processing results
         """
-        db_session = get_db_session()
+        # Each request owns its session: concurrent requests run as coroutines on the same loop thread
+        db_session = await self._run_db(new_db_session)
         
         try:
             # Create new support ticket in database
-            ticket = SupportTicketCRUD.create_ticket(
+            ticket = await self._run_db(
+                SupportTicketCRUD.create_ticket,
                 db_session,
                 message=message,
                 user_context=user_context,
@@ -137,7 +141,8 @@ class SupportRequestProcessor:
                 )
                 
                 # Store swarm execution results
-                SwarmExecutionCRUD.create_swarm_execution(
+                await self._run_db(
+                    SwarmExecutionCRUD.create_swarm_execution,
                     db_session,
                     ticket_id=str(ticket.id),
                     participating_agents=['triage', 'confidence', 'research'],
@@ -151,7 +156,8 @@ class SupportRequestProcessor:
                 risk_score = self._calculate_risk_from_swarm_result(swarm_result)
                 
                 # Update ticket with analysis results
-                ticket = SupportTicketCRUD.update_ticket_status(
+                ticket = await self._run_db(
+                    SupportTicketCRUD.update_ticket_status,
                     db_session,
                     ticket_id=str(ticket.id),
                     status=SupportRequestStatus.AI_AUTO.value,
@@ -163,7 +169,8 @@ class SupportRequestProcessor:
             else:
                 # Fallback to original processing
                 triage_result = await self._perform_triage_evaluation_fallback(message, user_context)
-                ticket = SupportTicketCRUD.update_ticket_status(
+                ticket = await self._run_db(
+                    SupportTicketCRUD.update_ticket_status,
                     db_session,
                     ticket_id=str(ticket.id),
                     status=SupportRequestStatus.AI_AUTO.value,
@@ -185,13 +192,14 @@ class SupportRequestProcessor:
             logging.error(f"Support request processing failed: {e}")
             # Update ticket status to escalated on error
             if 'ticket' in locals():
-                SupportTicketCRUD.escalate_ticket(
+                await self._run_db(
+                    SupportTicketCRUD.escalate_ticket,
                     db_session,
                     ticket_id=str(ticket.id),
                     escalation_reason=f"Processing error: {str(e)}"
                 )
         finally:
-            db_session.close()
+            await self._run_db(db_session.close)
             
         return ticket
     
@@ -558,7 +566,8 @@ class SupportRequestProcessor:
                 
                 # Create solution record
                 from db.crud import SolutionCRUD
-                solution = SolutionCRUD.create_solution(
+                solution = await self._run_db(
+                    SolutionCRUD.create_solution,
                     db_session,
                     title=f"Automated solution for: {ticket.message[:50]}...",
                     content=solution_result.get('solution_content', 'No solution generated'),
@@ -575,14 +584,14 @@ class SupportRequestProcessor:
                 ticket.resolved_at = datetime.utcnow()
                 ticket.updated_at = datetime.utcnow()
                 
-                db_session.commit()
+                await self._run_db(db_session.commit)
                 
             else:
                 # Fallback to basic resolution
                 ticket.status = SupportRequestStatus.AI_AUTO.value
                 ticket.resolved_at = datetime.utcnow()
                 ticket.updated_at = datetime.utcnow()
-                db_session.commit()
+                await self._run_db(db_session.commit)
                 
         except Exception as e:
             logging.error(f"Automated resolution failed for ticket {ticket.id}: {e}")
@@ -593,13 +602,14 @@ class SupportRequestProcessor:
         """Handle escalation to human with database persistence"""
         try:
             # Enrich context for human expert
-            enriched_context = await self._enrich_context_for_human_with_db(ticket)
+            enriched_context = await self._enrich_context_for_human_with_db(ticket, db_session)
             
             # Update ticket status
             from db.crud import SupportTicketCRUD
             escalation_reason = self._get_escalation_reason_from_ticket(ticket)
             
-            SupportTicketCRUD.escalate_ticket(
+            await self._run_db(
+                SupportTicketCRUD.escalate_ticket,
                 db_session,
                 ticket_id=str(ticket.id),
                 escalation_reason=escalation_reason,
@@ -610,7 +620,7 @@ class SupportRequestProcessor:
             ticket.triage_analysis = ticket.triage_analysis or {}
             ticket.triage_analysis['enriched_context'] = enriched_context
             
-            db_session.commit()
+            await self._run_db(db_session.commit)
             
         except Exception as e:
             logging.error(f"Escalation failed for ticket {ticket.id}: {e}")
@@ -619,7 +629,7 @@ class SupportRequestProcessor:
             ticket.escalation_reason = f"Processing error: {str(e)}"
             ticket.escalated_at = datetime.utcnow()
             ticket.updated_at = datetime.utcnow()
-            db_session.commit()
+            await self._run_db(db_session.commit)
     
     async def _perform_triage_evaluation_fallback(self, message: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
         """Fallback triage evaluation when advanced agent manager is not available"""
@@ -634,8 +644,8 @@ class SupportRequestProcessor:
         # Use original triage evaluation logic
         return await self._perform_original_triage_evaluation(temp_request)
     
-    async def _enrich_context_for_human_with_db(self, ticket: SupportTicket) -> Dict[str, Any]:
-        """Enrich context for human expert using database"""
+    async def _enrich_context_for_human_with_db(self, ticket: SupportTicket, db_session: Session) -> Dict[str, Any]:
+        """Enrich context for human expert using the request's database session"""
         enriched = {
             'ai_analysis': {
                 'confidence_score': ticket.confidence_score,
@@ -651,14 +661,13 @@ class SupportRequestProcessor:
         
         # Find similar tickets using database
         try:
-            from db.crud import SupportTicketCRUD
-            db_session = get_db_session()
-            
             # Get recent similar tickets (simple keyword matching)
-            similar_tickets = db_session.query(SupportTicket).filter(
-                SupportTicket.id != ticket.id,
-                SupportTicket.message.ilike(f'%{ticket.message[:20]}%')
-            ).limit(5).all()
+            similar_tickets = await self._run_db(
+                db_session.query(SupportTicket).filter(
+                    SupportTicket.id != ticket.id,
+                    SupportTicket.message.ilike(f'%{ticket.message[:20]}%')
+                ).limit(5).all
+            )
             
             enriched['similar_cases'] = [
                 {
@@ -670,11 +679,10 @@ class SupportRequestProcessor:
                 } for t in similar_tickets
             ]
             
-            db_session.close()
-            
         except Exception as e:
             logging.error(f"Failed to enrich context for ticket {ticket.id}: {e}")
             enriched['enrichment_error'] = str(e)
+            await self._run_db(db_session.rollback)  # Leave the request's session usable for the escalation
         
         return enriched
     
@@ -2,14 +2,14 @@
 Database package initialization
 """
 
-from .database import db_manager, get_db_session, init_database
+from .database import db_manager, get_db_session, new_db_session, init_database
 from .models import (
     SupportTicket, Solution, SupportFeedback, KnowledgeBase, 
     AgentPerformance, SwarmExecution, SupportRequestStatus
 )
 
 __all__ = [
-    'db_manager', 'get_db_session', 'init_database',
+    'db_manager', 'get_db_session', 'new_db_session', 'init_database',
     'SupportTicket', 'Solution', 'SupportFeedback', 'KnowledgeBase',
     'AgentPerformance', 'SwarmExecution', 'SupportRequestStatus'
 ]
\ No newline at end of file
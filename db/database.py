@@ -3,7 +3,7 @@ Database configuration and session management
 """
 
 import os
-from sqlalchemy import create_engine, event, pool
+from sqlalchemy import create_engine, event, pool, text
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.exc import SQLAlchemyError, OperationalError, DisconnectionError
 import logging
@@ -123,13 +123,16 @@ class DatabaseManager:
         finally:
             session.close()
 
-    def get_session(self, timeout: int = 30, max_retries: int = 3):
+    def get_session(self, timeout: int = 30, max_retries: int = 3, scoped: bool = True):
         """
         Get a database session with timeout and retry logic.
 
         Args:
             timeout: Maximum time to wait for connection (seconds)
             max_retries: Maximum number of retry attempts
+            scoped: Return the calling thread's scoped session (default). Pass False for
+                a new session owned by the caller, e.g. one per coroutine when many
+                coroutines share the agent event loop's thread
 
         Returns:
             Database session
@@ -145,9 +148,9 @@ class DatabaseManager:
         for attempt in range(max_retries):
             try:
                 # Try to get session
-                session = self.Session()
+                session = self.Session() if scoped else self.session_factory()
                 # Test connection is alive
-                session.execute("SELECT 1")
+                session.execute(text("SELECT 1"))
                 return session
             except (OperationalError, DisconnectionError) as e:
                 if attempt < max_retries - 1:
@@ -177,7 +180,7 @@ class DatabaseManager:
         """Enhanced health check with connection pool status"""
         try:
             with self.get_session_context() as session:
-                session.execute("SELECT 1")
+                session.execute(text("SELECT 1"))
 
             # Get pool stats
             pool_stats = {
@@ -244,6 +247,15 @@ def get_db_session():
     """Get database session - use this in routes"""
     return db_manager.get_session()
 
+def new_db_session():
+    """
+    Get a new, unscoped database session that the caller must close.
+
+    Use this from coroutines: they share the event loop's thread, so the thread's
+    scoped session would be shared between concurrent requests.
+    """
+    return db_manager.get_session(scoped=False)
+
 def init_database(app=None):
     """Initialize database with app context"""
     if not db_manager.initialize():
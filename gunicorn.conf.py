@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for AI Gatekeeper
+The app is preloaded once in the master so the agents' embedded knowledge base is
+built once and shared copy-on-write by every worker
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = 'app:create_app()'
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# gthread workers: request threads plus one agent event loop thread per worker
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+timeout = int(os.getenv('REQUEST_TIMEOUT', '120'))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = 50
+
+preload_app = True
+
+
+def pre_fork(server, worker):
+    """
+    Let agent initialization finish in the master before forking, so workers inherit it.
+    Forking while it runs could copy locks held by its loop thread into the workers.
+    """
+    if server.cfg.preload_app:
+        from app import ensure_agents
+        ensure_agents(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    """Give each worker its own event loop thread, OpenAI client and share of the OpenAI rate limits"""
+    if server.cfg.preload_app:
+        from app import init_forked_worker
+        init_forked_worker(server.app.wsgi(), worker_count=server.cfg.workers)
@@ -4,7 +4,6 @@ Integrates with existing Flask application to provide support workflow endpoints
 """
 
 import json
-import asyncio
 import traceback
 import time
 from typing import Dict, Any, Optional
@@ -12,9 +11,7 @@ from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
 
 # Import AI Gatekeeper components
-import sys
 import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from core.support_request_processor import SupportRequestProcessor, SupportRequest, SupportRequestStatus
 from knowledge.solution_generator import KnowledgeBaseSolutionGenerator, SolutionType
@@ -22,6 +19,7 @@ from monitoring.metrics_system import metrics_collector, performance_tracker, tr
 from auth.middleware import auth_required, optional_auth
 from integrations.validators import RequestValidator, limit_content_length
 from core.rate_limiter import limiter, get_rate_limit
+from core.event_loop import run_async
 
 
 # Create Blueprint for AI Gatekeeper routes
@@ -74,6 +72,10 @@ def register_ai_gatekeeper_routes(app):
     except Exception as e:
         print(f"⚠️  AI Gatekeeper initialization failed: {e}")
     
+    # Expose the components so agents initialized later can be connected to them
+    app.support_processor = support_processor
+    app.solution_generator = solution_generator
+    
     # Register the blueprint
     app.register_blueprint(ai_gatekeeper_bp)
     
@@ -121,15 +123,8 @@ def evaluate_support_request():
         if not support_processor:
             return jsonify({'error': 'AI Gatekeeper not properly initialized'}), 503
         
-        # Process support request asynchronously
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            support_request = loop.run_until_complete(
-                support_processor.process_support_request(message, user_context)
-            )
-        finally:
-            loop.close()
+        # Process support request on the shared agent event loop
+        support_request = run_async(support_processor.process_support_request(message, user_context))
         
         # Track metrics
         duration = time.time() - start_time
@@ -250,19 +245,14 @@ def generate_solution():
         if not solution_generator:
             return jsonify({'error': 'Solution generator not properly initialized'}), 503
         
-        # Generate solution asynchronously
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            generated_solution = loop.run_until_complete(
-                solution_generator.generate_solution(
-                    issue_description, 
-                    user_context, 
-                    solution_type
-                )
+        # Generate solution on the shared agent event loop
+        generated_solution = run_async(
+            solution_generator.generate_solution(
+                issue_description, 
+                user_context, 
+                solution_type
             )
-        finally:
-            loop.close()
+        )
         
         # Format solution for response
         solution_response = {
@@ -439,14 +429,7 @@ def slack_integration():
             return jsonify({'error': 'AI Gatekeeper not properly initialized'}), 503
         
         # Process support request
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            support_request = loop.run_until_complete(
-                support_processor.process_support_request(message, context)
-            )
-        finally:
-            loop.close()
+        support_request = run_async(support_processor.process_support_request(message, context))
         
         # Format response for Slack
         if support_request.resolution_path == "automated_resolution":
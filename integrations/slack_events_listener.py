@@ -8,13 +8,14 @@ import json
 import hmac
 import hashlib
 import logging
-import asyncio
 import time
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
 from flask import Flask, request, jsonify
 from threading import Thread
 
+from core.event_loop import run_async
+
 # Slack SDK imports
 try:
     from slack_sdk import WebClient
@@ -111,25 +112,25 @@ class SlackEventsListener:
         # Message events
         @self.bolt_app.event("app_mention")
         def handle_app_mention(event, say, client):
-            asyncio.run(self._handle_app_mention(event, say, client))
+            self._handle_app_mention(event, say, client)
         
         @self.bolt_app.event("message")
         def handle_message(event, say, client):
-            asyncio.run(self._handle_message(event, say, client))
+            self._handle_message(event, say, client)
         
         # Slash commands
         @self.bolt_app.command("/ai-support")
         def handle_support_command(ack, respond, command, client):
-            asyncio.run(self._handle_support_command(ack, respond, command, client))
+            self._handle_support_command(ack, respond, command, client)
         
         # Interactive components
         @self.bolt_app.action("feedback_rating")
         def handle_feedback_rating(ack, body, client):
-            asyncio.run(self._handle_feedback_rating(ack, body, client))
+            self._handle_feedback_rating(ack, body, client)
         
         @self.bolt_app.action("escalate_request")
         def handle_escalation_request(ack, body, client):
-            asyncio.run(self._handle_escalation_request(ack, body, client))
+            self._handle_escalation_request(ack, body, client)
     
     def _get_bot_user_id(self):
         """Get bot user ID for message filtering."""
@@ -140,7 +141,7 @@ class SlackEventsListener:
         except Exception as e:
             logging.error(f"Failed to get bot user ID: {e}")
     
-    async def _handle_app_mention(self, event, say, client):
+    def _handle_app_mention(self, event, say, client):
         """Handle app mention events."""
         try:
             user_id = event.get('user')
@@ -153,26 +154,26 @@ class SlackEventsListener:
             
             # Process support request
             if self.support_processor:
-                user_context = await self._get_user_context(user_id, channel)
+                user_context = self._get_user_context(user_id, channel)
                 
                 # Process the request
-                ticket = await self.support_processor.process_support_request(
+                ticket = run_async(self.support_processor.process_support_request(
                     text, user_context
-                )
+                ))
                 
                 # Send response based on resolution
                 if ticket.status == 'ai_auto':
-                    await self._send_automated_solution(say, ticket)
+                    self._send_automated_solution(say, ticket)
                 else:
-                    await self._send_escalation_notification(say, ticket)
+                    self._send_escalation_notification(say, ticket)
             else:
-                await say("AI Gatekeeper support processor is not available.")
+                say("AI Gatekeeper support processor is not available.")
                 
         except Exception as e:
             logging.error(f"Error handling app mention: {e}")
-            await say("Sorry, I encountered an error processing your request.")
+            say("Sorry, I encountered an error processing your request.")
     
-    async def _handle_message(self, event, say, client):
+    def _handle_message(self, event, say, client):
         """Handle direct message events."""
         try:
             # Only process direct messages or messages in support channels
@@ -190,40 +191,40 @@ class SlackEventsListener:
             
             # Check if it's a DM or support channel
             is_dm = channel_type == 'im'
-            is_support_channel = await self._is_support_channel(channel, client)
+            is_support_channel = self._is_support_channel(channel, client)
             
             if is_dm or is_support_channel:
                 text = event.get('text', '')
                 
                 # Process support request
                 if self.support_processor:
-                    user_context = await self._get_user_context(user_id, channel)
+                    user_context = self._get_user_context(user_id, channel)
                     
                     # Process the request
-                    ticket = await self.support_processor.process_support_request(
+                    ticket = run_async(self.support_processor.process_support_request(
                         text, user_context
-                    )
+                    ))
                     
                     # Send response based on resolution
                     if ticket.status == 'ai_auto':
-                        await self._send_automated_solution(say, ticket)
+                        self._send_automated_solution(say, ticket)
                     else:
-                        await self._send_escalation_notification(say, ticket)
+                        self._send_escalation_notification(say, ticket)
                         
         except Exception as e:
             logging.error(f"Error handling message: {e}")
     
-    async def _handle_support_command(self, ack, respond, command, client):
+    def _handle_support_command(self, ack, respond, command, client):
         """Handle /ai-support slash command."""
         try:
-            await ack()
+            ack()
             
             text = command.get('text', '').strip()
             user_id = command.get('user_id')
             channel_id = command.get('channel_id')
             
             if not text:
-                await respond({
+                respond({
                     "response_type": "ephemeral",
                     "text": "Please provide a description of your issue. Example: `/ai-support My application crashes when I try to save files`"
                 })
@@ -231,12 +232,12 @@ class SlackEventsListener:
             
             # Process support request
             if self.support_processor:
-                user_context = await self._get_user_context(user_id, channel_id)
+                user_context = self._get_user_context(user_id, channel_id)
                 
                 # Process the request
-                ticket = await self.support_processor.process_support_request(
+                ticket = run_async(self.support_processor.process_support_request(
                     text, user_context
-                )
+                ))
                 
                 # Send response based on resolution
                 if ticket.status == 'ai_auto':
@@ -244,24 +245,24 @@ class SlackEventsListener:
                 else:
                     response = self._format_escalation_response(ticket)
                 
-                await respond(response)
+                respond(response)
             else:
-                await respond({
+                respond({
                     "response_type": "ephemeral",
                     "text": "AI Gatekeeper support processor is not available."
                 })
                 
         except Exception as e:
             logging.error(f"Error handling support command: {e}")
-            await respond({
+            respond({
                 "response_type": "ephemeral",
                 "text": "Sorry, I encountered an error processing your request."
             })
     
-    async def _handle_feedback_rating(self, ack, body, client):
+    def _handle_feedback_rating(self, ack, body, client):
         """Handle feedback rating button clicks."""
         try:
-            await ack()
+            ack()
             
             user_id = body.get('user', {}).get('id')
             action_value = body.get('actions', [{}])[0].get('value')
@@ -275,22 +276,22 @@ class SlackEventsListener:
                 # Submit feedback
                 if self.support_processor:
                     # Call feedback endpoint
-                    feedback_result = await self._submit_feedback(
+                    feedback_result = self._submit_feedback(
                         ticket_id, rating, user_id
                     )
                     
                     # Update message with feedback confirmation
-                    await self._update_message_with_feedback(
+                    self._update_message_with_feedback(
                         client, body, rating, feedback_result
                     )
             
         except Exception as e:
             logging.error(f"Error handling feedback rating: {e}")
     
-    async def _handle_escalation_request(self, ack, body, client):
+    def _handle_escalation_request(self, ack, body, client):
         """Handle escalation request button clicks."""
         try:
-            await ack()
+            ack()
             
             user_id = body.get('user', {}).get('id')
             action_value = body.get('actions', [{}])[0].get('value')
@@ -303,27 +304,27 @@ class SlackEventsListener:
                 # Escalate to human
                 if self.support_processor:
                     # Call handoff endpoint
-                    handoff_result = await self._handoff_to_human(
+                    handoff_result = self._handoff_to_human(
                         ticket_id, "User requested escalation", user_id
                     )
                     
                     # Update message with escalation confirmation
-                    await self._update_message_with_escalation(
+                    self._update_message_with_escalation(
                         client, body, handoff_result
                     )
             
         except Exception as e:
             logging.error(f"Error handling escalation request: {e}")
     
-    async def _get_user_context(self, user_id: str, channel_id: str) -> Dict[str, Any]:
+    def _get_user_context(self, user_id: str, channel_id: str) -> Dict[str, Any]:
         """Get user context for support processing."""
         try:
             # Get user info
-            user_info = await self.web_client.users_info(user=user_id)
+            user_info = self.web_client.users_info(user=user_id)
             user_data = user_info.get('user', {})
             
             # Get channel info
-            channel_info = await self.web_client.conversations_info(channel=channel_id)
+            channel_info = self.web_client.conversations_info(channel=channel_id)
             channel_data = channel_info.get('channel', {})
             
             return {
@@ -345,10 +346,10 @@ class SlackEventsListener:
                 'timestamp': datetime.now().isoformat()
             }
     
-    async def _is_support_channel(self, channel_id: str, client) -> bool:
+    def _is_support_channel(self, channel_id: str, client) -> bool:
         """Check if channel is a support channel."""
         try:
-            channel_info = await client.conversations_info(channel=channel_id)
+            channel_info = client.conversations_info(channel=channel_id)
             channel_name = channel_info.get('channel', {}).get('name', '').lower()
             
             return any(pattern in channel_name for pattern in self.support_channels)
@@ -357,22 +358,22 @@ class SlackEventsListener:
             logging.error(f"Error checking support channel: {e}")
             return False
     
-    async def _send_automated_solution(self, say, ticket):
+    def _send_automated_solution(self, say, ticket):
         """Send automated solution message."""
         try:
             solution_data = ticket.triage_analysis.get('solution', {})
             blocks = self._create_solution_blocks(ticket, solution_data)
             
-            await say(blocks=blocks)
+            say(blocks=blocks)
             
         except Exception as e:
             logging.error(f"Error sending automated solution: {e}")
     
-    async def _send_escalation_notification(self, say, ticket):
+    def _send_escalation_notification(self, say, ticket):
         """Send escalation notification message."""
         try:
             blocks = self._create_escalation_blocks(ticket)
-            await say(blocks=blocks)
+            say(blocks=blocks)
             
         except Exception as e:
             logging.error(f"Error sending escalation notification: {e}")
@@ -495,7 +496,7 @@ class SlackEventsListener:
             "blocks": self._create_escalation_blocks(ticket)
         }
     
-    async def _submit_feedback(self, ticket_id: str, rating: int, user_id: str) -> Dict[str, Any]:
+    def _submit_feedback(self, ticket_id: str, rating: int, user_id: str) -> Dict[str, Any]:
         """Submit feedback to the system."""
         try:
             # This would call the feedback API endpoint
@@ -511,7 +512,7 @@ class SlackEventsListener:
                 "error": str(e)
             }
     
-    async def _handoff_to_human(self, ticket_id: str, reason: str, user_id: str) -> Dict[str, Any]:
+    def _handoff_to_human(self, ticket_id: str, reason: str, user_id: str) -> Dict[str, Any]:
         """Handoff ticket to human expert."""
         try:
             # This would call the handoff API endpoint
@@ -527,7 +528,7 @@ class SlackEventsListener:
                 "error": str(e)
             }
     
-    async def _update_message_with_feedback(self, client, body, rating: int, feedback_result: Dict[str, Any]):
+    def _update_message_with_feedback(self, client, body, rating: int, feedback_result: Dict[str, Any]):
         """Update message with feedback confirmation."""
         try:
             # Replace action buttons with feedback confirmation
@@ -542,7 +543,7 @@ class SlackEventsListener:
             ]
             
             # Update the message
-            await client.chat_update(
+            client.chat_update(
                 channel=body.get('channel', {}).get('id'),
                 ts=body.get('message', {}).get('ts'),
                 blocks=updated_blocks
@@ -551,7 +552,7 @@ class SlackEventsListener:
         except Exception as e:
             logging.error(f"Error updating message with feedback: {e}")
     
-    async def _update_message_with_escalation(self, client, body, handoff_result: Dict[str, Any]):
+    def _update_message_with_escalation(self, client, body, handoff_result: Dict[str, Any]):
         """Update message with escalation confirmation."""
         try:
             # Replace action buttons with escalation confirmation
@@ -566,7 +567,7 @@ class SlackEventsListener:
             ]
             
             # Update the message
-            await client.chat_update(
+            client.chat_update(
                 channel=body.get('channel', {}).get('id'),
                 ts=body.get('message', {}).get('ts'),
                 blocks=updated_blocks
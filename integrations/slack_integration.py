@@ -3,7 +3,6 @@ Slack Integration for AI Gatekeeper System
 Leverages existing infrastructure for seamless Slack communication
 """
 
-import os
 import json
 import asyncio
 import requests
@@ -11,10 +10,6 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 from dataclasses import dataclass
 
-# Import existing TTS service and ExecutiveAssistant capabilities
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-
 
 @dataclass
 class SlackMessage:
@@ -4,16 +4,26 @@ Knowledge Base Loader for Confidence Agent
 
 import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from knowledge.knowledge_base_setup import SupportKnowledgeBaseManager
 
 class KnowledgeLoader:
     """Loads knowledge base data for confidence agent"""
     
-    @staticmethod
-    async def load_sample_knowledge() -> List[Dict[str, Any]]:
+    _sample_knowledge: Optional[List[Dict[str, Any]]] = None  # Built once, shared by every agent
+    
+    @classmethod
+    async def load_sample_knowledge(cls) -> List[Dict[str, Any]]:
         """Load sample knowledge base items"""
         
+        if cls._sample_knowledge is None:
+            cls._sample_knowledge = cls._build_sample_knowledge()
+        return list(cls._sample_knowledge)
+    
+    @staticmethod
+    def _build_sample_knowledge() -> List[Dict[str, Any]]:
+        """Build the sample knowledge base items"""
+        
         # Create sample knowledge items
         knowledge_items = []
         
@@ -3,8 +3,6 @@ Solution Generator for AI Gatekeeper System
 Extends ResearchAgent capabilities for intelligent support solution generation
 """
 
-import sys
-import os
 import json
 import asyncio
 from typing import Dict, Any, List, Optional, Union
@@ -12,9 +10,6 @@ from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
 
-# Add shared agents to Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared_agents'))
-
 from shared_agents.core.agent_factory import AgentBase, AgentResponse, AgentCapability
 
 
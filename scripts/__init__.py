@@ -0,0 +1,3 @@
+"""
+Operational scripts for the AI Gatekeeper System
+"""
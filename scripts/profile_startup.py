@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Startup Profiling Script for AI Gatekeeper
+Profiles create_app() cold start and reports which initialization steps dominate it
+
+Usage:
+    python -m scripts.profile_startup                 # cProfile, prints the slowest steps
+    python -m scripts.profile_startup --py-spy        # py-spy flamegraph (startup.svg)
+    python -m scripts.profile_startup --max-share 5   # exit 1 if any step exceeds 5% of startup
+
+Run it as a module from the project root (or with the package installed) so `app` is importable.
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import shutil
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+STARTUP_CODE = 'from app import create_app; create_app()'
+
+
+def profile_with_py_spy(output: str) -> int:
+    """Record a flamegraph of a fresh interpreter running create_app()"""
+    if not shutil.which('py-spy'):
+        print("❌ py-spy is not installed (pip install py-spy)")
+        return 1
+
+    command = ['py-spy', 'record', '--rate', '250', '-o', output, '--', sys.executable, '-c', STARTUP_CODE]
+    result = subprocess.run(command, cwd=PROJECT_ROOT)
+    if result.returncode == 0:
+        print(f"✅ Flamegraph written to {output}")
+    return result.returncode
+
+
+def profile_with_cprofile(output: str, top: int, max_share: float) -> int:
+    """Profile create_app() in-process and report its direct callees by cumulative time"""
+    os.chdir(PROJECT_ROOT)
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    from app import create_app
+    create_app()
+    profiler.disable()
+    wall = time.perf_counter() - start
+
+    profiler.dump_stats(output)
+    stats = pstats.Stats(profiler)
+    stats.calc_callees()
+
+    create_app_key = next(key for key in stats.stats if key[2] == 'create_app' and key[0].endswith('app.py'))
+    callees = stats.all_callees[create_app_key]
+    steps = sorted(
+        ((cumulative, f"{os.path.basename(file)}:{line} {name}") for (file, line, name), (_, _, _, cumulative) in callees.items()),
+        reverse=True
+    )
+
+    print(f"create_app() cold start: {wall * 1000:.0f} ms (profile written to {output})")
+    over_budget = []
+    for cumulative, step in steps[:top]:
+        share = 100 * cumulative / wall
+        print(f"  {cumulative * 1000:8.1f} ms  {share:5.1f}%  {step}")
+        if max_share and share > max_share:
+            over_budget.append(step)
+
+    if over_budget:
+        print(f"\n❌ {len(over_budget)} startup step(s) exceed {max_share:g}% of startup time; make them lazy or async:")
+        for step in over_budget:
+            print(f"   • {step}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile AI Gatekeeper startup')
+    parser.add_argument('--py-spy', action='store_true', help='record a py-spy flamegraph instead of using cProfile')
+    parser.add_argument('--output', help='output file (default: startup.svg for py-spy, startup.prof for cProfile)')
+    parser.add_argument('--top', type=int, default=15, help='number of startup steps to list')
+    parser.add_argument('--max-share', type=float, default=0.0,
+                        help='fail if any step takes more than this percentage of startup time')
+    args = parser.parse_args()
+
+    if args.py_spy:
+        sys.exit(profile_with_py_spy(args.output or 'startup.svg'))
+    sys.exit(profile_with_cprofile(args.output or 'startup.prof', args.top, args.max_share))
+
+
+if __name__ == '__main__':
+    main()
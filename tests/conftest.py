@@ -90,7 +90,7 @@ def mock_support_processor(shared_config, mock_openai_client):
 @pytest.fixture
 def jwt_manager():
     """Create JWT manager for testing."""
-    return JWTManager(secret_key='test-secret-key')
+    return JWTManager(secret_key='test-secret-key-for-unit-tests-only')
 
 @pytest.fixture
 def admin_token(jwt_manager):
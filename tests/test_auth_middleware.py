@@ -10,9 +10,17 @@ from flask import Flask, g
 
 from auth.middleware import (
     JWTManager, BearerTokenManager, authenticate_request, authorize_request,
-    auth_required, optional_auth, require_role, AuthenticationError, AuthorizationError
+    auth_required, optional_auth, require_role, AuthenticationError, AuthorizationError,
+    _is_authorized
 )
 
+@pytest.fixture(autouse=True)
+def clear_authorization_cache():
+    """Keep memoized authorization decisions from leaking between tests."""
+    _is_authorized.cache_clear()
+    yield
+    _is_authorized.cache_clear()
+
 class TestJWTManager:
     """Test JWT Manager functionality."""
     
@@ -86,6 +94,36 @@ class TestJWTManager:
         with pytest.raises(AuthenticationError, match="Invalid token"):
             jwt_manager.decode_token(invalid_token)
     
+    def test_decode_token_rejects_non_object_payload(self, jwt_manager):
+        """Test payloads that are valid JSON but not objects are rejected."""
+        token = jwt.api_jws.encode(b'[1, 2]', jwt_manager.secret_key, algorithm='HS256')
+        
+        with pytest.raises(AuthenticationError, match="must be a json object"):
+            jwt_manager.decode_token(token)
+    
+    def test_decode_token_without_expiry(self, jwt_manager):
+        """Test tokens without an exp claim are rejected."""
+        token = jwt.encode({'user_id': 'test-user', 'iss': 'ai-gatekeeper'}, jwt_manager.secret_key, algorithm='HS256')
+        
+        with pytest.raises(AuthenticationError, match="Invalid token"):
+            jwt_manager.decode_token(token)
+    
+    def test_decode_token_cache(self, jwt_manager):
+        """Test repeat decodes are served from cache until the token expires."""
+        token = jwt_manager.generate_token(user_id='test-user', email='test@example.com')
+        jwt_manager.decode_token(token)
+        
+        with patch.object(jwt_manager._jwt, 'decode', side_effect=AssertionError("not cached")):
+            payload = jwt_manager.decode_token(token)
+            assert payload['user_id'] == 'test-user'
+            
+            # Cached payloads still expire
+            with patch('auth.middleware.time.time', return_value=payload['exp'] + 1):
+                with pytest.raises(AuthenticationError, match="Token has expired"):
+                    jwt_manager.decode_token(token)
+        
+        assert len(jwt_manager._decode_cache) == 0
+    
     def test_validate_permissions(self, jwt_manager):
         """Test permission validation."""
         # Admin permissions
@@ -106,6 +144,12 @@ class TestJWTManager:
         viewer_perms = ['read']
         assert jwt_manager.validate_permissions(viewer_perms, ['read']) is True
         assert jwt_manager.validate_permissions(viewer_perms, ['write']) is False
+        
+        # Role tables hold frozensets
+        operator_perms = jwt_manager.roles['operator']
+        assert isinstance(operator_perms, frozenset)
+        assert jwt_manager.validate_permissions(operator_perms, ['delete', 'write']) is True
+        assert jwt_manager.validate_permissions(operator_perms, ['delete']) is False
     
     def test_get_endpoint_permissions(self, jwt_manager):
         """Test getting endpoint permissions."""
@@ -130,6 +174,21 @@ class TestJWTManager:
         # Non-API endpoints
         perms = jwt_manager.get_endpoint_permissions('GET', '/health')
         assert perms == []
+    
+    def test_get_endpoint_permissions_wildcards(self, jwt_manager):
+        """Test wildcard precedence in the endpoint permission trie."""
+        # Trailing wildcard matches deeper paths
+        assert jwt_manager.get_endpoint_permissions('POST', '/api/monitoring/alerts/1/ack') == ['manage']
+        assert jwt_manager.get_endpoint_permissions('DELETE', '/api/support/requests/1') == ['delete']
+        
+        # Trailing wildcard needs a segment after the prefix
+        assert jwt_manager.get_endpoint_permissions('POST', '/api/monitoring') == ['write']
+        
+        # Mid-path wildcard matches a single segment
+        jwt_manager.endpoint_permissions['GET:/api/support/handoff/*/status'] = ['manage']
+        jwt_manager._perm_trie = jwt_manager._build_permission_trie(jwt_manager.endpoint_permissions)
+        assert jwt_manager.get_endpoint_permissions('GET', '/api/support/handoff/abc/status') == ['manage']
+        assert jwt_manager.get_endpoint_permissions('GET', '/api/support/handoff/abc/other') == ['read']
 
 class TestBearerTokenManager:
     """Test Bearer Token Manager functionality."""
@@ -366,7 +425,7 @@ class TestAuthenticationFunctions:
     def test_authenticate_request_jwt_success(self):
         """Test successful JWT authentication."""
         mock_request = Mock()
-        mock_request.headers = {'Authorization': 'Bearer valid-jwt-token'}
+        mock_request.headers = {'Authorization': 'Bearer valid.jwt.token'}
         
         with patch('auth.middleware.request', mock_request):
             with patch('auth.middleware.jwt_manager.decode_token') as mock_decode:
@@ -405,6 +464,25 @@ class TestAuthenticationFunctions:
                     assert user_info['role'] == 'api_user'
                     assert user_info['token_type'] == 'bearer'
     
+    def test_authenticate_request_api_key_skips_jwt(self):
+        """Test tokens that are not JWT-shaped go straight to the API key lookup."""
+        mock_request = Mock()
+        mock_request.headers = {'Authorization': 'Bearer valid-bearer-token'}
+        
+        with patch('auth.middleware.request', mock_request):
+            with patch('auth.middleware.jwt_manager.decode_token') as mock_jwt:
+                with patch('auth.middleware.bearer_token_manager.validate_token') as mock_bearer:
+                    mock_bearer.return_value = {
+                        'name': 'API_USER',
+                        'role': 'api_user',
+                        'permissions': frozenset({'read', 'write'})
+                    }
+                    
+                    user_info = authenticate_request()
+                    
+                    assert user_info['token_type'] == 'bearer'
+                    mock_jwt.assert_not_called()
+    
     def test_authenticate_request_no_token(self):
         """Test authentication without token."""
         mock_request = Mock()
@@ -459,6 +537,16 @@ class TestAuthenticationFunctions:
                 with pytest.raises(AuthorizationError, match="Insufficient permissions"):
                     authorize_request(user_info, 'POST', '/api/support/evaluate')
     
+    def test_authorize_request_memoized(self):
+        """Test authorization decisions are cached per permission set and endpoint."""
+        user_info = {'permissions': frozenset({'read'}), 'role': 'viewer'}
+        
+        with patch('auth.middleware.jwt_manager.get_endpoint_permissions', return_value=['read']) as mock_perms:
+            assert authorize_request(user_info, 'GET', '/api/support/status/1') is True
+            assert authorize_request(user_info, 'GET', '/api/support/status/1') is True
+            
+            assert mock_perms.call_count == 1
+    
     def test_authorize_request_no_permissions_required(self):
         """Test authorization when no permissions required."""
         user_info = {
@@ -173,6 +173,15 @@ class TestKnowledgeLoader:
         assert 'keywords' in item
         assert 'metadata' in item
     
+    @pytest.mark.asyncio
+    async def test_sample_knowledge_is_built_once(self):
+        first = await KnowledgeLoader.load_sample_knowledge()
+        first.clear()
+        second = await KnowledgeLoader.load_sample_knowledge()
+        
+        assert len(second) > 0
+        assert second[0] is KnowledgeLoader._sample_knowledge[0]
+    
     @pytest.mark.asyncio
     async def test_knowledge_content_quality(self):
         knowledge_items = await KnowledgeLoader.load_sample_knowledge()
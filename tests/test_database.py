@@ -409,4 +409,29 @@ class TestSwarmExecutionCRUD:
         assert swarm_exec.consensus_confidence == 0.8
         assert "triage" in swarm_exec.individual_results
         assert "confidence" in swarm_exec.individual_results
-        assert "research" in swarm_exec.individual_results
\ No newline at end of file
+        assert "research" in swarm_exec.individual_results
+
+
+class TestDatabaseSessions:
+    """Test session scoping in DatabaseManager."""
+    
+    def test_unscoped_sessions_are_independent(self):
+        """Test scoped sessions are shared per thread while unscoped ones are not."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker, scoped_session
+        from db.database import DatabaseManager
+        
+        manager = DatabaseManager('sqlite:///:memory:')
+        manager.session_factory = sessionmaker(bind=create_engine('sqlite:///:memory:'))
+        manager.Session = scoped_session(manager.session_factory)
+        
+        assert manager.get_session() is manager.get_session()
+        
+        first = manager.get_session(scoped=False)
+        second = manager.get_session(scoped=False)
+        assert first is not second
+        assert first is not manager.get_session()
+        
+        first.close()
+        second.close()
+        manager.close_session()
@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+Tests for the enhanced confidence agent's knowledge base indexing and scoring
+"""
+
+import asyncio
+import json
+import pytest
+import numpy as np
+from unittest.mock import Mock, AsyncMock
+import sys
+import os
+from types import SimpleNamespace
+from collections import deque
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.confidence_agent import EnhancedConfidenceAgent, ParsedRequest, request_hash, _FACTOR_NAMES
+
+
+def _factor_values(**factors) -> np.ndarray:
+    """Factor vector with the given named factors set and the rest zero"""
+    values = np.zeros(len(_FACTOR_NAMES), dtype=np.float32)
+    for name, value in factors.items():
+        values[_FACTOR_NAMES.index(name)] = value
+    return values
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+    """Reference float64 cosine similarity"""
+    den = np.sqrt((a @ a) * (b @ b))
+    return 0.0 if den == 0 else float(a @ b / den)
+
+
+def _fake_embedding(text: str) -> list:
+    """Deterministic pseudo-embedding so different texts get different vectors"""
+    rng = np.random.default_rng(sum(ord(c) for c in text))
+    return rng.normal(size=1536).tolist()
+
+
+class TestEnhancedConfidenceAgent:
+
+    @pytest.fixture
+    def mock_openai_client(self):
+        client = Mock()
+        client.embeddings = Mock()
+
+        async def create_embedding(model, input):
+            texts = input if isinstance(input, list) else [input]
+            response = Mock()
+            response.data = []
+            for text in texts:
+                item = Mock()
+                item.embedding = _fake_embedding(text)
+                response.data.append(item)
+            return response
+
+        client.embeddings.create = AsyncMock(side_effect=create_embedding)
+        return client
+
+    @pytest.fixture
+    def agent(self, mock_openai_client):
+        return EnhancedConfidenceAgent('Test Confidence', 'confidence', {'openai_client': mock_openai_client})
+
+    @pytest.fixture
+    def knowledge_items(self):
+        return [
+            {
+                'id': 'pwd_reset',
+                'content': 'Password reset guide: step 1 go to login page, step 2 click forgot password',
+                'title': 'Password Reset',
+                'category': 'authentication',
+                'keywords': ['password', 'reset', 'login']
+            },
+            {
+                'id': 'app_crash',
+                'content': 'Troubleshoot application crash error: clear cache and reinstall',
+                'title': 'Application Crash',
+                'category': 'troubleshooting',
+                'keywords': ['crash', 'application', 'error']
+            },
+            {
+                'id': 'email_setup',
+                'content': 'Configure email client: install the app and setup IMAP settings',
+                'title': 'Email Setup',
+                'category': 'configuration',
+                'keywords': ['email', 'setup', 'imap']
+            }
+        ]
+
+    @pytest.mark.asyncio
+    async def test_knowledge_base_index_is_stacked_and_quantized(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+
+        assert agent._kb_ids == [item['id'] for item in knowledge_items]
+        assert agent._kb_int8.shape == (len(knowledge_items), 1536)
+        assert agent._kb_int8.dtype == np.int8
+        assert (np.abs(agent._kb_int8.astype(np.int16)).max(axis=1) == 127).all()
+
+    @pytest.mark.asyncio
+    async def test_int8_rows_track_normalized_float_embeddings(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+
+        matrix = np.vstack([agent.knowledge_embeddings[item_id] for item_id in agent._kb_ids]).astype(np.float32)
+        normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+        dequantized = agent._kb_int8.astype(np.float32) / agent._kb_int8_norms[:, None]
+
+        np.testing.assert_allclose(dequantized, normalized, atol=5e-3)
+
+    @pytest.mark.asyncio
+    async def test_batched_cosine_matches_pairwise(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+        request_embedding = np.array(_fake_embedding('I forgot my password'))
+
+        batched = agent._batch_cosine_similarity(request_embedding)
+        pairwise = [_cosine(request_embedding, agent.knowledge_embeddings[item_id]) for item_id in agent._kb_ids]
+
+        # int8 quantization keeps cosine scores within a few thousandths
+        np.testing.assert_allclose(batched, pairwise, atol=5e-3)
+
+    @pytest.mark.asyncio
+    async def test_zero_request_embedding_scores_zero(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+
+        scores = agent._batch_cosine_similarity(np.zeros(1536))
+
+        assert scores.shape == (len(knowledge_items),)
+        assert not scores.any()
+
+    @pytest.mark.asyncio
+    async def test_execute_returns_bounded_confidence(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+
+        response = await agent.execute({
+            'query': 'I forgot my password and need to reset it',
+            'context': {'user_level': 'beginner'}
+        })
+
+        assert response.success
+        assert 0.0 <= response.result['confidence_score'] <= 1.0
+        assert response.result['analysis']['similarities']
+        assert 'similarity' in response.result['prediction_factors']
+
+    @pytest.mark.asyncio
+    async def test_execute_result_is_json_serializable(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+
+        response = await agent.execute({'query': 'My application keeps crashing on startup'})
+
+        assert response.success
+        payload = json.loads(json.dumps(response.result))
+        assert payload['analysis']['similarities'][0][2]['content']['id'] in agent._kb_ids
+
+    @pytest.mark.asyncio
+    async def test_execute_with_empty_knowledge_base(self, agent):
+        response = await agent.execute({'query': 'Something is broken'})
+
+        assert response.success
+        assert response.result['analysis']['similarities'] == []
+
+    @pytest.mark.asyncio
+    async def test_batched_cosine_identical_orthogonal_and_zero_rows(self, agent):
+        agent.knowledge_embeddings = {
+            'same': np.array([1.0, 2.0, 3.0]),
+            'orthogonal': np.array([3.0, 0.0, -1.0]),
+            'empty': np.zeros(3)
+        }
+        for item_id in agent.knowledge_embeddings:
+            agent.knowledge_content[item_id] = await agent._process_knowledge_item({'id': item_id, 'content': ''})
+        agent._build_kb_index()
+
+        scores = agent._batch_cosine_similarity(np.array([1.0, 2.0, 3.0]))
+
+        np.testing.assert_allclose(scores, [1.0, 0.0, 0.0], atol=1e-2)
+        assert scores[2] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_numpy_fallback_matches_simd_path(self, agent, knowledge_items, monkeypatch):
+        import agents.confidence_agent as confidence_module
+
+        await agent.load_knowledge_base(knowledge_items)
+        request_embedding = np.array(_fake_embedding('my application crashes'))
+        scores = agent._batch_cosine_similarity(request_embedding)
+
+        monkeypatch.setattr(confidence_module, 'SIMSIMD_AVAILABLE', False)
+        fallback_scores = agent._batch_cosine_similarity(request_embedding)
+
+        np.testing.assert_allclose(scores, fallback_scores, atol=5e-3)
+
+    @pytest.mark.asyncio
+    async def test_knowledge_base_embeddings_are_batched(self, agent, knowledge_items, mock_openai_client):
+        await agent.load_knowledge_base(knowledge_items)
+
+        assert mock_openai_client.embeddings.create.await_count == 1
+        batch_input = mock_openai_client.embeddings.create.await_args.kwargs['input']
+        assert batch_input == [item['content'] for item in knowledge_items]
+        np.testing.assert_allclose(
+            agent.knowledge_embeddings['app_crash'],
+            _fake_embedding(knowledge_items[1]['content']),
+            rtol=1e-5
+        )
+
+    @pytest.mark.asyncio
+    async def test_knowledge_base_batches_respect_batch_size(self, mock_openai_client, knowledge_items):
+        agent = EnhancedConfidenceAgent('Test Confidence', 'confidence', {
+            'openai_client': mock_openai_client,
+            'embedding_batch_size': 2
+        })
+
+        await agent.load_knowledge_base(knowledge_items)
+
+        assert mock_openai_client.embeddings.create.await_count == 2
+        assert agent._kb_ids == [item['id'] for item in knowledge_items]
+
+    @pytest.mark.asyncio
+    async def test_short_batch_response_falls_back_to_single_requests(self, agent, knowledge_items, mock_openai_client):
+        short_response = Mock()
+        short_response.data = [Mock(embedding=[0.1] * 1536)]
+        single_response = Mock()
+        single_response.data = [Mock(embedding=[0.2] * 1536)]
+        mock_openai_client.embeddings.create = AsyncMock(
+            side_effect=[short_response] + [single_response] * len(knowledge_items)
+        )
+
+        await agent.load_knowledge_base(knowledge_items)
+
+        assert mock_openai_client.embeddings.create.await_count == 1 + len(knowledge_items)
+        assert len(agent.knowledge_embeddings) == len(knowledge_items)
+
+    @pytest.mark.asyncio
+    async def test_repeated_requests_hit_embedding_cache(self, agent, knowledge_items, mock_openai_client):
+        await agent.load_knowledge_base(knowledge_items)
+        calls_after_load = mock_openai_client.embeddings.create.await_count
+
+        await agent.execute({'query': 'I forgot my password'})
+        await agent.execute({'query': '  I forgot my password  '})
+
+        assert mock_openai_client.embeddings.create.await_count == calls_after_load + 1
+
+    @pytest.mark.asyncio
+    async def test_knowledge_base_reload_uses_cached_embeddings(self, agent, knowledge_items, mock_openai_client):
+        await agent.load_knowledge_base(knowledge_items)
+        await agent.load_knowledge_base(knowledge_items)
+
+        assert mock_openai_client.embeddings.create.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_embedding_cache_evicts_least_recently_used(self, mock_openai_client):
+        agent = EnhancedConfidenceAgent('Test Confidence', 'confidence', {
+            'openai_client': mock_openai_client,
+            'embedding_cache_size': 2
+        })
+
+        await agent._get_embedding('first')
+        await agent._get_embedding('second')
+        await agent._get_embedding('first')
+        await agent._get_embedding('third')
+
+        assert list(agent._embedding_cache) == ['first', 'third']
+
+    @pytest.mark.asyncio
+    async def test_failed_embeddings_are_not_cached(self, agent, mock_openai_client):
+        mock_openai_client.embeddings.create = AsyncMock(side_effect=RuntimeError('API down'))
+
+        embedding = await agent._get_embedding('anything')
+
+        assert not embedding.any()
+        assert 'anything' not in agent._embedding_cache
+
+    @pytest.mark.asyncio
+    async def test_knowledge_items_are_tokenized_at_load(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+
+        word_set = agent._kb_word_sets[agent._kb_ids.index('app_crash')]
+        assert isinstance(word_set, frozenset)
+        assert {'troubleshoot', 'application', 'crash'} <= word_set
+
+    def test_text_similarity_is_jaccard_of_word_sets(self, agent):
+        words1 = frozenset({'reset', 'my', 'password'})
+        words2 = frozenset({'password', 'reset', 'guide', 'login'})
+
+        assert agent._calculate_text_similarity(words1, words2) == pytest.approx(2 / 5)
+        assert agent._calculate_text_similarity(words1, frozenset()) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_historical_factors_use_stored_request_words(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+        await agent.execute({'query': 'reset my password please'})
+
+        factors = np.empty(2, dtype=np.float32)
+        await agent._calculate_historical_factors(
+            frozenset('password reset is not working'.split()), {}, factors
+        )
+
+        assert factors[1] == pytest.approx(0.1)
+
+    @pytest.mark.asyncio
+    async def test_confidence_history_ring_buffer_wraps(self, agent, monkeypatch):
+        import agents.confidence_agent as confidence_module
+
+        monkeypatch.setattr(confidence_module, 'HISTORY_CAPACITY', 3)
+        agent = EnhancedConfidenceAgent('Test Confidence', 'confidence', {'openai_client': agent.openai_client})
+
+        for i in range(5):
+            await agent._store_confidence_decision(ParsedRequest.from_text(f'request {i}'), {'factor_values': _factor_values(similarity=0.5)}, i / 10)
+
+        assert agent._hist_cursor == 5
+        assert agent._hist_request_hash.shape == (3,)
+        assert sorted(agent._hist_predicted.tolist()) == pytest.approx([0.2, 0.3, 0.4])
+
+    @pytest.mark.asyncio
+    async def test_update_prediction_accuracy_uses_latest_matching_entry(self, agent):
+        await agent._store_confidence_decision(ParsedRequest.from_text('reset my password'), {'factor_values': _factor_values(similarity=0.5)}, 0.3)
+        await agent._store_confidence_decision(ParsedRequest.from_text('reset my password'), {'factor_values': _factor_values(similarity=0.5)}, 0.9)
+        weight_before = agent.prediction_model.feature_weights['similarity']
+
+        agent.update_prediction_accuracy(request_hash('reset my password'), 0.5)
+
+        assert np.isnan(agent._hist_actual[0])
+        assert agent._hist_actual[1] == pytest.approx(0.5)
+        assert list(agent.prediction_model.accuracy_history) == [pytest.approx(0.6)]
+        assert agent.prediction_model.feature_weights['similarity'] < weight_before
+
+    @pytest.mark.asyncio
+    async def test_predictive_model_weights_only_computed_factors(self, agent):
+        factor_values = _factor_values(similarity=0.8, consensus=0.5, complexity=0.2, quality=1.0)
+
+        score = await agent._apply_predictive_model({'factor_values': factor_values})
+
+        # user_match and historical are model features no factor computes, so they carry no weight
+        expected = (0.8 * 0.4 + 0.5 * 0.2 + 0.2 * 0.15) / (0.4 + 0.2 + 0.15)
+        assert score == pytest.approx(expected, abs=1e-6)
+
+    @pytest.mark.asyncio
+    async def test_execute_materializes_factor_dicts(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+
+        response = await agent.execute({'query': 'Outlook will not sync', 'context': {'urgent': True}})
+        analysis = response.result['analysis']
+
+        assert 'factor_values' not in analysis
+        assert list(analysis['factors']) == list(_FACTOR_NAMES)
+        assert analysis['context_analysis']['time_pressure'] == pytest.approx(0.9)
+        assert analysis['historical_insights'] == {'historical_accuracy': 0.5, 'pattern_strength': 0.0}
+        assert response.metadata['feature_count'] == len(_FACTOR_NAMES)
+
+    def test_feature_weights_view_tracks_weight_vector(self, agent):
+        agent.prediction_model.weights[0] = 0.5
+
+        assert agent.prediction_model.feature_weights['similarity'] == pytest.approx(0.5)
+        assert list(agent.prediction_model.feature_weights) == list(agent.prediction_model.feature_names)
+
+    @pytest.mark.asyncio
+    async def test_knowledge_item_indicators_use_tokens(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+
+        assert agent.knowledge_content['pwd_reset']['solution_type'] == 'procedural'
+        assert agent.knowledge_content['app_crash']['solution_type'] == 'troubleshooting'
+        assert agent.knowledge_content['email_setup']['solution_type'] == 'configuration'
+        assert agent.knowledge_content['pwd_reset']['has_steps']
+        assert not agent.knowledge_content['email_setup']['has_steps']
+
+    @pytest.mark.asyncio
+    async def test_system_context_matches_known_system_tokens(self, agent):
+        assert await agent._assess_system_context('Windows 11') == 1.0
+        assert await agent._assess_system_context('unknown') == 0.8
+        assert await agent._assess_system_context('mainframe') == 0.9
+
+    @pytest.mark.asyncio
+    async def test_changing_embedding_model_clears_cache(self, agent):
+        await agent._get_embedding('printer offline')
+        assert agent._embedding_cache
+
+        agent.embedding_model = 'text-embedding-3-large'
+
+        assert agent.embedding_model == 'text-embedding-3-large'
+        assert not agent._embedding_cache
+
+    @pytest.mark.asyncio
+    async def test_similarities_return_sorted_top_k(self, agent):
+        items = [
+            {'id': f'item_{i}', 'content': f'knowledge article number {i} about printers', 'keywords': ['printer']}
+            for i in range(25)
+        ]
+        await agent.load_knowledge_base(items)
+        request_embedding = np.array(_fake_embedding('my printer is jammed'))
+
+        top_idx, top_scores, similarities = await agent._calculate_advanced_similarities(
+            request_embedding, frozenset('my printer is jammed'.split())
+        )
+
+        scores = [score for _, score, _ in similarities]
+        assert len(similarities) == 10
+        assert scores == sorted(scores, reverse=True)
+        assert [agent._kb_ids[idx] for idx in top_idx] == [item_id for item_id, _, _ in similarities]
+        np.testing.assert_allclose(top_scores, scores, rtol=1e-6)
+
+        all_cosine = agent._batch_cosine_similarity(request_embedding)
+        best_idx = int(np.argmax(all_cosine))
+        assert similarities[0][0] == agent._kb_ids[best_idx]
+
+    def test_parsed_request_tokenizes_once(self):
+        parsed = ParsedRequest.from_text('Server API error, maybe?')
+
+        assert parsed.lower == 'server api error, maybe?'
+        assert parsed.words == frozenset({'server', 'api', 'error,', 'maybe?'})
+        assert parsed.tokens == frozenset({'server', 'api', 'error', 'maybe'})
+
+    @pytest.mark.asyncio
+    async def test_complexity_uses_parsed_tokens(self, agent):
+        simple = await agent._assess_request_complexity_advanced(ParsedRequest.from_text('Reset password'))
+        technical = await agent._assess_request_complexity_advanced(
+            ParsedRequest.from_text('Maybe the API server database integration is unclear.')
+        )
+
+        assert technical < simple
+
+    def test_request_hash_is_stable_unsigned_64_bit(self, monkeypatch):
+        import agents.confidence_agent as confidence_module
+
+        # blake2b fallback is pinned so the key survives restarts without xxhash installed
+        monkeypatch.setattr(confidence_module, 'XXHASH_AVAILABLE', False)
+        assert request_hash('reset my password') == 0x2032b29920b7b276
+        assert request_hash('reset my password') == request_hash('reset my password')
+        assert request_hash('reset my password') != request_hash('reset my password!')
+
+    @pytest.mark.asyncio
+    async def test_execute_returns_request_hash_for_feedback(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items)
+
+        response = await agent.execute({'query': 'VPN keeps disconnecting'})
+        agent.update_prediction_accuracy(response.result['request_hash'], 1.0)
+
+        assert response.result['request_hash'] == request_hash('VPN keeps disconnecting')
+        assert len(agent.prediction_model.accuracy_history) == 1
+
+    @pytest.mark.asyncio
+    async def test_gpu_path_matches_cpu_scores(self, agent, knowledge_items, monkeypatch):
+        import agents.confidence_agent as confidence_module
+
+        class FakeStream:
+            def __init__(self, non_blocking=False):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def synchronize(self):
+                pass
+
+        # NumPy stand-in for CuPy so the device code path runs without a GPU
+        fake_cupy = SimpleNamespace(
+            asarray=lambda data, dtype=None: np.asarray(data, dtype=dtype),
+            asnumpy=lambda data, stream=None: np.asarray(data),
+            float16=np.float16,
+            cuda=SimpleNamespace(is_available=lambda: True, Stream=FakeStream)
+        )
+        request_embedding = np.array(_fake_embedding('cannot print to network printer'))
+
+        await agent.load_knowledge_base(knowledge_items)
+        cpu_scores = agent._batch_cosine_similarity(request_embedding)
+
+        monkeypatch.setattr(confidence_module, 'cupy', fake_cupy, raising=False)
+        monkeypatch.setattr(confidence_module, 'CUPY_AVAILABLE', True)
+        agent._build_kb_index()
+        gpu_scores = agent._batch_cosine_similarity(request_embedding)
+
+        assert agent._kb_matrix_dev.dtype == np.float16
+        np.testing.assert_allclose(gpu_scores, cpu_scores, atol=5e-3)
+
+    @pytest.mark.asyncio
+    async def test_contextual_factor_tables_accept_config_overrides(self, mock_openai_client):
+        agent = EnhancedConfidenceAgent('Test Confidence', 'confidence', {
+            'openai_client': mock_openai_client,
+            'priority_factors': {'critical': 0.5}
+        })
+        factors = np.empty(4, dtype=np.float32)
+
+        await agent._calculate_contextual_factors('', {'user_level': 'advanced', 'priority': 'critical'}, factors)
+
+        assert factors[0] == pytest.approx(1.2)
+        assert factors[1] == pytest.approx(0.5)
+
+    @pytest.mark.asyncio
+    async def test_keywords_are_lowercased_sets_at_load(self, agent):
+        await agent.load_knowledge_base([
+            {'id': 'vpn', 'content': 'Reconnect the VPN client', 'keywords': ['VPN', 'Network', 'vpn']}
+        ])
+
+        keywords = agent._kb_keyword_sets[agent._kb_ids.index('vpn')]
+        assert keywords == frozenset({'vpn', 'network'})
+        assert agent._calculate_keyword_similarity(frozenset({'my', 'vpn', 'dropped'}), keywords) == pytest.approx(0.5)
+
+    @pytest.mark.asyncio
+    async def test_model_accuracy_is_running_mean_of_window(self, agent):
+        agent.prediction_model.accuracy_history = deque(maxlen=3)
+        parsed = ParsedRequest.from_text('reset my password')
+        await agent._store_confidence_decision(parsed, {'factor_values': _factor_values()}, 0.5)
+
+        for outcome in (0.5, 0.4, 0.3, 0.2, 0.1):
+            agent.update_prediction_accuracy(parsed.request_hash, outcome)
+
+        # Window holds the last three accuracies: 0.8, 0.7, 0.6
+        assert agent.model_accuracy == pytest.approx(0.7)
+        assert agent.model_accuracy == pytest.approx(np.mean(agent.prediction_model.accuracy_history))
+
+    @pytest.mark.asyncio
+    async def test_match_quality_and_diversity_read_metadata_columns(self, agent, knowledge_items):
+        await agent.load_knowledge_base(knowledge_items + [{
+            'id': 'advanced_crash',
+            'content': 'Advanced complex expert troubleshooting of an application error',
+            'category': 'troubleshooting'
+        }])
+        top_idx = np.arange(4)
+        top_scores = np.array([0.95, 0.5, 0.4, 0.3], dtype=np.float32)
+
+        quality = await agent._assess_match_quality(top_idx, top_scores)
+        diversity = await agent._assess_match_diversity(top_idx)
+
+        # pwd_reset is procedural (+0.1, clipped to 1.0); advanced_crash is very complex (-0.1)
+        assert quality == pytest.approx((1.0 + 0.5 + 0.4 + 0.2) / 4, abs=1e-6)
+        # Three solution types and three categories across four matches
+        assert diversity == pytest.approx(0.75)
+        assert await agent._assess_match_quality(np.empty(0, dtype=np.intp), np.empty(0)) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_context_and_history_run_during_embedding_request(self, agent, knowledge_items, mock_openai_client):
+        await agent.load_knowledge_base(knowledge_items)
+        events = []
+        create_embedding = mock_openai_client.embeddings.create.side_effect
+
+        async def slow_create(model, input):
+            events.append('embedding_started')
+            await asyncio.sleep(0.01)
+            events.append('embedding_finished')
+            return await create_embedding(model, input)
+
+        calculate_historical = agent._calculate_historical_factors
+
+        async def tracked_historical(*args):
+            events.append('historical')
+            await calculate_historical(*args)
+
+        mock_openai_client.embeddings.create.side_effect = slow_create
+        agent._calculate_historical_factors = tracked_historical
+
+        response = await agent.execute({'query': 'Teams camera is not detected'})
+
+        assert response.success
+        assert events.index('historical') < events.index('embedding_finished')
+
+    @pytest.mark.asyncio
+    async def test_persisted_index_is_memory_mapped_by_later_workers(self, mock_openai_client, knowledge_items, tmp_path):
+        config = {'openai_client': mock_openai_client, 'kb_index_dir': str(tmp_path)}
+        first = EnhancedConfidenceAgent('Worker 1', 'confidence', config)
+        await first.load_knowledge_base(knowledge_items)
+        calls_after_first = mock_openai_client.embeddings.create.await_count
+
+        second = EnhancedConfidenceAgent('Worker 2', 'confidence', config)
+        await second.load_knowledge_base(knowledge_items)
+        request_embedding = np.array(_fake_embedding('I forgot my password'))
+
+        assert mock_openai_client.embeddings.create.await_count == calls_after_first
+        assert isinstance(second._kb_int8, np.memmap)
+        assert second._kb_ids == first._kb_ids
+        np.testing.assert_array_equal(
+            second._batch_cosine_similarity(request_embedding), first._batch_cosine_similarity(request_embedding)
+        )
+
+    @pytest.mark.asyncio
+    async def test_persisted_index_ignored_when_model_or_content_changes(self, mock_openai_client, knowledge_items, tmp_path):
+        config = {'openai_client': mock_openai_client, 'kb_index_dir': str(tmp_path)}
+        await EnhancedConfidenceAgent('Worker 1', 'confidence', config).load_knowledge_base(knowledge_items)
+
+        other_model = EnhancedConfidenceAgent('Worker 2', 'confidence', {**config, 'embedding_model': 'text-embedding-3-large'})
+        await other_model.load_knowledge_base(knowledge_items)
+        edited = EnhancedConfidenceAgent('Worker 3', 'confidence', config)
+        await edited.load_knowledge_base(knowledge_items[:2] + [{**knowledge_items[2], 'content': 'Setup IMAP in Outlook'}])
+
+        assert not isinstance(other_model._kb_int8, np.memmap)
+        assert not isinstance(edited._kb_int8, np.memmap)
+        assert len(list(tmp_path.glob('kb_index_*.npy'))) == 3
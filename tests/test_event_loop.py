@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared agent event loop used by synchronous request handlers
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from core.event_loop import get_agent_loop, run_async, stop_agent_loop
+
+
+class TestAgentEventLoop:
+
+    def teardown_method(self):
+        stop_agent_loop()
+
+    def test_coroutines_from_many_threads_share_one_loop(self):
+        async def running_loop():
+            await asyncio.sleep(0.05)
+            return asyncio.get_running_loop()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+            loops = list(pool.map(lambda _: run_async(running_loop()), range(4)))
+
+        assert all(loop is get_agent_loop() for loop in loops)
+
+    def test_concurrent_callers_overlap_on_the_loop(self):
+        in_flight = []
+        peak = []
+
+        async def call():
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.pop()
+
+        threads = [threading.Thread(target=run_async, args=(call(),)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) == 4
+
+    def test_exceptions_propagate_to_the_caller(self):
+        async def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            run_async(fail())
+
+    def test_timeout_cancels_the_coroutine(self):
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(concurrent.futures.TimeoutError):
+            run_async(slow(), timeout=0.05)
+        assert cancelled.wait(1)
+
+    def test_loop_restarts_after_stop(self):
+        first = get_agent_loop()
+        stop_agent_loop()
+
+        assert first.is_closed()
+        assert get_agent_loop() is not first
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires os.fork")
+    def test_forked_child_starts_its_own_loop(self):
+        parent_loop = get_agent_loop()
+
+        async def loop_id():
+            return id(asyncio.get_running_loop())
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                child_loop_id = run_async(loop_id(), timeout=5)
+                os._exit(0 if child_loop_id != id(parent_loop) else 1)
+            except BaseException:
+                os._exit(2)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert run_async(loop_id()) == id(parent_loop)
+
+    def test_slack_handlers_keep_slack_io_off_the_loop(self):
+        from unittest.mock import Mock
+        from types import SimpleNamespace
+        from integrations.slack_events_listener import SlackEventsListener
+
+        io_threads = []
+
+        def record_thread(*args, **kwargs):
+            io_threads.append(threading.current_thread())
+            return {}
+
+        async def process_support_request(text, user_context):
+            return SimpleNamespace(status='ai_auto', loop=asyncio.get_running_loop())
+
+        listener = SlackEventsListener.__new__(SlackEventsListener)
+        listener.bot_user_id = 'B1'
+        listener.web_client = Mock(users_info=Mock(side_effect=record_thread),
+                                   conversations_info=Mock(side_effect=record_thread))
+        listener.support_processor = Mock(process_support_request=process_support_request)
+        listener._send_automated_solution = Mock(side_effect=record_thread)
+
+        listener._handle_app_mention({'user': 'U1', 'text': '<@B1> vpn is down', 'channel': 'C1'}, Mock(), Mock())
+
+        assert io_threads and all(thread is threading.current_thread() for thread in io_threads)
+        ticket = listener._send_automated_solution.call_args[0][1]
+        assert ticket.loop is get_agent_loop()
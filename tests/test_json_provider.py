@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the orjson-backed Flask JSON provider
+"""
+
+import json
+import pytest
+import sys
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from flask import Flask, jsonify
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from core.json_provider import ORJSON_AVAILABLE, init_json_provider
+
+pytestmark = pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+def _payload():
+    return {
+        'b': 1,
+        'a': 'ünïcode',
+        'when': datetime(2024, 7, 11, tzinfo=timezone.utc),
+        'point': Point(1, 2),
+        'amount': Decimal('1.50'),
+        'ids': {1: 'one'}
+    }
+
+
+class TestOrjsonProvider:
+
+    @pytest.fixture
+    def app(self):
+        app = Flask(__name__)
+        assert init_json_provider(app)
+        return app
+
+    def test_response_matches_default_provider(self, app):
+        default_app = Flask(__name__)
+
+        with app.app_context():
+            fast = jsonify(_payload())
+        with default_app.app_context():
+            default = jsonify(_payload())
+
+        assert fast.mimetype == 'application/json'
+        assert json.loads(fast.get_data()) == json.loads(default.get_data())
+        assert fast.get_data().index(b'"a"') < fast.get_data().index(b'"b"')
+
+    def test_debug_responses_are_indented(self, app):
+        app.debug = True
+        with app.app_context():
+            assert b'\n  "a": 1' in jsonify(a=1).get_data()
+
+    def test_unsupported_values_fall_back_to_stdlib(self, app):
+        with app.app_context():
+            response = jsonify(big=2 ** 70)
+
+        assert json.loads(response.get_data()) == {'big': 2 ** 70}
+        assert app.json.dumps({'a': 1}, indent=4) == json.dumps({'a': 1}, indent=4)
+        assert app.json.loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
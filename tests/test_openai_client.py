@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared OpenAI client and its outbound rate limiter
+"""
+
+import asyncio
+import time
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import core.openai_client as openai_client
+from core.openai_client import OpenAIRateLimiter
+
+
+class TestOpenAIRateLimiter:
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_capped(self):
+        limiter = OpenAIRateLimiter(max_concurrent=2, requests_per_minute=100, tokens_per_minute=10000)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def call():
+            nonlocal in_flight, max_in_flight
+            async with limiter.reserve(10):
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*(call() for _ in range(6)))
+
+        assert max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_request_budget_waits_for_window(self):
+        limiter = OpenAIRateLimiter(max_concurrent=10, requests_per_minute=2, tokens_per_minute=10000,
+                                    window_seconds=0.1)
+        started = time.monotonic()
+
+        for _ in range(3):
+            async with limiter.reserve(10):
+                pass
+
+        assert time.monotonic() - started >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_token_budget_waits_and_oversize_requests_still_run(self):
+        limiter = OpenAIRateLimiter(max_concurrent=10, requests_per_minute=100, tokens_per_minute=100,
+                                    window_seconds=0.1)
+
+        async with limiter.reserve(60):
+            pass
+        started = time.monotonic()
+        async with limiter.reserve(60):
+            pass
+        assert time.monotonic() - started >= 0.05
+
+        async with limiter.reserve(5000):  # Capped at the full budget rather than waiting forever
+            pass
+
+    def test_update_limits_ignores_missing_values(self):
+        limiter = OpenAIRateLimiter(requests_per_minute=10, tokens_per_minute=100)
+        limiter.update_limits(requests_per_minute=None, tokens_per_minute=5000)
+
+        assert limiter.requests_per_minute == 10
+        assert limiter.tokens_per_minute == 5000
+
+    def test_worker_share_of_account_limits(self):
+        limiter = OpenAIRateLimiter(requests_per_minute=500, tokens_per_minute=200000)
+        limiter.set_worker_count(4)
+
+        assert limiter.requests_per_minute == 125
+        assert limiter.tokens_per_minute == 50000
+
+        # Limits discovered later are account-wide too
+        limiter.update_limits(requests_per_minute=1000, tokens_per_minute=None)
+        assert limiter.requests_per_minute == 250
+        assert limiter.tokens_per_minute == 50000
+
+
+class TestSharedOpenAIClient:
+
+    def teardown_method(self):
+        openai_client._client = None
+
+    def test_client_is_bounded_and_shared(self, monkeypatch):
+        monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+        openai_client._client = None
+
+        client = openai_client.get_openai_client(timeout=12, max_retries=2)
+
+        assert client.max_retries == 2
+        timeout = client.timeout
+        assert getattr(timeout, 'read', timeout) == 12
+        assert openai_client.get_openai_client() is client
+
+    def test_forked_child_creates_its_own_client(self, monkeypatch):
+        monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+        openai_client._client = None
+        parent_client = openai_client.get_openai_client()
+
+        openai_client._reset_after_fork()  # Registered to run in forked children
+
+        assert openai_client.get_openai_client() is not parent_client
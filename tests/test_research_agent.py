@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Tests for the advanced research agent's research strategies and learning
+"""
+
+import asyncio
+import json
+import numpy as np
+import pytest
+from unittest.mock import Mock, AsyncMock
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import agents.research_agent as research_agent
+from agents.research_agent import (
+    AdvancedResearchAgent, _StepStreamParser, _compact_json, _extract_json_object
+)
+
+
+SOLUTION = {
+    'title': 'Reset your password',
+    'summary': 'Use the self-service reset page',
+    'steps': [{'title': 'Open reset page', 'description': 'Go to the login page and click forgot password'}],
+    'estimated_time': '5 minutes',
+    'difficulty_level': 'easy',
+    'confidence_score': 0.9
+}
+
+SEMANTIC = {'problem_type': 'how-to', 'confidence': 0.8}
+CONTEXTUAL = {'deeper_intent': 'regain account access', 'confidence': 0.7}
+
+
+def _completion(content: str) -> Mock:
+    """Chat completion response carrying the given message content"""
+    response = Mock()
+    response.choices = [Mock(message=Mock(content=content))]
+    response.usage = None
+    return response
+
+
+class _ChunkStream:
+    """Async iterator of streamed completion chunks, optionally stalling after some of them"""
+
+    def __init__(self, text: str, chunk_size: int = 7, stall_after: int = None):
+        self.pieces = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        self.stall_after = stall_after
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for index, piece in enumerate(self.pieces):
+            if index == self.stall_after:
+                await asyncio.sleep(10)
+            yield Mock(choices=[Mock(delta=Mock(content=piece))])
+
+    async def close(self):
+        self.closed = True
+
+
+class TestAdvancedResearchAgent:
+
+    @pytest.fixture
+    def mock_openai_client(self):
+        client = Mock()
+        client.chat = Mock()
+        client.chat.completions = Mock()
+
+        async def create_completion(model, messages, **kwargs):
+            prompt = '\n'.join(message['content'] for message in messages)
+            schema_name = kwargs.get('response_format', {}).get('json_schema', {}).get('name')
+            if schema_name == 'research_analysis':
+                return _completion(json.dumps({'semantic': SEMANTIC, 'contextual': CONTEXTUAL}))
+            if schema_name == 'contextual_reasoning':
+                return _completion(json.dumps(CONTEXTUAL))
+            if schema_name == 'semantic_decomposition':
+                return _completion(json.dumps(SEMANTIC))
+            if 'comprehensive solution' in prompt:
+                return _completion(json.dumps(SOLUTION))
+            if 'Expand this search query' in prompt:
+                return _completion('password reset login credentials')
+            return _completion('{}')
+
+        client.chat.completions.create = AsyncMock(side_effect=create_completion)
+        client.embeddings = Mock()
+        client.embeddings.create = AsyncMock(side_effect=RuntimeError('embeddings unavailable'))
+        return client
+
+    @pytest.fixture
+    def agent(self, mock_openai_client):
+        return AdvancedResearchAgent('Test Research', 'research', {'openai_client': mock_openai_client})
+
+    @pytest.mark.asyncio
+    async def test_execute_returns_validated_solution(self, agent):
+        response = await agent.execute({'query': 'How do I reset my password?', 'context': {'user_level': 'beginner'}})
+
+        assert response.success
+        assert response.result['title'] == SOLUTION['title']
+        assert response.result['solution_id']
+        assert response.metadata['research_strategies_used'] == 5
+
+    @pytest.mark.asyncio
+    async def test_semantic_and_contextual_analysis_share_one_request(self, agent, mock_openai_client):
+        results = await agent._conduct_comprehensive_research('printer offline', {'user_level': 'advanced'}, [])
+
+        assert mock_openai_client.chat.completions.create.await_count == 1
+        call = mock_openai_client.chat.completions.create.await_args
+        assert call.kwargs['response_format']['json_schema']['strict'] is True
+        assert results['semantic_analysis'] == SEMANTIC
+        assert results['contextual_insights'] == CONTEXTUAL
+        assert list(results) == [
+            'knowledge_base', 'pattern_match', 'semantic_analysis', 'contextual_insights', 'adaptive_insights'
+        ]
+
+    @pytest.mark.asyncio
+    async def test_unparseable_analysis_falls_back(self, agent, mock_openai_client):
+        mock_openai_client.chat.completions.create.side_effect = None
+        mock_openai_client.chat.completions.create.return_value = _completion('not json')
+
+        results = await agent._conduct_comprehensive_research('printer offline', {}, [])
+
+        assert results['semantic_analysis']['confidence'] == 0.3
+        assert results['contextual_insights']['confidence'] == 0.4
+
+    @pytest.mark.asyncio
+    async def test_failed_strategy_falls_back(self, agent, monkeypatch):
+        async def broken(*args, **kwargs):
+            raise RuntimeError('history unavailable')
+
+        monkeypatch.setattr(agent, '_pattern_based_research', broken)
+
+        results = await agent._conduct_comprehensive_research('printer offline', {}, [{'title': 'kb'}])
+
+        assert results['pattern_match'] == {'patterns': [], 'confidence': 0.0}
+        assert results['knowledge_base'] == [{'title': 'kb'}]
+        assert results['semantic_analysis']['confidence'] == 0.8
+
+    @pytest.mark.asyncio
+    async def test_primary_search_overlaps_query_expansion(self, mock_openai_client):
+        events = []
+        search_system = Mock()
+
+        async def assisted_search(vector_store_ids, query, num_results):
+            events.append(f'start:{vector_store_ids[0]}')
+            await asyncio.sleep(0.01)
+            events.append(f'end:{vector_store_ids[0]}')
+            return [{'title': vector_store_ids[0], 'content': query}]
+
+        async def expand(model, messages, **kwargs):
+            events.append('expand')
+            return _completion('password reset login')
+
+        search_system.assisted_search = AsyncMock(side_effect=assisted_search)
+        mock_openai_client.chat.completions.create.side_effect = expand
+        agent = AdvancedResearchAgent('Test Research', 'research', {
+            'openai_client': mock_openai_client,
+            'search_system': search_system
+        })
+
+        results = await agent._search_knowledge_base('reset password', {})
+
+        assert events.index('expand') < events.index('end:technical_solutions')
+        assert {result['title'] for result in results} == {'technical_solutions', 'configuration_guides'}
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_skips_repeat_llm_calls(self, agent, mock_openai_client):
+        embedding = Mock(data=[Mock(embedding=[0.1] * 8 + [0.9] * 8)])
+        mock_openai_client.embeddings.create = AsyncMock(return_value=embedding)
+
+        first = await agent.execute({'query': 'How do I reset my password?', 'context': {'user_level': 'beginner'}})
+        calls = mock_openai_client.chat.completions.create.await_count
+        second = await agent.execute({'query': 'how do I reset my  password?', 'context': {'user_level': 'beginner'}})
+
+        assert mock_openai_client.chat.completions.create.await_count == calls
+        assert mock_openai_client.embeddings.create.await_count == 2  # One embedding per request
+        assert second.result['title'] == first.result['title']
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_separates_user_levels(self, agent, mock_openai_client):
+        embedding = Mock(data=[Mock(embedding=[0.5] * 16)])
+        mock_openai_client.embeddings.create = AsyncMock(return_value=embedding)
+
+        await agent.execute({'query': 'printer offline', 'context': {'user_level': 'beginner'}})
+        calls = mock_openai_client.chat.completions.create.await_count
+        await agent.execute({'query': 'printer offline', 'context': {'user_level': 'advanced'}})
+
+        # Decomposition is context-free and hits; contextual reasoning and the solution do not
+        assert mock_openai_client.chat.completions.create.await_count == calls + 2
+
+    @pytest.mark.asyncio
+    async def test_pattern_research_uses_token_index(self, agent):
+        agent.update_solution_effectiveness('sol_a', {'success_rate': 0.9, 'original_query': 'reset my email password'})
+        agent.update_solution_effectiveness('sol_b', {'success_rate': 0.95, 'original_query': 'printer offline again'})
+        agent.update_solution_effectiveness('sol_c', {'success_rate': 0.5, 'original_query': 'reset my password'})
+
+        result = await agent._pattern_based_research('how to reset password', {})
+
+        assert [pattern['solution_id'] for pattern in result['patterns']] == ['sol_a']
+        assert result['patterns'][0]['overlap_score'] == pytest.approx(2 / 6)
+
+        # Re-recording feedback replaces the old postings
+        agent.update_solution_effectiveness('sol_a', {'success_rate': 0.9, 'original_query': 'vpn disconnects'})
+        assert 'sol_a' not in agent._token_index.get('reset', set())
+        assert (await agent._pattern_based_research('how to reset password', {}))['patterns'] == []
+
+    def test_rank_search_results_scores_and_orders(self, agent):
+        results = [
+            {'title': 'Printer setup', 'content': 'Install the printer driver'},
+            {'title': 'Password reset', 'content': 'Reset the password from the login page ' + 'x' * 200,
+             'metadata': {'difficulty': 'easy'}},
+            {'title': 'Password policy', 'content': 'Password rules'},
+        ]
+
+        ranked = agent._rank_search_results(results, 'reset password')
+
+        assert [result['title'] for result in ranked] == ['Password reset', 'Password policy', 'Printer setup']
+        assert ranked[0]['relevance_score'] == pytest.approx(1.2)
+        assert ranked[1]['relevance_score'] == pytest.approx(0.5)
+        assert ranked[2]['relevance_score'] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_solution_prompt_keeps_static_prefix(self, agent, mock_openai_client):
+        await agent.execute({'query': 'How do I reset my password?', 'context': {'user_level': 'beginner'}})
+        await agent.execute({'query': 'Printer is offline', 'context': {'user_level': 'advanced'}})
+
+        solution_calls = [
+            call.kwargs['messages'] for call in mock_openai_client.chat.completions.create.await_args_list
+            if 'comprehensive solution' in call.kwargs['messages'][0]['content']
+        ]
+
+        assert len(solution_calls) == 2
+        assert solution_calls[0][0] == solution_calls[1][0]  # Byte-identical system prefix
+        assert 'Printer is offline' in solution_calls[1][1]['content']
+
+    def test_step_stream_parser_emits_completed_steps(self):
+        text = json.dumps({'title': 'Fix', 'steps': [{'title': 'one'}, {'title': 'two [x]'}, 'three'], 'done': True})
+        parser = _StepStreamParser()
+
+        emitted = []
+        for i in range(len(text)):
+            emitted.extend(parser.feed(text[i]))
+
+        assert emitted == [{'title': 'one'}, {'title': 'two [x]'}, 'three']
+
+    @pytest.mark.asyncio
+    async def test_execute_stream_yields_steps_before_result(self, agent, mock_openai_client):
+        solution = dict(SOLUTION, steps=[{'title': 'Open reset page'}, {'title': 'Choose a new password'}])
+        streams = []
+
+        async def create_completion(model, messages, **kwargs):
+            if kwargs.get('stream'):
+                streams.append(_ChunkStream(json.dumps(solution)))
+                return streams[-1]
+            return _completion(json.dumps(SEMANTIC))
+
+        mock_openai_client.chat.completions.create.side_effect = create_completion
+
+        events = [event async for event in agent.execute_stream({'query': 'reset password', 'context': {}})]
+
+        assert [event['type'] for event in events] == ['step', 'step', 'result']
+        assert events[1]['step'] == {'title': 'Choose a new password'}
+        assert events[-1]['response'].result['title'] == SOLUTION['title']
+        assert streams[0].closed
+
+    @pytest.mark.asyncio
+    async def test_stalled_stream_retries_without_streaming(self, mock_openai_client):
+        agent = AdvancedResearchAgent('Test Research', 'research', {
+            'openai_client': mock_openai_client,
+            'stream_idle_timeout': 0.05
+        })
+
+        async def create_completion(model, messages, **kwargs):
+            if kwargs.get('stream'):
+                return _ChunkStream(json.dumps(SOLUTION), stall_after=2)
+            return _completion(json.dumps(SOLUTION))
+
+        mock_openai_client.chat.completions.create.side_effect = create_completion
+        steps = []
+
+        solution = await agent._request_solution('reset password', {
+            'confidence': 0.5, 'knowledge_sources': 0, 'pattern_matches': 0,
+            'semantic_components': {}, 'contextual_insights': {}
+        }, 'beginner', steps.append)
+
+        assert solution['title'] == SOLUTION['title']
+        assert steps == []
+        assert mock_openai_client.chat.completions.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_stalled_after_steps_returns_partial_solution(self, mock_openai_client):
+        agent = AdvancedResearchAgent('Test Research', 'research', {
+            'openai_client': mock_openai_client,
+            'stream_idle_timeout': 0.05
+        })
+        text = json.dumps(SOLUTION)
+        stall_after = -(-(text.index(']') + 1) // 7)  # First chunk after the steps array closes
+
+        async def create_completion(model, messages, **kwargs):
+            return _ChunkStream(text, stall_after=stall_after)
+
+        mock_openai_client.chat.completions.create.side_effect = create_completion
+        steps = []
+        query_embedding = np.full(16, 0.25, dtype=np.float32)
+
+        solution = await agent._generate_intelligent_solution('reset password', {
+            'confidence': 0.5, 'knowledge_sources': 1, 'pattern_matches': 0,
+            'semantic_components': {}, 'contextual_insights': {}
+        }, {'user_level': 'beginner'}, query_embedding, steps.append)
+
+        assert steps == SOLUTION['steps']
+        assert solution['partial'] is True
+        assert solution['steps'] == steps
+        assert mock_openai_client.chat.completions.create.await_count == 1
+        assert agent._semantic_caches['solution'].get('beginner|unknown|medium|1', query_embedding) is None
+
+    @pytest.mark.asyncio
+    async def test_expansion_prompt_uses_compact_context(self, agent, mock_openai_client):
+        await agent._generate_expanded_query('vpn drops', {'user_level': 'beginner', 'system': 'macOS'})
+
+        prompt = mock_openai_client.chat.completions.create.await_args.kwargs['messages'][0]['content']
+        assert prompt.startswith('Expand this search query')
+        assert prompt.endswith('Context: {"system":"macOS","user_level":"beginner"}')
+
+    def test_solution_id_is_stable_for_identical_content(self, agent):
+        first = agent._validate_and_enhance_solution(dict(SOLUTION, generated_at='2024-01-01T00:00:00'), {})
+        second = agent._validate_and_enhance_solution(dict(SOLUTION, generated_at='2024-06-01T00:00:00'), {})
+        other = agent._validate_and_enhance_solution(dict(SOLUTION, title='Unlock account'), {})
+
+        assert first['solution_id'] == second['solution_id']
+        assert first['solution_id'] != other['solution_id']
+        assert len(first['solution_id']) == len('sol_') + 32
+
+    def test_learning_history_is_bounded(self, mock_openai_client):
+        agent = AdvancedResearchAgent('Test Research', 'research', {
+            'openai_client': mock_openai_client,
+            'solution_history_size': 2
+        })
+
+        agent.update_solution_effectiveness('sol_a', {'success_rate': 0.9, 'original_query': 'reset email password'})
+        agent.update_solution_effectiveness('sol_b', {'success_rate': 0.9, 'original_query': 'printer offline'})
+        agent.update_solution_effectiveness('sol_a', {'success_rate': 0.9, 'original_query': 'reset email password'})
+        agent.update_solution_effectiveness('sol_c', {'success_rate': 0.9, 'original_query': 'vpn offline'})
+
+        assert list(agent.solution_effectiveness) == ['sol_a', 'sol_c']
+        assert agent._token_index['offline'] == {'sol_c'}
+
+        for i in range(1005):
+            agent._store_research_session(f'query {i}', {}, {})
+        assert len(agent.research_patterns) == 1000
+        assert agent.research_patterns[0]['query'] == 'query 5'
+
+    @pytest.mark.asyncio
+    async def test_adaptive_learning_recommends_consensus_traits(self, agent):
+        for i, (fmt, length) in enumerate([('steps', 'short'), ('steps', 'long'), ('video', 'short'), ('steps', None)]):
+            characteristics = {'format': fmt}
+            if length:
+                characteristics['length'] = length
+            agent.update_solution_effectiveness(f'sol_{i}', {'success_rate': 0.9, 'characteristics': characteristics})
+        agent.update_solution_effectiveness('sol_low', {'success_rate': 0.4, 'characteristics': {'format': 'video'}})
+
+        result = await agent._apply_adaptive_learning('anything', {})
+
+        insights = {insight['trait']: insight for insight in result['learning_insights']}
+        assert insights['format']['recommended_value'] == 'steps'
+        assert insights['format']['confidence'] == pytest.approx(0.75)
+        assert insights['length']['recommended_value'] == 'short'
+        assert insights['length']['confidence'] == pytest.approx(2 / 3)
+
+    def test_compact_json_matches_without_orjson(self, monkeypatch):
+        value = {'b': [1, 2.5, None], 'a': {'café': True}, 'when': 'now'}
+        encoded = _compact_json(value)
+
+        monkeypatch.setattr(research_agent, 'ORJSON_AVAILABLE', False)
+
+        assert _compact_json(value) == encoded == '{"a":{"café":true},"b":[1,2.5,null],"when":"now"}'
+
+    @pytest.mark.parametrize('content', [
+        '{"title": "Fix", "steps": [{"note": "use {braces} and \\"quotes\\""}]}',
+        'Here is the solution:\n```json\n{"title": "Fix", "steps": [{"note": "use {braces} and \\"quotes\\""}]}\n```',
+        '~~~\n{"title": "Fix", "steps": [{"note": "use {braces} and \\"quotes\\""}]}\n~~~\nLet me know!',
+        'Sure! {"title": "Fix", "steps": [{"note": "use {braces} and \\"quotes\\""}]} Hope this helps.',
+    ])
+    def test_extract_json_object_handles_fences_and_prose(self, content):
+        assert json.loads(_extract_json_object(content)) == {
+            'title': 'Fix', 'steps': [{'note': 'use {braces} and "quotes"'}]
+        }
+
+    @pytest.mark.asyncio
+    async def test_punctuation_does_not_hide_token_matches(self, agent):
+        agent.update_solution_effectiveness('sol_a', {'success_rate': 0.9, 'original_query': 'Reset my password!'})
+
+        result = await agent._pattern_based_research('How do I reset my password?', {})
+        ranked = agent._rank_search_results([{'title': 'Password, reset.', 'content': ''}], 'reset password?')
+
+        assert [pattern['solution_id'] for pattern in result['patterns']] == ['sol_a']
+        assert ranked[0]['relevance_score'] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_analysis_routes_to_cheap_model_unless_high_stakes(self, agent, mock_openai_client):
+        create = mock_openai_client.chat.completions.create
+
+        await agent._semantic_and_contextual_analysis('printer offline', {'priority': 'low'})
+        assert create.await_args.kwargs['model'] == 'gpt-4o-mini'
+
+        await agent._semantic_and_contextual_analysis('server down', {'priority': 'critical'})
+        assert create.await_args.kwargs['model'] == 'gpt-4o'
+
+        await agent.execute({'query': 'vpn drops', 'context': {'user_level': 'beginner'}})
+        solution_call = create.await_args_list[-1]
+        assert solution_call.kwargs['model'] == 'gpt-4o'
+
+    @pytest.mark.asyncio
+    async def test_trait_counters_follow_overwrites_and_evictions(self, mock_openai_client):
+        agent = AdvancedResearchAgent('Test Research', 'research', {
+            'openai_client': mock_openai_client,
+            'solution_history_size': 2
+        })
+
+        agent.update_solution_effectiveness('sol_a', {'success_rate': 0.9, 'characteristics': {'format': 'video'}})
+        agent.update_solution_effectiveness('sol_b', {'success_rate': 0.9, 'characteristics': {'format': 'steps'}})
+        agent.update_solution_effectiveness('sol_a', {'success_rate': 0.2, 'characteristics': {'format': 'video'}})
+        assert agent._trait_counters == {'format': {'steps': 1}}
+        assert agent._successful_solution_count == 1
+
+        agent.update_solution_effectiveness('sol_c', {'success_rate': 0.95, 'characteristics': {'tone': 'brief'}})
+        assert agent._trait_counters == {'tone': {'brief': 1}}  # sol_b evicted as least recently updated
+
+        agent.update_solution_effectiveness('sol_d', {'success_rate': 0.95, 'characteristics': {'tone': 'brief'}})
+        assert agent._trait_counters == {'tone': {'brief': 2}}
+        assert agent._successful_solution_count == 2
+        result = await agent._apply_adaptive_learning('anything', {})
+        assert result['learning_insights'] == [{'trait': 'tone', 'recommended_value': 'brief', 'confidence': 1.0}]
+
+    @pytest.mark.asyncio
+    async def test_empty_context_skips_contextual_reasoning(self, agent, mock_openai_client):
+        results = await agent._conduct_comprehensive_research('printer offline', {}, [])
+
+        create = mock_openai_client.chat.completions.create
+        assert create.await_count == 1
+        assert create.await_args.kwargs['response_format']['json_schema']['name'] == 'semantic_decomposition'
+        assert results['semantic_analysis'] == SEMANTIC
+        assert results['contextual_insights']['confidence'] == 0.4
+
+    @pytest.mark.asyncio
+    async def test_near_zero_confidence_skips_solution_call(self, agent, mock_openai_client):
+        synthesis = {'confidence': 0.05, 'knowledge_sources': 0, 'pattern_matches': 0,
+                     'semantic_components': {}, 'contextual_insights': {}}
+
+        solution = await agent._generate_intelligent_solution('printer offline', synthesis, {})
+
+        assert solution['fallback'] is True
+        mock_openai_client.chat.completions.create.assert_not_awaited()
+
+        synthesis['knowledge_sources'] = 1
+        solution = await agent._generate_intelligent_solution('printer offline', synthesis, {})
+        assert solution['title'] == SOLUTION['title']
+
+    @pytest.mark.asyncio
+    async def test_solution_cache_is_keyed_by_context(self, agent, mock_openai_client):
+        synthesis = {'confidence': 0.5, 'knowledge_sources': 1, 'pattern_matches': 0,
+                     'semantic_components': {}, 'contextual_insights': {}}
+        query_embedding = np.full(16, 0.25, dtype=np.float32)
+        create = mock_openai_client.chat.completions.create
+
+        await agent._generate_intelligent_solution('printer offline', synthesis, {'system': 'macOS'}, query_embedding)
+        await agent._generate_intelligent_solution('printer offline', synthesis, {'system': 'macOS'}, query_embedding)
+        assert create.await_count == 1
+
+        await agent._generate_intelligent_solution('printer offline', synthesis, {'system': 'Windows'}, query_embedding)
+        await agent._generate_intelligent_solution('printer offline', synthesis, {'system': 'macOS', 'priority': 'high'},
+                                                   query_embedding)
+        assert create.await_count == 3
+
+    def test_only_successful_solutions_are_indexed(self, agent):
+        agent.update_solution_effectiveness('sol_a', {'success_rate': 0.9, 'original_query': 'reset password'})
+        agent.update_solution_effectiveness('sol_b', {'success_rate': 0.5, 'original_query': 'reset printer'})
+        assert agent._successful_ids == {'sol_a'}
+        assert agent._token_index['reset'] == {'sol_a'}
+
+        agent.update_solution_effectiveness('sol_a', {'success_rate': 0.6, 'original_query': 'reset password'})
+        assert agent._successful_ids == set()
+        assert agent._token_index == {}
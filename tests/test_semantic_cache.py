@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the LSH-backed semantic response cache
+"""
+
+import time
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from core.semantic_cache import SemanticCache
+
+
+def _unit(vector):
+    return vector / np.linalg.norm(vector)
+
+
+class TestSemanticCache:
+
+    def test_near_duplicate_hits_and_returns_copy(self):
+        rng = np.random.default_rng(1)
+        base = rng.standard_normal(64).astype(np.float32)
+        cache = SemanticCache(threshold=0.95)
+        cache.put('beginner', base, {'title': 'Reset password'})
+
+        near = base + 0.05 * rng.standard_normal(64).astype(np.float32)
+        assert float(_unit(base) @ _unit(near)) > 0.95
+
+        hit = cache.get('beginner', near)
+        assert hit == {'title': 'Reset password'}
+        hit['title'] = 'mutated'
+        assert cache.get('beginner', base) == {'title': 'Reset password'}
+
+    def test_dissimilar_query_or_other_key_misses(self):
+        rng = np.random.default_rng(2)
+        base = rng.standard_normal(64).astype(np.float32)
+        cache = SemanticCache(threshold=0.95)
+        cache.put('beginner', base, 'cached')
+
+        assert cache.get('advanced', base) is None
+        assert cache.get('beginner', rng.standard_normal(64).astype(np.float32)) is None
+        assert cache.misses == 2
+
+    def test_expired_and_evicted_entries_are_dropped(self, monkeypatch):
+        rng = np.random.default_rng(3)
+        vectors = rng.standard_normal((3, 32)).astype(np.float32)
+        cache = SemanticCache(ttl_seconds=10, max_entries=2)
+
+        for i, vector in enumerate(vectors):
+            cache.put('', vector, i)
+
+        assert len(cache) == 2
+        assert cache.get('', vectors[0]) is None
+        assert cache.get('', vectors[2]) == 2
+
+        now = time.monotonic()
+        monkeypatch.setattr('core.semantic_cache.time.monotonic', lambda: now + 60)
+        assert cache.get('', vectors[2]) is None
+
+    def test_expiry_queue_drops_expired_and_stays_bounded(self, monkeypatch):
+        rng = np.random.default_rng(4)
+        vectors = rng.standard_normal((10, 32)).astype(np.float32)
+        cache = SemanticCache(ttl_seconds=10, max_entries=2)
+
+        for i, vector in enumerate(vectors):
+            cache.put('', vector, i)
+        assert len(cache._expiry) <= 2 * cache.max_entries
+
+        now = time.monotonic()
+        monkeypatch.setattr('core.semantic_cache.time.monotonic', lambda: now + 60)
+        cache.put('', vectors[0], 'fresh')
+
+        assert len(cache) == 1
+        assert [entry_id for _, entry_id in cache._expiry] == list(cache._entries)
+        assert cache.get('', vectors[0]) == 'fresh'
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Tests for the advanced triage agent's analysis pipeline and learning
+"""
+
+import asyncio
+import hashlib
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import agents.triage_agent as triage_agent
+from agents.triage_agent import AdvancedTriageAgent
+from core.openai_client import OpenAIRateLimiter
+
+
+FAST = {'primary_category': 'password_reset', 'confidence': 0.9, 'urgency': 'low', 'keywords': ['password']}
+SEMANTIC = {
+    'intent': 'regain_access',
+    'complexity': 2,
+    'emotional_state': 'calm',
+    'expertise_required': 'none',
+    'risk_factors': [],
+    'automation_feasibility': 0.9,
+    'reasoning': 'Routine password reset'
+}
+
+
+def _completion(content: str) -> Mock:
+    """Chat completion response carrying the given message content"""
+    response = Mock()
+    response.choices = [Mock(message=Mock(content=content))]
+    response.usage = None
+    return response
+
+
+class TestAdvancedTriageAgent:
+
+    @pytest.fixture
+    def mock_openai_client(self):
+        client = Mock()
+        client.chat = Mock()
+        client.chat.completions = Mock()
+        client.in_flight = 0
+        client.max_in_flight = 0
+
+        async def create_completion(model, messages, **kwargs):
+            client.in_flight += 1
+            client.max_in_flight = max(client.max_in_flight, client.in_flight)
+            await asyncio.sleep(0.01)
+            client.in_flight -= 1
+
+            prompt = '\n'.join(message['content'] for message in messages)
+            schema_name = kwargs.get('response_format', {}).get('json_schema', {}).get('name')
+            if schema_name == 'deep_semantic_analysis':
+                return _completion(json.dumps(SEMANTIC))
+            if 'quick categorization' in prompt:
+                return _completion(json.dumps(FAST))
+            return _completion('{}')
+
+        client.chat.completions.create = AsyncMock(side_effect=create_completion)
+        client.embeddings = Mock()
+        client.embeddings.create = AsyncMock(side_effect=RuntimeError('embeddings unavailable'))
+        return client
+
+    @pytest.fixture
+    def agent(self, mock_openai_client):
+        return AdvancedTriageAgent('Test Triage', 'triage', {'openai_client': mock_openai_client})
+
+    @pytest.mark.asyncio
+    async def test_execute_routes_simple_request_to_research(self, agent):
+        response = await agent.execute({'query': 'I forgot my password', 'context': {'user_level': 'beginner'}})
+
+        assert response.success
+        assert response.result['category'] == 'password_reset'
+        assert response.result['subcategory'] == 'regain_access'
+        assert response.result['recommended_agent'] == 'research'
+        assert 0.0 <= response.result['confidence_score'] <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_execute_requires_request_text(self, agent):
+        with pytest.raises(ValueError):
+            await agent.execute({'query': ''})
+
+    @pytest.mark.asyncio
+    async def test_llm_stages_run_concurrently(self, agent, mock_openai_client):
+        await agent._perform_comprehensive_analysis('I forgot my password', {})
+
+        assert mock_openai_client.chat.completions.create.await_count == 2
+        assert mock_openai_client.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_llm_calls_share_the_rate_limiter(self, mock_openai_client):
+        limiter = OpenAIRateLimiter(max_concurrent=1, requests_per_minute=100, tokens_per_minute=100000)
+        agent = AdvancedTriageAgent('Test Triage', 'triage', {'openai_client': mock_openai_client, 'rate_limiter': limiter})
+
+        await agent._perform_comprehensive_analysis('I forgot my password', {})
+
+        assert mock_openai_client.chat.completions.create.await_count == 2
+        assert mock_openai_client.max_in_flight == 1
+        assert len(limiter._window) == 3  # Request embedding plus both LLM stages
+
+    @pytest.mark.asyncio
+    async def test_abandoned_triage_cancels_prefetched_analysis(self, agent):
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def slow_analysis(*args):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        agent._deep_semantic_analysis = slow_analysis
+        triage = asyncio.ensure_future(agent.execute({'query': 'I forgot my password'}))
+        await started.wait()
+        triage.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await triage
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_failed_stage_falls_back_without_affecting_the_other(self, agent):
+        agent._deep_semantic_analysis = AsyncMock(side_effect=RuntimeError('boom'))
+
+        analysis = await agent._perform_comprehensive_analysis('I forgot my password', {})
+
+        assert analysis['primary_category'] == 'password_reset'
+        assert analysis['subcategory'] == 'seek_assistance'
+        assert analysis['automation_feasibility'] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_unparseable_response_uses_fallback_categorization(self, agent, mock_openai_client):
+        mock_openai_client.chat.completions.create.side_effect = None
+        mock_openai_client.chat.completions.create.return_value = _completion('not json')
+
+        analysis = await agent._perform_comprehensive_analysis('printer is offline', {})
+
+        assert analysis['primary_category'] == 'general_inquiry'
+        assert analysis['subcategory'] == 'seek_assistance'
+
+    @pytest.mark.asyncio
+    async def test_json_mode_requested_and_fenced_output_tolerated(self, agent, mock_openai_client):
+        mock_openai_client.chat.completions.create.side_effect = None
+        mock_openai_client.chat.completions.create.return_value = _completion(f"```json\n{json.dumps(FAST)}\n```")
+
+        categorization = await agent._fast_categorization('I forgot my password')
+
+        assert categorization == FAST
+        call = mock_openai_client.chat.completions.create.await_args
+        assert call.kwargs['response_format'] == {'type': 'json_object'}
+
+    @pytest.mark.asyncio
+    async def test_deep_analysis_uses_strict_schema_and_compact_context(self, agent, mock_openai_client):
+        analysis = await agent._deep_semantic_analysis('I forgot my password', {'user_level': 'beginner', 'system': 'web'})
+
+        assert analysis == SEMANTIC
+        call = mock_openai_client.chat.completions.create.await_args
+        assert call.kwargs['response_format']['json_schema']['strict'] is True
+        assert call.kwargs['max_tokens'] == 400
+        assert '{"system":"web","user_level":"beginner"}' in call.kwargs['messages'][-1]['content']
+
+    @pytest.mark.asyncio
+    async def test_instructions_are_a_static_system_prefix(self, agent, mock_openai_client):
+        await agent._perform_comprehensive_analysis('I forgot my password', {'user_level': 'beginner'})
+        await agent._perform_comprehensive_analysis('The app crashes on start', {'user_level': 'advanced'})
+
+        calls = mock_openai_client.chat.completions.create.await_args_list
+        for model in (agent.fast_model, agent.model):
+            system_prompts = {call.kwargs['messages'][0]['content'] for call in calls if call.kwargs['model'] == model}
+            assert len(system_prompts) == 1
+        for call in calls:
+            assert call.kwargs['messages'][0]['role'] == 'system'
+            assert call.kwargs['messages'][1]['role'] == 'user'
+            assert call.kwargs['messages'][1]['content'] in ('I forgot my password', 'The app crashes on start')
+
+    @pytest.mark.asyncio
+    async def test_similar_request_is_served_from_semantic_cache(self, agent, mock_openai_client):
+        embedding = Mock(data=[Mock(embedding=[0.1] * 8 + [0.9] * 8)])
+        mock_openai_client.embeddings.create = AsyncMock(return_value=embedding)
+
+        first = await agent._perform_comprehensive_analysis('I forgot my password', {'user_level': 'beginner'})
+        second = await agent._perform_comprehensive_analysis('forgot my password', {'user_level': 'beginner'})
+
+        assert mock_openai_client.chat.completions.create.await_count == 2
+        assert second == first
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_is_scoped_to_user_context(self, agent, mock_openai_client):
+        embedding = Mock(data=[Mock(embedding=[0.5] * 16)])
+        mock_openai_client.embeddings.create = AsyncMock(return_value=embedding)
+
+        await agent._perform_comprehensive_analysis('I forgot my password', {'user_level': 'beginner'})
+        await agent._perform_comprehensive_analysis('I forgot my password', {'user_level': 'advanced'})
+
+        # Fast categorization is reused, deep analysis is rerun for the new context
+        assert mock_openai_client.chat.completions.create.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_clear_low_risk_request_is_categorized_locally(self, agent, mock_openai_client):
+        categories = list(triage_agent._CATEGORY_PROTOTYPES)
+
+        def one_hot(category):
+            vector = [0.0] * len(categories)
+            vector[categories.index(category)] = 1.0
+            return Mock(embedding=vector)
+
+        async def create_embedding(model, input):
+            if isinstance(input, list):
+                return Mock(data=[
+                    one_hot(category)
+                    for category, phrases in triage_agent._CATEGORY_PROTOTYPES.items() for _ in phrases
+                ])
+            return Mock(data=[one_hot('security_concern' if 'hacked' in input else 'password_reset')])
+
+        mock_openai_client.embeddings.create = AsyncMock(side_effect=create_embedding)
+
+        embedding = await agent._get_request_embedding('reset my password please')
+        local = await agent._fast_categorization('reset my password please', embedding)
+        assert local['primary_category'] == 'password_reset'
+        assert mock_openai_client.chat.completions.create.await_count == 0
+
+        # High-risk categories still go to the fast model
+        embedding = await agent._get_request_embedding('my account was hacked')
+        await agent._fast_categorization('my account was hacked', embedding)
+        assert mock_openai_client.chat.completions.create.await_count == 1
+
+    def test_scores_use_category_metadata(self, agent):
+        analysis = {'primary_category': 'security_concern', 'synthesis_confidence': 0.6, 'risk_level': 0.1, 'complexity': 10}
+        routing = {'confidence_adjustment': 0.0}
+
+        assert agent._calculate_risk_score(analysis, routing) == pytest.approx((0.1 + 0.95 + 0.3) / 3)
+        assert agent._calculate_confidence_score(analysis, routing) == pytest.approx(0.3)
+
+        analysis['primary_category'] = 'unknown'
+        assert agent._calculate_risk_score(analysis, routing) == pytest.approx((0.1 + 0.5 + 0.3) / 3)
+        assert agent._calculate_confidence_score(analysis, routing) == pytest.approx(0.6)
+
+    def test_user_capability_match(self, agent):
+        assert agent._assess_user_capability_match('password_reset', 'beginner') == 1.0
+        assert agent._assess_user_capability_match('security_concern', 'beginner') == pytest.approx(3 / 9)
+        assert agent._assess_user_capability_match('unknown', 'beginner') == pytest.approx(3 / 5)
+        assert agent._assess_user_capability_match('integration_issue', 'expert') == pytest.approx(6 / 8)
+
+    def test_outcome_feedback_is_bounded(self, agent):
+        for _ in range(60):
+            agent.update_outcome_feedback('password_reset', {'success': True})
+
+        assert len(agent.outcome_feedback['password_reset']) == 50
+
+    @pytest.mark.asyncio
+    async def test_routing_history_is_bounded_with_stable_hashes(self, agent):
+        for _ in range(3):
+            await agent.execute({'query': 'I forgot my password'})
+
+        assert agent.routing_history.maxlen == triage_agent.ROUTING_HISTORY_SIZE
+        assert len(agent.routing_history) == 3
+        expected_hash = hashlib.blake2b(b'I forgot my password', digest_size=8).hexdigest()
+        assert {record['request_hash'] for record in agent.routing_history} == {expected_hash}
+
+    @pytest.mark.asyncio
+    async def test_history_timestamps_are_rendered_on_export(self, agent):
+        await agent.execute({'query': 'I forgot my password'})
+        agent.update_outcome_feedback('password_reset', {'success': True})
+
+        assert isinstance(agent.routing_history[0]['ts'], int)
+        exported = agent.export_history()
+        decision = exported['routing_history'][0]
+        assert 'ts' not in decision
+        assert datetime.fromisoformat(decision['timestamp']).year >= 2024
+        assert exported['outcome_feedback']['password_reset'][0]['success'] is True
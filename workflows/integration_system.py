@@ -539,13 +539,8 @@ def test_webhook():
     )
     
     try:
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(
-            orchestrator.webhook_manager._send_webhook(webhook, test_event)
-        )
-        loop.close()
+        from core.event_loop import run_async
+        run_async(orchestrator.webhook_manager._send_webhook(webhook, test_event))
         
         return jsonify({'status': 'success', 'message': 'Test webhook sent'})
     except Exception as e: